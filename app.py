@@ -1,21 +1,44 @@
 import streamlit as st
 import pandas as pd
-from utils.text_processor import (
-    extract_text_from_docx,
-    extract_text_from_pdf,
-    split_into_sentences,
-    find_keyword_contexts,
-    clean_text
+from utils.models import (
+    get_inference_cache,
+    get_batch_scheduler,
+    DEFAULT_INFERENCE_BATCH_SIZE,
+    EMOTION_AGGREGATIONS,
+    DEFAULT_EMOTION_AGGREGATION,
+    MODEL_KEYS,
+    MODEL_LABELS,
+    warm_up_models,
+    warm_up_status,
+    WARMUP_ENABLED,
+    WARMUP_LOADING,
+    WARMUP_READY
 )
-from utils.models import analyze_text_with_all_models
+from utils.backends import INFERENCE_BACKENDS, DEFAULT_INFERENCE_BACKEND
+from utils.batching import BATCH_SCHEDULER_ENABLED
+from utils.model_bundle import MODEL_BUNDLE_DIR
+from utils.model_server import get_model_client, ModelServerError, MODEL_SERVER_ENABLED
+from utils.ingestion import get_extraction_cache, DEFAULT_EXTRACTION_WORKERS
+from utils.pipeline import AnalysisPipeline
+from utils.journal import JobJournal, make_job_id
+from utils.jobs import get_job_manager, JOB_CANCELLED
+from utils.cache import file_content_hash
+from utils.result_store import ResultStore, DEFAULT_RESULTS_DIR, SORT_COLUMNS
+from utils.statistics import get_statistics
+from utils.instrumentation import PROFILING_DEFAULT
 from utils.visualizer import (
     create_emotion_radar_chart,
-    create_results_dataframe,
     create_sentiment_distribution_chart,
     create_file_summary_chart,
-    create_keyword_summary_chart
+    create_keyword_summary_chart,
+    create_coverage_histogram_chart,
+    create_stage_timing_chart
 )
 import os
+import time
+
+# Çalışan iş varken sayfanın yenilenme aralığı (saniye)
+JOB_POLL_INTERVAL = 2
 
 # Sayfa ayarları
 st.set_page_config(
@@ -47,6 +70,26 @@ with st.sidebar:
         height=150
     )
     keywords = [k.strip() for k in keywords_input.split('\n') if k.strip()]
+    word_boundary = st.checkbox(
+        "Sadece tam kelime eşleşmesi",
+        value=False,
+        help="Açıkken 'WM' gibi kısa anahtar kelimeler başka kelimelerin içinde eşleşmez"
+    )
+    
+    # Model seçimi (seçilmeyen modeller yüklenmez)
+    st.subheader("Modeller")
+    enabled_models = [
+        key for key in MODEL_KEYS
+        if st.checkbox(MODEL_LABELS[key], value=True, key=f"enable_{key}")
+    ]
+    if not enabled_models:
+        st.warning("En az bir model seçin")
+    emotion_aggregation = st.selectbox(
+        "Model 3 parça birleştirme",
+        options=EMOTION_AGGREGATIONS,
+        index=EMOTION_AGGREGATIONS.index(DEFAULT_EMOTION_AGGREGATION),
+        help="512 token'dan uzun bağlamlar parçalara bölünür; duygu skorları ortalama (mean) veya en yüksek (max) ile birleştirilir"
+    )
     
     # Context window
     st.subheader("Context Window")
@@ -57,16 +100,100 @@ with st.sidebar:
     st.subheader("Toplu İşleme")
     batch_size = st.number_input("Batch boyutu", min_value=10, max_value=500, value=100, step=10)
     st.info(f"Her {batch_size} dosya için ilerleme gösterilecek")
+    inference_batch_size = st.number_input(
+        "Model batch boyutu",
+        min_value=1, max_value=256, value=DEFAULT_INFERENCE_BATCH_SIZE, step=8,
+        help="Tek forward pass'te modele gönderilen context sayısı"
+    )
+    inference_backend = st.selectbox(
+        "Inference backend",
+        options=INFERENCE_BACKENDS,
+        index=INFERENCE_BACKENDS.index(DEFAULT_INFERENCE_BACKEND),
+        help="pytorch: fp32, quantized: dinamik int8, onnx: ONNX Runtime (ilk kullanımda dönüştürülür)"
+    )
+    preload_models = st.checkbox(
+        "Modelleri önceden yükle", value=WARMUP_ENABLED,
+        help="Dosya yüklendiğinde seçili modeller arka planda yüklenmeye başlar; analiz başlatılınca beklenmez"
+    )
+    if MODEL_BUNDLE_DIR:
+        st.caption(f"📦 Modeller çevrimdışı paketten yükleniyor: {MODEL_BUNDLE_DIR}")
+    extraction_workers = st.slider(
+        "Dosya okuma işlem sayısı", 1, max(os.cpu_count() or 1, 2), DEFAULT_EXTRACTION_WORKERS,
+        help="PDF/DOCX/TXT metin çıkarma için paralel process sayısı"
+    )
+    profile_jobs = st.checkbox(
+        "Profilleme (cProfile)", value=PROFILING_DEFAULT,
+        help="Analiz thread'leri cProfile altında çalışır; iş bitince .prof dosyası indirilebilir (yavaşlatır)"
+    )
+    
+    # Paylaşılan inference kuyruğu (model sunucusu veya micro-batching zamanlayıcısı)
+    if MODEL_SERVER_ENABLED:
+        st.subheader("Model Sunucusu")
+        try:
+            server_stats = get_model_client().stats(timeout=1)
+            server_col1, server_col2 = st.columns(2)
+            server_col1.metric("Kuyruk", server_stats['queue_depth'])
+            server_col2.metric("İstek", f"{server_stats['requests']:,}")
+            st.caption(
+                f"{server_stats['texts']:,} metin, {server_stats['model_calls']:,} model çağrısı - "
+                f"birleştirilen istek: {server_stats['merged_requests']:,} - hata: {server_stats['errors']}"
+            )
+        except ModelServerError as e:
+            st.warning(f"Model sunucusu: {e}")
+    elif BATCH_SCHEDULER_ENABLED:
+        st.subheader("Inference Kuyruğu")
+        lanes = get_batch_scheduler().stats()
+        if lanes:
+            st.dataframe(
+                pd.DataFrame.from_dict(lanes, orient='index')[
+                    ['queue_depth', 'max_depth', 'batches', 'avg_batch', 'avg_wait_ms']
+                ],
+                use_container_width=True,
+                column_config={
+                    'queue_depth': 'Kuyruk',
+                    'max_depth': 'En fazla',
+                    'batches': 'Batch',
+                    'avg_batch': st.column_config.NumberColumn("Ort. batch", format="%.1f"),
+                    'avg_wait_ms': st.column_config.NumberColumn("Ort. bekleme (ms)", format="%.1f")
+                }
+            )
+        else:
+            st.caption("Henüz istek yok")
+    
+    # Kalıcı sonuç önbelleği
+    st.subheader("Sonuç Önbelleği")
+    use_inference_cache = st.checkbox(
+        "Önbelleği kullan", value=True,
+        help="Daha önce analiz edilen bağlamlar modellere tekrar gönderilmez"
+    )
+    inference_cache = get_inference_cache()
+    cache_stats = inference_cache.stats()
+    cache_col1, cache_col2 = st.columns(2)
+    cache_col1.metric("Hit", f"{cache_stats['hits']:,}")
+    cache_col2.metric("Miss", f"{cache_stats['misses']:,}")
+    st.caption(
+        f"{cache_stats['entries']:,} kayıt - "
+        f"{cache_stats['bytes'] / 1024 / 1024:.1f} / {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB - "
+        f"Hit oranı: {cache_stats['hit_ratio']:.0%}"
+    )
+    if st.button("🗑️ Önbelleği temizle"):
+        removed = inference_cache.clear()
+        st.success(f"{removed:,} kayıt silindi")
     
     st.markdown("---")
     st.markdown("**Geliştirici:** laikaresearch")
 
-# Dosya tipini kontrol eden yardımcı fonksiyon
-def get_file_extension(filename):
-    """Dosya uzantısını güvenli şekilde al"""
-    if '.' in filename:
-        return filename.rsplit('.', 1)[-1].lower()
-    return ''
+# Analiz arka planda çalışır; betiğin yeniden çalışması (widget etkileşimi) işi kesmez
+job_manager = get_job_manager()
+if 'job_id' not in st.session_state and st.query_params.get('job'):
+    # Sayfa yenilendiğinde aynı işe yeniden bağlan
+    st.session_state['job_id'] = st.query_params['job']
+active_job = job_manager.get(st.session_state.get('job_id'))
+job_running = active_job is not None and active_job.is_running()
+if active_job is not None:
+    # Çalışan işte o ana kadarki (kısmi) sonuçlar
+    st.session_state['results'] = active_job.store()
+    st.session_state['analyzed'] = len(st.session_state['results']) > 0
 
 # Ana içerik
 tab1, tab2, tab3, tab4 = st.tabs(["📄 Dosya Yükle", "📊 Sonuçlar", "📈 İstatistikler", "ℹ️ Hakkında"])
@@ -83,193 +210,234 @@ with tab1:
     if uploaded_files:
         st.warning(f"⚠️ {len(uploaded_files)} dosya yüklendi. Büyük dosya sayısı için işlem uzun sürebilir.")
         
-        # Tüm dosyaları birleştir
-        all_texts = []
-        
-        # Dosya yükleme progress bar
-        file_progress = st.progress(0)
-        file_status = st.empty()
-        
-        failed_files = []
-        
-        for file_idx, uploaded_file in enumerate(uploaded_files):
-            try:
-                file_status.text(f"Dosya okunuyor: {uploaded_file.name} ({file_idx+1}/{len(uploaded_files)})")
-                
-                # Dosya uzantısını güvenli şekilde al
-                file_extension = get_file_extension(uploaded_file.name)
-                
-                # Dosya tipine göre okuma
-                if file_extension == 'docx':
-                    text = extract_text_from_docx(uploaded_file)
-                elif file_extension == 'pdf':
-                    text = extract_text_from_pdf(uploaded_file)
-                elif file_extension == 'txt':
-                    # TXT dosyaları için encoding denemesi
-                    try:
-                        text = uploaded_file.read().decode('utf-8')
-                    except UnicodeDecodeError:
-                        # UTF-8 başarısız olursa latin-1 dene
-                        uploaded_file.seek(0)
-                        try:
-                            text = uploaded_file.read().decode('latin-1')
-                        except:
-                            uploaded_file.seek(0)
-                            text = uploaded_file.read().decode('cp1252')
-                else:
-                    failed_files.append((uploaded_file.name, f"Desteklenmeyen dosya tipi: .{file_extension}"))
-                    continue
-                
-                # Temizlenmiş metni kaydet
-                cleaned_text = clean_text(text)
-                
-                if len(cleaned_text.strip()) > 0:
-                    all_texts.append({
-                        'filename': uploaded_file.name,
-                        'text': cleaned_text
-                    })
+        # Kullanıcı ayarları seçerken modeller arka planda yüklenir
+        if preload_models and enabled_models:
+            warm_up_models(enabled_models, inference_backend)
+            warmup = warm_up_status(enabled_models, inference_backend)
+            loading = [MODEL_LABELS[key] for key, state in warmup.items() if state == WARMUP_LOADING]
+            if loading:
+                st.caption(f"⏳ Modeller arka planda yükleniyor: {', '.join(loading)}")
+            elif all(state == WARMUP_READY for state in warmup.values()):
+                st.caption("✅ Seçili modeller yüklendi")
+            for key, state in warmup.items():
+                if state not in (None, WARMUP_LOADING, WARMUP_READY):
+                    st.warning(f"⚠️ {MODEL_LABELS[key]} önceden yüklenemedi: {state}")
+        
+        # Metin çıkarma analiz pipeline'ında yapılır: modeller ilk dosyalar okunur okunmaz
+        # çalışmaya başlar. Burada sadece dosya bilgileri gösterilir.
+        file_payloads = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files]
+        total_bytes = sum(len(data) for _, data in file_payloads)
+        st.info(f"📝 Toplam boyut: {total_bytes / 1_000_000:.1f} MB")
+        
+        # Dosya listesi (ilk 20 dosya)
+        with st.expander(f"📂 Yüklenen Dosyalar (İlk 20/{len(file_payloads)})"):
+            for i, (name, data) in enumerate(file_payloads[:20]):
+                st.write(f"{i+1}. **{name}** - {len(data) / 1000:,.1f} KB")
+            if len(file_payloads) > 20:
+                st.write(f"... ve {len(file_payloads) - 20} dosya daha")
+        
+        # Aynı ayarlar + aynı dosyalar = aynı iş; yarım kalan iş devam ettirilebilir
+        job_config = {
+            'keywords': keywords,
+            'context_before': context_before,
+            'context_after': context_after,
+            'word_boundary': word_boundary,
+            'models': enabled_models,
+            'backend': inference_backend,
+            'emotion_aggregation': emotion_aggregation
+        }
+        # İçerik hash'i yükleme başına bir kez hesaplanır (otomatik yenileme betiği 2 sn'de bir çalıştırır)
+        known_hashes = st.session_state.get('upload_hashes', {})
+        st.session_state['upload_hashes'] = {
+            uploaded_file.file_id: known_hashes.get(uploaded_file.file_id)
+            or file_content_hash(uploaded_file.name, data)
+            for uploaded_file, (_, data) in zip(uploaded_files, file_payloads)
+        }
+        journal = JobJournal(make_job_id(
+            job_config,
+            [st.session_state['upload_hashes'][uploaded_file.file_id] for uploaded_file in uploaded_files]
+        ))
+        
+        resume_job = False
+        if journal.is_resumable() and not job_running:
+            st.info(
+                f"⏸️ Bu ayarlarla yarım kalmış bir analiz bulundu: "
+                f"{len(journal.completed)}/{len(file_payloads)} dosya tamamlanmış."
+            )
+            resume_job = st.button("▶️ Kaldığı yerden devam et", disabled=not enabled_models)
+        elif journal.is_complete and not st.session_state.get('analyzed'):
+            st.info("💾 Bu ayarlarla tamamlanmış bir analiz bulundu.")
+            if st.button("📂 Önceki sonuçları yükle"):
+                st.session_state.pop('job_id', None)
+                st.query_params.pop('job', None)
+                # Parquet deposu varsa günlükteki JSON yeniden ayrıştırılmaz
+                results_dir = os.path.join(DEFAULT_RESULTS_DIR, journal.job_id)
+                if ResultStore.exists(results_dir):
+                    st.session_state['results'] = ResultStore.load(results_dir)
                 else:
-                    failed_files.append((uploaded_file.name, "Boş dosya"))
-                
-            except Exception as e:
-                failed_files.append((uploaded_file.name, str(e)))
-                st.error(f"❌ Hata: {uploaded_file.name} - {str(e)[:100]}")
-            
-            # Progress güncelle
-            file_progress.progress((file_idx + 1) / len(uploaded_files))
-        
-        file_status.empty()
-        file_progress.empty()
-        
-        # Sonuç özeti
-        if all_texts:
-            st.success(f"✅ {len(all_texts)} dosya başarıyla yüklendi")
+                    st.session_state['results'] = ResultStore.from_results(journal.results())
+                    st.session_state['results'].save(results_dir)
+                st.session_state['analyzed'] = True
+                st.rerun()
+        
+        # Analiz butonu
+        start_job = st.button(
+            "🚀 Analizi Başlat", type="primary", disabled=not enabled_models or job_running
+        )
         
-        if failed_files:
-            st.error(f"❌ {len(failed_files)} dosya yüklenemedi")
-            with st.expander("Başarısız Dosyalar"):
-                for fname, error in failed_files:
-                    st.write(f"- **{fname}**: {error}")
+        if start_job or resume_job:
+            # Çıkarma -> eşleşme -> inference aşamaları eşzamanlı çalışır
+            pipeline = AnalysisPipeline(
+                file_payloads,
+                keywords,
+                context_before,
+                context_after,
+                word_boundary=word_boundary,
+                batch_size=int(inference_batch_size),
+                extraction_workers=extraction_workers,
+                extraction_cache=get_extraction_cache(),
+                use_cache=use_inference_cache,
+                backend=inference_backend,
+                models=enabled_models,
+                emotion_aggregation=emotion_aggregation,
+                resume_from=journal.resume_state() if resume_job else None,
+                on_file_complete=journal.record_file,
+                profile=profile_jobs
+            )
+            # Yeni analizde günlük sıfırlanır; aynı iş başka oturumda çalışıyorsa ona bağlanılır
+            job = job_manager.submit(
+                journal.job_id, pipeline, journal, inference_cache.hits,
+                prepare=(lambda: journal.start(job_config, [name for name, _ in file_payloads])) if start_job else None
+            )
+            st.session_state['job_id'] = job.job_id
+            st.query_params['job'] = job.job_id
+            st.rerun()
+
+    # Arka plandaki işin durumu
+    if active_job is not None:
+        stats = active_job.pipeline.stats()
+        
+        if job_running:
+            st.info(
+                f"⏳ Analiz arka planda çalışıyor (iş: {active_job.job_id}). "
+                f"Sonuçlar ve İstatistikler sekmeleri o ana kadarki sonuçları gösterir."
+            )
+            
+            progress = active_job.pipeline.progress()
+            st.progress(progress)
+            st.text(
+                f"📄 Okunan: {stats['files_extracted']}/{stats['files_total']} - "
+                f"🔎 Eşleşme aranan: {stats['files_matched']} (ön filtreyle atlanan: {stats['files_skipped']}) - "
+                f"🤖 Analiz edilen: {stats['matches_analyzed']}/{stats['matches_found']} - "
+                f"Kuyruk (belge/eşleşme): {stats['doc_queue']}/{stats['match_queue']}"
+            )
+            
+            progress_cols = st.columns(4)
+            progress_cols[0].metric("İşlenen Dosya", f"{stats['files_matched']}/{stats['files_total']}")
+            progress_cols[1].metric("Bulunan Eşleşme", stats['matches_found'])
+            progress_cols[2].metric("Analiz Edilen", stats['matches_analyzed'])
+            if 0 < progress < 1:
+                estimated_remaining = stats['elapsed'] / progress * (1 - progress)
+                mins, secs = divmod(int(estimated_remaining), 60)
+                progress_cols[3].metric("Tahmini Kalan", f"{mins}d {secs}s")
+            
+            control_col1, control_col2, control_col3 = st.columns(3)
+            if control_col1.button("⏹️ Analizi İptal Et"):
+                job_manager.cancel(active_job.job_id)
+                st.rerun()
+            control_col2.button("🔄 Yenile")
+            control_col3.checkbox("Otomatik yenile", value=True, key='auto_refresh')
         
-        if not all_texts:
-            st.error("❌ Hiçbir dosya başarıyla yüklenemedi!")
         else:
-            # Toplam istatistikler
-            total_chars = sum(len(t['text']) for t in all_texts)
-            st.info(f"📝 Toplam karakter: {total_chars:,}")
+            for error in active_job.pipeline.errors:
+                st.warning(f"⚠️ Analiz hatası: {error}")
+            failed_files = active_job.pipeline.failed_files
+            if failed_files:
+                st.error(f"❌ {len(failed_files)} dosya işlenemedi")
+                with st.expander("Başarısız Dosyalar"):
+                    for fname, error in failed_files:
+                        st.write(f"- **{fname}**: {error}")
+            if stats['files_incomplete'] and active_job.status != JOB_CANCELLED:
+                st.warning(
+                    f"⚠️ {stats['files_incomplete']} dosyadaki bazı eşleşmeler analiz edilemedi. "
+                    f"Aynı dosya ve ayarlarla kaldığı yerden devam ederek tekrar deneyebilirsiniz."
+                )
             
-            # Dosya listesi (ilk 20 dosya)
-            with st.expander(f"📂 Yüklenen Dosyalar (İlk 20/{len(all_texts)})"):
-                for i, item in enumerate(all_texts[:20]):
-                    st.write(f"{i+1}. **{item['filename']}** - {len(item['text']):,} karakter")
-                if len(all_texts) > 20:
-                    st.write(f"... ve {len(all_texts) - 20} dosya daha")
+            all_results = st.session_state['results']
+            cache_hits = inference_cache.hits - active_job.cache_hits_start
             
-            # Önizleme
-            with st.expander("📄 İlk Dosya Önizleme"):
-                preview_text = all_texts[0]['text']
-                st.text(preview_text[:1000] + "..." if len(preview_text) > 1000 else preview_text)
+            # Toplam süre
+            mins, secs = divmod(int(stats['elapsed']), 60)
             
-            # Analiz butonu
-            if st.button("🚀 Analizi Başlat", type="primary"):
-                with st.spinner("Analiz yapılıyor..."):
-                    
-                    all_results = []
-                    
-                    # Genel progress bar
-                    overall_progress = st.progress(0)
-                    overall_status = st.empty()
-                    
-                    # YENİ: İlerleme detay metrikleri
-                    progress_cols = st.columns(4)
-                    metric_files = progress_cols[0].empty()
-                    metric_matches = progress_cols[1].empty()
-                    metric_analyzed = progress_cols[2].empty()
-                    metric_time = progress_cols[3].empty()
-                    
-                    import time
-                    start_time = time.time()
-                    
-                    # Her dosya için analiz
-                    for file_idx, item in enumerate(all_texts):
-                        # YENİ: Daha detaylı ilerleme bilgisi
-                        elapsed_time = time.time() - start_time
-                        avg_time_per_file = elapsed_time / (file_idx + 1) if file_idx > 0 else 0
-                        remaining_files = len(all_texts) - file_idx - 1
-                        estimated_remaining = avg_time_per_file * remaining_files
-                        
-                        overall_status.text(
-                            f"📄 Analiz ediliyor: {item['filename']} "
-                            f"({file_idx+1}/{len(all_texts)}) - "
-                            f"Toplam eşleşme: {len(all_results)}"
-                        )
-                        
-                        # Metrikler güncelle
-                        metric_files.metric("İşlenen Dosya", f"{file_idx+1}/{len(all_texts)}")
-                        metric_matches.metric("Bulunan Eşleşme", len(all_results))
-                        metric_analyzed.metric("Analiz Edilen", len(all_results))
-                        if estimated_remaining > 0:
-                            mins, secs = divmod(int(estimated_remaining), 60)
-                            metric_time.metric("Tahmini Kalan", f"{mins}d {secs}s")
-                        
-                        try:
-                            # Cümlelere ayır
-                            sentences = split_into_sentences(item['text'])
-                            
-                            # Anahtar kelime eşleşmelerini bul
-                            matches = find_keyword_contexts(
-                                sentences, 
-                                keywords,
-                                context_before,
-                                context_after
-                            )
-                            
-                            if matches:
-                                # Her eşleşme için analiz yap
-                                for idx, match in enumerate(matches):
-                                    # Analiz
-                                    analysis = analyze_text_with_all_models(match['context'])
-                                    
-                                    all_results.append({
-                                        'filename': item['filename'],
-                                        **match,
-                                        **analysis
-                                    })
-                                    
-                                    # Her 10 eşleşmede metrikleri güncelle
-                                    if idx % 10 == 0:
-                                        metric_matches.metric("Bulunan Eşleşme", len(all_results))
-                                        metric_analyzed.metric("Analiz Edilen", len(all_results))
-                            
-                        except Exception as e:
-                            st.warning(f"⚠️ Analiz hatası: {item['filename']} - {str(e)[:100]}")
-                        
-                        # Overall progress güncelle
-                        overall_progress.progress((file_idx + 1) / len(all_texts))
-                    
-                    # Temizlik
-                    overall_status.empty()
-                    overall_progress.empty()
-                    for col in progress_cols:
-                        col.empty()
-                    
-                    # Toplam süre
-                    total_time = time.time() - start_time
-                    mins, secs = divmod(int(total_time), 60)
-                    
-                    if all_results:
-                        # Sonuçları session state'e kaydet
-                        st.session_state['results'] = all_results
-                        st.session_state['analyzed'] = True
-                        
-                        st.success(
-                            f"✅ Analiz tamamlandı! "
-                            f"Toplam {len(all_results)} eşleşme bulundu. "
-                            f"Süre: {mins} dakika {secs} saniye. "
-                            f"'Sonuçlar' sekmesine gidin."
+            if active_job.status == JOB_CANCELLED:
+                st.warning(
+                    f"⏹️ Analiz iptal edildi. {len(all_results)} eşleşme analiz edilmişti; "
+                    f"aynı dosya ve ayarlarla kaldığı yerden devam edebilirsiniz."
+                )
+            elif all_results:
+                st.success(
+                    f"✅ Analiz tamamlandı! "
+                    f"Toplam {len(all_results)} eşleşme bulundu. "
+                    f"Süre: {mins} dakika {secs} saniye. "
+                    f"Anahtar kelime içermeyen {stats['files_skipped']} dosya "
+                    f"({stats['chars_skipped'] / 1_000_000:.1f} M karakter) cümlelere ayrılmadan atlandı. "
+                    f"Tekrar eden {stats['duplicate_contexts']} bağlam atlandı "
+                    f"({stats['saved_model_calls']} model çağrısı tasarruf edildi). "
+                    f"Önbellekten gelen: {cache_hits} model sonucu. "
+                    f"'Sonuçlar' sekmesine gidin."
+                )
+            else:
+                st.error("❌ Hiçbir dosyada anahtar kelime bulunamadı!")
+        
+        # Aşama süreleri (çalışırken canlı güncellenir)
+        stage_rows = active_job.pipeline.metrics.snapshot()
+        with st.expander("⏱️ Süre Nereye Gidiyor?", expanded=False):
+            if not stage_rows:
+                st.caption("Henüz ölçüm yok")
+            else:
+                st.caption(
+                    "Aşama başına toplam süre, gecikme yüzdelikleri ve işlem hızı. "
+                    "Paralel çıkarma process'lerinin süreleri toplanır; pay en dış aşamaların toplam süresine "
+                    "göredir. İç aşamalar (pdf_page gibi) kapsayan aşamanın payının bir parçasıdır."
+                )
+                st.dataframe(
+                    pd.DataFrame(stage_rows),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'stage': 'Aşama',
+                        'calls': 'Çağrı',
+                        'total_s': st.column_config.NumberColumn("Toplam (s)", format="%.2f"),
+                        'share': st.column_config.ProgressColumn("Pay", min_value=0, max_value=1, format="percent"),
+                        'nested': st.column_config.CheckboxColumn("İç aşama"),
+                        'p50_ms': st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                        'p95_ms': st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                        'items': 'Öğe',
+                        'items_per_s': st.column_config.NumberColumn("Öğe/s", format="%.1f")
+                    }
+                )
+                fig_stages = create_stage_timing_chart(stage_rows)
+                if fig_stages:
+                    st.plotly_chart(fig_stages, use_container_width=True, key="stage_timing_chart")
+                
+                export_col1, export_col2 = st.columns(2)
+                export_col1.download_button(
+                    label="📥 Ölçümleri JSON olarak indir",
+                    data=lambda: active_job.pipeline.metrics.to_json(
+                        job_id=active_job.job_id, stats=active_job.pipeline.stats()
+                    ).encode('utf-8'),
+                    file_name=f"metrics_{active_job.job_id}.json",
+                    mime="application/json"
+                )
+                # Profil dosyası iş bittiğinde sonuç dizinine yazılır
+                if not job_running and os.path.exists(active_job.profile_path):
+                    with open(active_job.profile_path, 'rb') as f:
+                        export_col2.download_button(
+                            label="📥 cProfile çıktısını indir (.prof)",
+                            data=f.read(),
+                            file_name=f"profile_{active_job.job_id}.prof",
+                            mime="application/octet-stream"
                         )
-                    else:
-                        st.error("❌ Hiçbir dosyada anahtar kelime bulunamadı!")
 
 with tab2:
     st.header("📊 Detaylı Sonuçlar")
@@ -277,15 +445,18 @@ with tab2:
     if 'analyzed' in st.session_state and st.session_state['analyzed']:
         results = st.session_state['results']
         
+        if job_running:
+            st.warning("⏳ Analiz sürüyor - kısmi sonuçlar gösteriliyor")
         st.info(f"📈 Toplam {len(results)} bağlam analiz edildi")
         
         # Filtreleme seçenekleri
+        matches = results.matches
         with st.expander("🔍 Filtreleme Seçenekleri"):
             col1, col2 = st.columns(2)
             
             with col1:
                 # Dosyaya göre filtrele
-                all_files = sorted(list(set([r.get('filename', 'N/A') for r in results])))
+                all_files = sorted(matches['filename'].dropna().unique().tolist())
                 selected_files = st.multiselect(
                     "Dosya Seç",
                     options=all_files,
@@ -294,74 +465,120 @@ with tab2:
             
             with col2:
                 # Anahtar kelimeye göre filtre
-                all_keywords = sorted(list(set([r['keyword'] for r in results])))
+                all_keywords = sorted(matches['keyword'].dropna().unique().tolist())
                 selected_keywords = st.multiselect(
                     "Anahtar Kelime Seç",
                     options=all_keywords,
                     default=all_keywords
                 )
         
-        # Filtrelenmiş sonuçlar
-        filtered_results = [
-            r for r in results 
-            if r.get('filename', 'N/A') in selected_files and r['keyword'] in selected_keywords
-        ]
+        # Arama, sıralama ve sayfa boyutu
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        search_query = search_col.text_input("🔎 Ara", placeholder="Bağlam, dosya adı veya anahtar kelime")
+        sort_column = sort_col.selectbox("Sırala", options=[None, *SORT_COLUMNS], format_func=lambda c: c or "Dosya sırası")
+        ascending = order_col.radio("Yön", ["Artan", "Azalan"], horizontal=False) == "Artan"
+        page_size = size_col.selectbox("Sayfa boyutu", options=[10, 25, 50, 100], index=1)
+        
+        # Filtre ve sıralama satır numaraları üzerinde yapılır; sadece görünen sayfa oluşturulur
+        filtered_rows = results.filter_rows(selected_files, selected_keywords, search_query)
+        filtered_rows = results.sort_rows(filtered_rows, sort_column, ascending)
+        
+        page_count = max(1, -(-len(filtered_rows) // page_size))
+        # Filtre, sıralama veya sayfa boyutu değişince ilk sayfaya dönülür; çalışan
+        # işte yeni sonuç gelmesi sayfayı sıfırlamaz
+        view_key = (
+            f"{hash((tuple(selected_files), tuple(selected_keywords), search_query, sort_column, ascending))}"
+            f"_{page_size}"
+        )
+        page_key = f"results_page_{view_key}"
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        page_info_col, page_col = st.columns([3, 1])
+        page = page_col.number_input(
+            f"Sayfa (/{page_count})", min_value=1, max_value=page_count, key=page_key
+        )
+        page_rows = filtered_rows[(page - 1) * page_size:page * page_size]
+        page_info_col.info(
+            f"🔎 Filtreye uyan: {len(filtered_rows)} / {len(results)} - "
+            f"Gösterilen: {(page - 1) * page_size + 1 if len(page_rows) else 0}-"
+            f"{(page - 1) * page_size + len(page_rows)}"
+        )
         
-        st.info(f"🔎 Gösterilen: {len(filtered_results)} / {len(results)}")
+        # Özet tablo (sadece bu sayfa); satır seçilince ayrıntı gösterilir. Seçim
+        # konumsal olduğundan anahtar sayfadaki eşleşmelerin kimliklerini içerir:
+        # çalışan işte satırlar kayarsa seçim başka bir eşleşmeye kaymak yerine temizlenir
+        st.subheader("📋 Özet Tablo")
+        page_ids = hash(tuple(results.match_ids(page_rows)))
+        selection = st.dataframe(
+            results.summary_dataframe(page_rows),
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=f"results_grid_{view_key}_{page}_{page_ids}"
+        )
+        selected = selection.selection.rows if selection else []
         
-        # Her sonucu göster
-        for idx, result in enumerate(filtered_results):
-            with st.expander(f"🔍 {result.get('filename', 'N/A')} - Eşleşme {idx+1}: '{result['keyword']}' - Cümle {result['sentence_index']}"):
-                
-                # Context göster
-                st.markdown("**📝 Bağlam:**")
-                st.write(result['context'])
-                
-                st.markdown("---")
-                
-                # Model sonuçları
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown("**Model 1: Hızlı Pilot**")
-                    sentiment_1 = result['model_1']['sentiment']
-                    st.metric("Sentiment", sentiment_1)
-                
-                with col2:
-                    st.markdown("**Model 2: Haber**")
-                    sentiment_2 = result['model_2']['sentiment']
-                    st.metric("Sentiment", sentiment_2)
-                
-                with col3:
-                    st.markdown("**Model 3: Detaylı**")
-                    top_emotion = result['model_3']['top_emotions'][0]
+        if not selected:
+            st.caption("👆 Bağlamı ve duygu grafiğini görmek için tablodan bir satır seçin.")
+        else:
+            # Grafik sadece seçilen eşleşme için oluşturulur
+            result = results.record(int(page_rows[selected[0]]))
+            st.markdown(
+                f"### 🔍 {result.get('filename', 'N/A')} - '{result['keyword']}' - "
+                f"Cümle {result['sentence_index']}"
+            )
+            
+            # Context göster
+            st.markdown("**📝 Bağlam:**")
+            st.write(result['context'])
+            
+            st.markdown("---")
+            
+            # Model sonuçları
+            col1, col2, col3 = st.columns(3)
+            
+            # Devre dışı bırakılan modellerin sonuçları boş dict'tir
+            with col1:
+                st.markdown("**Model 1: Hızlı Pilot**")
+                sentiment_1 = result.get('model_1', {}).get('sentiment', '—')
+                st.metric("Sentiment", sentiment_1)
+            
+            with col2:
+                st.markdown("**Model 2: Haber**")
+                sentiment_2 = result.get('model_2', {}).get('sentiment', '—')
+                st.metric("Sentiment", sentiment_2)
+            
+            top_emotions = result.get('model_3', {}).get('top_emotions', [])
+            
+            with col3:
+                st.markdown("**Model 3: Detaylı**")
+                if top_emotions:
+                    top_emotion = top_emotions[0]
                     st.metric(
                         "Top Duygu", 
                         top_emotion['label'],
                         f"{top_emotion['score']:.2%}"
                     )
-                
+                else:
+                    st.metric("Top Duygu", '—')
+            
+            if top_emotions:
                 # Model 3 detayları
                 st.markdown("**🎭 Top 5 Duygu (Model 3):**")
-                emotion_df = pd.DataFrame(result['model_3']['top_emotions'])
+                emotion_df = pd.DataFrame(top_emotions)
                 st.dataframe(emotion_df, use_container_width=True)
                 
                 # Radar chart
-                fig = create_emotion_radar_chart(result['model_3']['top_emotions'])
+                fig = create_emotion_radar_chart(top_emotions)
                 if fig:
-                    st.plotly_chart(fig, use_container_width=True, key=f"radar_chart_{idx}")
+                    st.plotly_chart(fig, use_container_width=True, key="radar_chart_selected")
         
-        # Özet tablo
+        # CSV indirme (tüm sonuçlar; dosya sadece tıklanınca oluşturulur)
         st.markdown("---")
-        st.subheader("📋 Özet Tablo")
-        df = create_results_dataframe(results)
-        st.dataframe(df, use_container_width=True)
-        
-        # CSV indirme
-        csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="📥 Sonuçları CSV olarak indir",
-            data=csv,
+            data=lambda: results.summary_dataframe().to_csv(index=False).encode('utf-8'),
             file_name="qatar_sentiment_results.csv",
             mime="text/csv"
         )
@@ -375,24 +592,28 @@ with tab3:
     if 'analyzed' in st.session_state and st.session_state['analyzed']:
         results = st.session_state['results']
         
+        if job_running:
+            st.warning("⏳ Analiz sürüyor - kısmi sonuçlar gösteriliyor")
+        
+        # Tüm özetler aynı sonuç kümesi için bir kez hesaplanır
+        statistics = get_statistics(results)
+        metrics = statistics['metrics']
+        
         # Özet metrikler
         st.subheader("📊 Özet Metrikler")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Toplam Eşleşme", len(results))
+            st.metric("Toplam Eşleşme", metrics['total_matches'])
         
         with col2:
-            unique_files = len(set([r.get('filename', 'N/A') for r in results]))
-            st.metric("Analiz Edilen Dosya", unique_files)
+            st.metric("Analiz Edilen Dosya", metrics['unique_files'])
         
         with col3:
-            unique_keywords = len(set([r['keyword'] for r in results]))
-            st.metric("Bulunan Anahtar Kelime", unique_keywords)
+            st.metric("Bulunan Anahtar Kelime", metrics['unique_keywords'])
         
         with col4:
-            avg_per_file = len(results) / unique_files if unique_files > 0 else 0
-            st.metric("Dosya Başına Ort. Eşleşme", f"{avg_per_file:.1f}")
+            st.metric("Dosya Başına Ort. Eşleşme", f"{metrics['avg_per_file']:.1f}")
         
         st.markdown("---")
         
@@ -401,34 +622,12 @@ with tab3:
         
         st.info("💡 Bu analiz, aynı cümlelerin farklı context'lerde kaç kez analiz edildiğini gösterir.")
         
-        # Her dosya için cümle kullanımlarını hesapla
-        file_sentence_usage = {}
-        
-        for r in results:
-            fname = r.get('filename', 'N/A')
-            context_range = r.get('context_range', (0, 0))
-            
-            if fname not in file_sentence_usage:
-                file_sentence_usage[fname] = []
-            
-            # Bu eşleşmede kullanılan tüm cümle indekslerini ekle
-            for sentence_idx in range(context_range[0], context_range[1]):
-                file_sentence_usage[fname].append(sentence_idx)
-        
-        # Genel overlap istatistikleri
-        all_used_sentences = []
-        for sentences in file_sentence_usage.values():
-            all_used_sentences.extend(sentences)
-        
-        total_sentence_usages = len(all_used_sentences)
-        unique_sentences_used = len(set(all_used_sentences))
-        
-        if total_sentence_usages > 0:
-            overlap_ratio = ((total_sentence_usages - unique_sentences_used) / total_sentence_usages) * 100
-            avg_usage_per_sentence = total_sentence_usages / unique_sentences_used if unique_sentences_used > 0 else 0
-        else:
-            overlap_ratio = 0
-            avg_usage_per_sentence = 0
+        # Pencereler (dosya, start_idx, end_idx) aralıkları olarak sayılır
+        overlap = statistics['overlap']
+        total_sentence_usages = overlap['total']
+        unique_sentences_used = overlap['unique']
+        overlap_ratio = overlap['overlap_ratio']
+        avg_usage_per_sentence = overlap['avg_usage']
         
         # Overlap metrikleri
         overlap_col1, overlap_col2, overlap_col3, overlap_col4 = st.columns(4)
@@ -469,32 +668,21 @@ with tab3:
         else:
             st.warning("⚠️ Yüksek overlap: Aynı cümleler çok kez kullanılmış. İstatistikler şişik olabilir.")
         
+        # Kapsama histogramı
+        fig_coverage = create_coverage_histogram_chart(overlap['histogram'])
+        if fig_coverage:
+            st.plotly_chart(fig_coverage, use_container_width=True, key="coverage_histogram_chart")
+        
         # Dosya bazlı overlap analizi
         with st.expander("📂 Dosya Bazlı Overlap Detayları"):
-            file_overlap_data = []
-            
-            for fname, sentence_list in file_sentence_usage.items():
-                total_usages = len(sentence_list)
-                unique_sentences = len(set(sentence_list))
-                
-                if total_usages > 0:
-                    file_overlap = ((total_usages - unique_sentences) / total_usages) * 100
-                    avg_usage = total_usages / unique_sentences if unique_sentences > 0 else 0
-                else:
-                    file_overlap = 0
-                    avg_usage = 0
-                
-                file_overlap_data.append({
-                    'Dosya': fname,
-                    'Toplam Kullanım': total_usages,
-                    'Benzersiz Cümle': unique_sentences,
-                    'Overlap %': f"{file_overlap:.1f}%",
-                    'Ort. Kullanım': f"{avg_usage:.2f}x"
-                })
-            
-            file_overlap_df = pd.DataFrame(file_overlap_data)
-            file_overlap_df = file_overlap_df.sort_values('Toplam Kullanım', ascending=False)
-            st.dataframe(file_overlap_df, use_container_width=True)
+            st.dataframe(
+                overlap['files'],
+                use_container_width=True,
+                column_config={
+                    'Overlap %': st.column_config.NumberColumn(format="%.1f%%"),
+                    'Ort. Kullanım': st.column_config.NumberColumn(format="%.2fx")
+                }
+            )
         
         st.markdown("---")
         
@@ -517,27 +705,7 @@ with tab3:
         
         # Dosya detay tablosu
         with st.expander("📂 Tüm Dosyalar - Detaylı Tablo"):
-            file_summary = {}
-            for r in results:
-                fname = r.get('filename', 'N/A')
-                if fname not in file_summary:
-                    file_summary[fname] = {
-                        'Eşleşme Sayısı': 0,
-                        'Positive (M1)': 0,
-                        'Negative (M1)': 0,
-                        'Neutral (M1)': 0
-                    }
-                file_summary[fname]['Eşleşme Sayısı'] += 1
-                sentiment = r.get('model_1', {}).get('sentiment', '').lower()
-                if 'positive' in sentiment:
-                    file_summary[fname]['Positive (M1)'] += 1
-                elif 'negative' in sentiment:
-                    file_summary[fname]['Negative (M1)'] += 1
-                elif 'neutral' in sentiment:
-                    file_summary[fname]['Neutral (M1)'] += 1
-            
-            file_df = pd.DataFrame.from_dict(file_summary, orient='index')
-            file_df = file_df.sort_values('Eşleşme Sayısı', ascending=False)
+            file_df = statistics['files']
             st.dataframe(file_df, use_container_width=True)
         
         st.markdown("---")
@@ -550,42 +718,16 @@ with tab3:
         
         # Anahtar kelime detay tablosu
         with st.expander("🔑 Anahtar Kelimeler - Detaylı Tablo"):
-            keyword_summary = {}
-            for r in results:
-                kw = r.get('keyword', 'N/A')
-                if kw not in keyword_summary:
-                    keyword_summary[kw] = {
-                        'Eşleşme Sayısı': 0,
-                        'Positive (M1)': 0,
-                        'Negative (M1)': 0,
-                        'Neutral (M1)': 0
-                    }
-                keyword_summary[kw]['Eşleşme Sayısı'] += 1
-                sentiment = r.get('model_1', {}).get('sentiment', '').lower()
-                if 'positive' in sentiment:
-                    keyword_summary[kw]['Positive (M1)'] += 1
-                elif 'negative' in sentiment:
-                    keyword_summary[kw]['Negative (M1)'] += 1
-                elif 'neutral' in sentiment:
-                    keyword_summary[kw]['Neutral (M1)'] += 1
-            
-            keyword_df = pd.DataFrame.from_dict(keyword_summary, orient='index')
-            keyword_df = keyword_df.sort_values('Eşleşme Sayısı', ascending=False)
+            keyword_df = statistics['keywords']
             st.dataframe(keyword_df, use_container_width=True)
         
         st.markdown("---")
         
         # 4. Model 3 - Top Duygular
         st.markdown("### 4️⃣ En Sık Görülen Duygular (Model 3)")
-        all_emotions = {}
-        for r in results:
-            top_emotion = r.get('model_3', {}).get('top_emotions', [{}])[0]
-            emotion_label = top_emotion.get('label', 'unknown')
-            if emotion_label != 'unknown':
-                all_emotions[emotion_label] = all_emotions.get(emotion_label, 0) + 1
-        
-        if all_emotions:
-            emotion_series = pd.Series(all_emotions).sort_values(ascending=False)
+        emotion_series = statistics['emotions']
+        
+        if not emotion_series.empty:
             
             import plotly.graph_objects as go
             fig_emotions = go.Figure()
@@ -660,3 +802,8 @@ with tab4:
 
 st.markdown("---")
 st.markdown("💡 **İpucu:** Sidebar'dan anahtar kelimeleri ve context window ayarlarını özelleştirebilirsiniz.")
+
+# Çalışan iş varken kısmi sonuçlar için sayfayı periyodik yenile
+if job_running and st.session_state.get('auto_refresh', True):
+    time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
@@ -0,0 +1,112 @@
+"""
+Inference backend karşılaştırması: fp32 etiketleriyle uyum (parity) ve hız
+
+Kullanım (repo kökünden):
+    python -m benchmarks.backend_comparison --contexts 512 --batch-size 32
+    python -m benchmarks.backend_comparison --corpus ornek.txt --backends pytorch quantized onnx
+
+--corpus verilirse her satır bir context olarak kullanılır.
+"""
+import argparse
+import time
+
+from benchmarks.inference_throughput import make_contexts
+from utils.backends import INFERENCE_BACKENDS
+from utils.models import (
+    load_model_1,
+    load_model_2,
+    load_model_3,
+    run_model_batched
+)
+
+MODEL_KEYS = ('model_1', 'model_2', 'model_3')
+LOADERS = {'model_1': load_model_1, 'model_2': load_model_2, 'model_3': load_model_3}
+
+def label_of(model_key: str, result: dict) -> str:
+    """Karşılaştırılan etiket: Model 1/2 sentiment, Model 3 en yüksek duygu"""
+    if model_key == 'model_3':
+        return result['top_emotions'][0]['label']
+    return result['sentiment']
+
+def run_backend(backend: str, contexts: list, batch_size: int) -> dict:
+    rows = {}
+    for model_key in MODEL_KEYS:
+        start = time.perf_counter()
+        LOADERS[model_key](backend)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = run_model_batched(model_key, contexts, batch_size, cache=None, backend=backend)
+        elapsed = time.perf_counter() - start
+
+        rows[model_key] = {
+            'load': load_time,
+            'elapsed': elapsed,
+            'labels': [label_of(model_key, r) for r in results],
+            'results': results
+        }
+    return rows
+
+def max_score_diff(reference: list, other: list) -> float:
+    """Model 3 duygu skorlarındaki en büyük mutlak fark"""
+    worst = 0.0
+    for ref, res in zip(reference, other):
+        ref_scores = {e['label']: e['score'] for e in ref['all_emotions']}
+        for e in res['all_emotions']:
+            worst = max(worst, abs(ref_scores.get(e['label'], 0.0) - e['score']))
+    return worst
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference backend karşılaştırması")
+    parser.add_argument('--contexts', type=int, default=512, help="Sentetik context sayısı")
+    parser.add_argument('--corpus', default=None, help="Her satırı bir context olan metin dosyası")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--backends', nargs='+', default=list(INFERENCE_BACKENDS),
+                        choices=INFERENCE_BACKENDS)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8') as f:
+            contexts = [line.strip() for line in f if line.strip()]
+    else:
+        contexts = make_contexts(args.contexts)
+
+    # Referans fp32 (pytorch); seçilmemiş veya yüklenememişse uyum sütunları gösterilmez
+    backends = sorted(dict.fromkeys(args.backends), key=lambda b: b != 'pytorch')
+    runs = {}
+    for backend in backends:
+        try:
+            runs[backend] = run_backend(backend, contexts, args.batch_size)
+        except Exception as e:
+            print(f"[{backend}] atlandı: {e}")
+
+    reference = runs.get('pytorch')
+    n = len(contexts)
+
+    print(f"\n{n} context, batch={args.batch_size}\n")
+    header = f"{'Backend':<11}{'Model':<9}{'Yükleme (s)':>12}{'Süre (s)':>10}{'context/s':>11}"
+    if reference:
+        header += f"{'Hızlanma':>10}{'Etiket uyumu':>14}"
+    print(header)
+    for backend, rows in runs.items():
+        for model_key in MODEL_KEYS:
+            row = rows[model_key]
+            line = (f"{backend:<11}{model_key:<9}{row['load']:>12.1f}{row['elapsed']:>10.2f}"
+                    f"{n / row['elapsed']:>11.1f}")
+            if reference:
+                ref = reference[model_key]
+                agreement = sum(a == b for a, b in zip(ref['labels'], row['labels'])) / n
+                line += f"{ref['elapsed'] / row['elapsed']:>9.2f}x{agreement:>14.1%}"
+            print(line)
+
+    if not reference:
+        print("\npytorch referansı yok; etiket uyumu ve skor farkı hesaplanmadı")
+        return
+
+    for backend, rows in runs.items():
+        if backend != 'pytorch':
+            diff = max_score_diff(reference['model_3']['results'], rows['model_3']['results'])
+            print(f"\n[{backend}] Model 3 en büyük skor farkı: {diff:.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Uçtan uca sıcak yol (hot path) benchmark'ı: çıkarma, temizleme, cümle bölme,
+anahtar kelime eşleştirme ve model inference
+
+Yerelde yapılandırılabilir boyutta sentetik bir Almanca haber korpusu (txt/docx/pdf)
+üretir, her aşamayı ayrı ölçer ve sonuçları sürümler arasında karşılaştırılabilecek
+bir JSON dosyasına yazar.
+
+Kullanım (repo kökünden):
+    python -m benchmarks.hot_paths --docs 300 --sentences 80 --output bench.json
+    python -m benchmarks.hot_paths --skip-models --compare bench_eski.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import docx
+
+from benchmarks.keyword_matching import BASE_KEYWORDS, WORDS
+from utils.text_processor import (
+    decode_text_bytes,
+    extract_text_from_docx,
+    extract_text_from_pdf,
+    clean_text,
+    split_into_sentences,
+    find_keyword_contexts
+)
+
+FORMATS = ('txt', 'docx', 'pdf')
+
+NEWS_SENTENCES = [
+    "Die Weltmeisterschaft in Katar wurde von vielen Seiten kritisiert.",
+    "Der Fußballverband verteidigte die Vergabe des Turniers.",
+    "Menschenrechtsorganisationen berichten von schweren Missständen auf den Baustellen.",
+    "Die Fans feierten trotzdem ausgelassen in den Stadien.",
+    "Katar investierte Milliarden in neue Infrastruktur.",
+    "Die Spieler äußerten sich nur zurückhaltend zur politischen Lage.",
+    "Nach dem Finale sprach der Trainer von einem historischen Abend.",
+    "Viele Zuschauer blieben der WM aus Protest fern."
+]
+
+def make_document(n_sentences: int, rng: random.Random, keyword_rate: float) -> list:
+    """Gerçekçi cümleler + rastgele kelimelerden oluşan, arada anahtar kelime geçen paragraf"""
+    sentences = []
+    for _ in range(n_sentences):
+        if rng.random() < 0.3:
+            sentences.append(rng.choice(NEWS_SENTENCES))
+            continue
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 20))]
+        if rng.random() < keyword_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(BASE_KEYWORDS))
+        sentences.append(' '.join(words).capitalize() + rng.choice('..!?'))
+    return sentences
+
+def _wrap(sentences: list, width: int = 90) -> list:
+    """PDF satırları (kelime sınırından bölünmüş)"""
+    lines, line = [], ''
+    for word in ' '.join(sentences).split(' '):
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+def write_pdf(path: str, sentences: list, lines_per_page: int = 60):
+    """Harici kütüphane olmadan Helvetica/WinAnsi metin içeren basit bir PDF yaz"""
+    lines = _wrap(sentences)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Sayfa listesi, sayfa nesneleri belli olunca doldurulur
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    ]
+    page_ids = []
+    for page_lines in pages:
+        body = b"BT /F1 10 Tf 40 800 Td 12 TL "
+        for line in page_lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            body += b"(" + escaped.encode('cp1252', errors='replace') + b") Tj T* "
+        body += b"ET"
+        content_id = len(objects) + 2
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(body) + body + b"\nendstream")
+    kids = ' '.join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, 'wb') as f:
+        f.write(out)
+
+def make_corpus(directory: str, n_docs: int, n_sentences: int, formats=FORMATS,
+                keyword_rate: float = 0.1, seed: int = 0) -> list:
+    """Sentetik korpus üret; (yol, biçim) listesi döndür"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for i in range(n_docs):
+        fmt = formats[i % len(formats)]
+        sentences = make_document(n_sentences, rng, keyword_rate)
+        path = os.path.join(directory, f"haber_{i:05d}.{fmt}")
+        if fmt == 'txt':
+            with open(path, 'w', encoding='utf-8') as f:
+                # Paragraflar halinde, satır sonlu düz metin
+                for j in range(0, len(sentences), 5):
+                    f.write(' '.join(sentences[j:j + 5]) + '\n\n')
+        elif fmt == 'docx':
+            document = docx.Document()
+            for j in range(0, len(sentences), 5):
+                document.add_paragraph(' '.join(sentences[j:j + 5]))
+            document.save(path)
+        else:
+            write_pdf(path, sentences)
+        files.append((path, fmt))
+    return files
+
+def peak_rss_mb() -> float:
+    """Sürecin şimdiye kadarki en yüksek RSS'i (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def current_rss_mb() -> Optional[float]:
+    """Sürecin şu anki RSS'i (MB); /proc olmayan sistemlerde None"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def stage_row(seconds: float, items: int, unit: str, rss_before: Optional[float], **extra) -> dict:
+    """
+    Aşama satırı
+
+    ru_maxrss süreç boyunca en yüksek değer olduğu için aşama başına anlamlı değil;
+    bunun yerine aşamanın başı ile sonu arasındaki RSS farkı yazılır.
+    """
+    rss_after = current_rss_mb()
+    rss_delta = None if rss_before is None or rss_after is None else round(rss_after - rss_before, 1)
+    return {
+        'seconds': round(seconds, 4),
+        'items': items,
+        'unit': unit,
+        'throughput': round(items / seconds, 2) if seconds > 0 else None,
+        'rss_delta_mb': rss_delta,
+        **extra
+    }
+
+def run_text_stages(files: list, keywords: list) -> tuple:
+    """Çıkarma (biçim başına), temizleme, cümle bölme ve eşleştirme süreleri"""
+    extractors = {
+        'txt': decode_text_bytes,
+        'docx': lambda data: extract_text_from_docx(io.BytesIO(data)),
+        'pdf': lambda data: extract_text_from_pdf(io.BytesIO(data))
+    }
+    stages = {}
+
+    # Disk okuma ölçüme katılmaz
+    payloads = []
+    for path, fmt in files:
+        with open(path, 'rb') as f:
+            payloads.append((fmt, f.read()))
+
+    raw_texts = []
+    for fmt, extractor in extractors.items():
+        batch = [data for payload_fmt, data in payloads if payload_fmt == fmt]
+        if not batch:
+            continue
+        rss = current_rss_mb()
+        start = time.perf_counter()
+        texts = [extractor(data) for data in batch]
+        elapsed = time.perf_counter() - start
+        raw_texts.extend(texts)
+        stages[f"extract_text_{fmt}"] = stage_row(
+            elapsed, len(batch), 'docs/s', rss, mb_in=round(sum(map(len, batch)) / 1e6, 2)
+        )
+
+    rss = current_rss_mb()
+    start = time.perf_counter()
+    cleaned = [clean_text(text) for text in raw_texts]
+    elapsed = time.perf_counter() - start
+    stages['clean_text'] = stage_row(
+        elapsed, len(cleaned), 'docs/s', rss, chars=sum(map(len, cleaned))
+    )
+
+    rss = current_rss_mb()
+    start = time.perf_counter()
+    documents = [split_into_sentences(text) for text in cleaned]
+    elapsed = time.perf_counter() - start
+    sentence_count = sum(map(len, documents))
+    stages['split_into_sentences'] = stage_row(elapsed, sentence_count, 'sentences/s', rss, docs=len(documents))
+
+    rss = current_rss_mb()
+    start = time.perf_counter()
+    contexts = [m['context'] for sentences in documents
+                for m in find_keyword_contexts(sentences, keywords)]
+    elapsed = time.perf_counter() - start
+    stages['find_keyword_contexts'] = stage_row(
+        elapsed, len(contexts), 'contexts/s', rss,
+        sentences_per_s=round(sentence_count / elapsed, 2) if elapsed > 0 else None
+    )
+
+    return stages, contexts
+
+def run_model_stages(contexts: list) -> dict:
+    """Her analyze_with_model_* fonksiyonunu tek tek context'ler üzerinde ölç"""
+    from utils.models import (
+        load_model_1, load_model_2, load_model_3,
+        analyze_with_model_1, analyze_with_model_2, analyze_with_model_3
+    )
+
+    stages = {}
+    for name, loader, analyze in (
+        ('analyze_with_model_1', load_model_1, analyze_with_model_1),
+        ('analyze_with_model_2', load_model_2, analyze_with_model_2),
+        ('analyze_with_model_3', load_model_3, analyze_with_model_3)
+    ):
+        rss = current_rss_mb()
+        start = time.perf_counter()
+        model = loader()
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in contexts:
+            analyze(text, model)
+        elapsed = time.perf_counter() - start
+        stages[name] = stage_row(elapsed, len(contexts), 'contexts/s', rss, load_seconds=round(load_time, 2))
+    return stages
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def print_report(report: dict, baseline: dict = None):
+    header = f"{'Aşama':<26}{'Süre (s)':>10}{'Birim/s':>14}{'Birim':>14}{'ΔRSS (MB)':>11}"
+    if baseline:
+        header += f"{'Hız oranı':>12}"
+    print(header)
+    for name, row in report['stages'].items():
+        rss_delta = '-' if row.get('rss_delta_mb') is None else f"{row['rss_delta_mb']:+.1f}"
+        line = (f"{name:<26}{row['seconds']:>10.3f}{row['throughput'] or 0:>14.1f}"
+                f"{row['unit']:>14}{rss_delta:>11}")
+        previous = (baseline or {}).get('stages', {}).get(name)
+        if previous and previous.get('throughput') and row['throughput']:
+            line += f"{row['throughput'] / previous['throughput']:>11.2f}x"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sıcak yol benchmark'ı (sentetik korpus)")
+    parser.add_argument('--docs', type=int, default=150, help="Belge sayısı")
+    parser.add_argument('--sentences', type=int, default=80, help="Belge başına cümle sayısı")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--keyword-rate', type=float, default=0.1, help="Anahtar kelime geçen cümle oranı")
+    parser.add_argument('--model-contexts', type=int, default=64,
+                        help="Modellerle ölçülecek context sayısı")
+    parser.add_argument('--skip-models', action='store_true', help="Model aşamalarını atla")
+    parser.add_argument('--corpus-dir', default=None,
+                        help="Korpusun yazılacağı dizin (verilmezse geçici dizin kullanılır ve silinir)")
+    parser.add_argument('--output', '-o', default='hot_paths.json', help="Sonuç JSON dosyası")
+    parser.add_argument('--compare', default=None, help="Karşılaştırılacak önceki sonuç JSON'ı")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='laika-bench-')
+    try:
+        start = time.perf_counter()
+        files = make_corpus(corpus_dir, args.docs, args.sentences, args.formats,
+                            args.keyword_rate, args.seed)
+        generation_time = time.perf_counter() - start
+
+        stages, contexts = run_text_stages(files, BASE_KEYWORDS)
+        if not args.skip_models and contexts:
+            stages.update(run_model_stages(contexts[:args.model_contexts]))
+    finally:
+        if args.corpus_dir is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = {
+        'benchmark': 'hot_paths',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {
+            'docs': args.docs,
+            'sentences_per_doc': args.sentences,
+            'formats': args.formats,
+            'keyword_rate': args.keyword_rate,
+            'model_contexts': 0 if args.skip_models else min(args.model_contexts, len(contexts)),
+            'seed': args.seed
+        },
+        'corpus_generation_seconds': round(generation_time, 2),
+        'contexts_found': len(contexts),
+        'stages': stages,
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nSonuçlar: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Tekli ve toplu (batched) inference throughput karşılaştırması
+
+Kullanım (repo kökünden):
+    python -m benchmarks.inference_throughput --contexts 256 --batch-sizes 8 16 32 64
+"""
+import argparse
+import random
+import time
+
+from utils.models import (
+    analyze_text_with_all_models,
+    analyze_texts_with_all_models,
+    load_model_1,
+    load_model_2,
+    load_model_3
+)
+
+SAMPLE_SENTENCES = [
+    "Die Weltmeisterschaft in Katar wurde von vielen Seiten kritisiert.",
+    "Der Fußballverband verteidigte die Vergabe des Turniers.",
+    "Menschenrechtsorganisationen berichten von schweren Missständen auf den Baustellen.",
+    "Die Fans feierten trotzdem ausgelassen in den Stadien.",
+    "Katar investierte Milliarden in neue Infrastruktur.",
+    "Die Spieler äußerten sich nur zurückhaltend zur politischen Lage.",
+    "Nach dem Finale sprach der Trainer von einem historischen Abend.",
+    "Viele Zuschauer blieben der WM aus Protest fern."
+]
+
+def make_contexts(n: int, seed: int = 0) -> list:
+    """1-7 cümlelik sentetik Almanca context'ler üret"""
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(1, 7)))
+        for _ in range(n)
+    ]
+
+def run_benchmark(n_contexts: int, batch_sizes: list) -> list:
+    contexts = make_contexts(n_contexts)
+
+    # Model yükleme süresini ölçüme katma
+    load_model_1()
+    load_model_2()
+    load_model_3()
+
+    rows = []
+
+    start = time.perf_counter()
+    for text in contexts:
+        analyze_text_with_all_models(text)
+    elapsed = time.perf_counter() - start
+    rows.append(('tekli', elapsed, n_contexts / elapsed))
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        analyze_texts_with_all_models(contexts, batch_size=batch_size, use_cache=False)
+        elapsed = time.perf_counter() - start
+        rows.append((f'batch={batch_size}', elapsed, n_contexts / elapsed))
+
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference throughput benchmark")
+    parser.add_argument('--contexts', type=int, default=256, help="Context sayısı")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 16, 32, 64])
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.contexts, args.batch_sizes)
+    baseline = rows[0][2]
+
+    print(f"{'Mod':<12}{'Süre (s)':>12}{'context/s':>12}{'Hızlanma':>12}")
+    for name, elapsed, throughput in rows:
+        print(f"{name:<12}{elapsed:>12.2f}{throughput:>12.1f}{throughput / baseline:>11.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Anahtar kelime eşleştirme benchmark'ı: eski cümle x anahtar kelime döngüsü ile
+derlenmiş KeywordMatcher'ın anahtar kelime sayısına göre ölçeklenmesi
+
+Kullanım (repo kökünden):
+    python -m benchmarks.keyword_matching --sentences 20000 --keyword-counts 5 50 200 500
+"""
+import argparse
+import random
+import string
+import time
+
+from utils.text_processor import find_keyword_contexts
+
+BASE_KEYWORDS = ["Qatar", "Katar", "Weltmeisterschaft", "Fußball", "WM"]
+
+WORDS = [
+    "die", "der", "das", "und", "mit", "nach", "Turnier", "Stadion", "Spieler",
+    "Trainer", "Regierung", "Kritik", "Menschenrechte", "Arbeiter", "Fans",
+    "Finale", "Tor", "Mannschaft", "Verband", "Sponsor", "Bericht", "Woche"
+]
+
+def naive_find_keyword_contexts(sentences, keywords, context_before=3, context_after=3):
+    """Eski uygulama: her cümle ve her anahtar kelime için ayrı lower() + alt dizi taraması"""
+    matches = []
+    for i, sentence in enumerate(sentences):
+        for keyword in keywords:
+            if keyword.lower() in sentence.lower():
+                start_idx = max(0, i - context_before)
+                end_idx = min(len(sentences), i + context_after + 1)
+                context_sentences = sentences[start_idx:end_idx]
+                matches.append({
+                    'keyword': keyword,
+                    'sentence_index': i,
+                    'target_sentence': sentence,
+                    'context': ' '.join(context_sentences),
+                    'context_sentences': context_sentences,
+                    'start_idx': start_idx,
+                    'end_idx': end_idx
+                })
+                break
+    return matches
+
+def make_keywords(n: int, seed: int = 0) -> list:
+    """Temel anahtar kelimeler + sentetik varlık adları"""
+    rng = random.Random(seed)
+    keywords = list(BASE_KEYWORDS)
+    while len(keywords) < n:
+        length = rng.randint(4, 12)
+        keywords.append(rng.choice(string.ascii_uppercase) +
+                        ''.join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return keywords[:n]
+
+def make_sentences(n: int, keywords: list, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 20))]
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        sentences.append(' '.join(words).capitalize() + '.')
+    return sentences
+
+def time_call(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Anahtar kelime eşleştirme benchmark'ı")
+    parser.add_argument('--sentences', type=int, default=20000)
+    parser.add_argument('--keyword-counts', type=int, nargs='+', default=[5, 50, 200, 500])
+    args = parser.parse_args()
+
+    print(f"{'Kelime':>8}{'Eski (s)':>12}{'Yeni (s)':>12}{'Sınır (s)':>12}{'Hızlanma':>12}{'Eşleşme':>10}")
+    for count in args.keyword_counts:
+        keywords = make_keywords(count)
+        sentences = make_sentences(args.sentences, keywords)
+
+        naive_time, naive_matches = time_call(naive_find_keyword_contexts, sentences, keywords)
+        fast_time, fast_matches = time_call(find_keyword_contexts, sentences, keywords)
+        boundary_time, _ = time_call(find_keyword_contexts, sentences, keywords, word_boundary=True)
+
+        assert naive_matches == fast_matches, "Eşleşmeler eski uygulama ile aynı olmalı"
+
+        print(f"{count:>8}{naive_time:>12.3f}{fast_time:>12.3f}{boundary_time:>12.3f}"
+              f"{naive_time / fast_time:>11.1f}x{len(fast_matches):>10}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Soğuk başlangıç ölçümü: modül import süreleri ve app.py'nin ilk çalıştırma süresi
+
+Her ölçüm yeni bir Python sürecinde yapılır (import önbelleği sıcak değil); süreler
+tekrarların medyanıdır. İlk çalıştırma süresi Streamlit AppTest ile app.py'nin
+tarayıcı olmadan ilk kez baştan sona çalışma süresidir (import'lar dahil).
+
+Kullanım (repo kökünden):
+    python -m benchmarks.startup_time --repeat 5 --output startup.json
+    python -m benchmarks.startup_time --importtime 20          # en pahalı import'lar
+    python -m benchmarks.startup_time --compare startup_eski.json
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.hot_paths import git_revision
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+
+# Tek tek ölçülen modüller (ağır bağımlılıklar referans için)
+MODULES = [
+    'streamlit',
+    'pandas',
+    'utils.text_processor',
+    'utils.models',
+    'utils.pipeline',
+    'utils.visualizer',
+    'transformers'
+]
+
+_IMPORT_SNIPPET = """
+import time, logging
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+"""
+
+_RENDER_SNIPPET = """
+import time, logging
+from streamlit.testing.v1 import AppTest
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+app = AppTest.from_file({app!r}, default_timeout={timeout})
+start = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    raise SystemExit('app.py hata verdi: ' + str(app.exception[0].value))
+print(elapsed)
+"""
+
+def app_imports(path: str = APP_PATH) -> list:
+    """app.py'nin modül seviyesindeki import ettiği modüller"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def _run_python(code: str, extra_args: tuple = ()) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='0')
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', code],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+
+def time_snippet(code: str, repeat: int) -> dict:
+    """Kodu yeni süreçlerde çalıştırıp bastığı süreyi topla"""
+    samples = []
+    for _ in range(repeat):
+        result = _run_python(code)
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ['?'])[-1]
+            return {'error': error}
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        'median_s': round(statistics.median(samples), 4),
+        'min_s': round(min(samples), 4),
+        'samples': [round(s, 4) for s in samples]
+    }
+
+def import_times(modules: list, repeat: int) -> dict:
+    return {
+        module: time_snippet(_IMPORT_SNIPPET.format(imports=f"import {module}"), repeat)
+        for module in modules
+    }
+
+def top_imports(modules: list, limit: int) -> list:
+    """-X importtime çıktısından kümülatif süreye göre en pahalı import'lar"""
+    code = '\n'.join(f"import {module}" for module in modules)
+    result = _run_python(code, ('-X', 'importtime'))
+    rows = []
+    # Satır biçimi: "import time:  <self us> | <cumulative us> | <girinti><modül>"
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+def print_report(report: dict, baseline: dict = None):
+    def fmt(entry):
+        return f"{entry['median_s']:>10.3f}" if 'median_s' in entry else f"{'hata':>10}"
+
+    header = f"{'Ölçüm':<32}{'Medyan (s)':>10}"
+    if baseline:
+        header += f"{'Önceki (s)':>12}"
+    print(header)
+
+    rows = [(f"import {name}", entry) for name, entry in report['imports'].items()]
+    rows.append(('app.py import\'ları (toplam)', report['app_imports']))
+    rows.append(('app.py ilk çalıştırma', report['first_render']))
+
+    previous = {}
+    if baseline:
+        previous = {f"import {k}": v for k, v in baseline.get('imports', {}).items()}
+        previous['app.py import\'ları (toplam)'] = baseline.get('app_imports', {})
+        previous['app.py ilk çalıştırma'] = baseline.get('first_render', {})
+
+    for name, entry in rows:
+        line = f"{name:<32}{fmt(entry)}"
+        if baseline and 'median_s' in previous.get(name, {}):
+            line += f"{previous[name]['median_s']:>12.3f}"
+        print(line)
+        if 'error' in entry:
+            print(f"    {entry['error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk başlangıç (import + ilk çalıştırma) ölçümü")
+    parser.add_argument('--repeat', type=int, default=3, help="Ölçüm başına yeni süreç sayısı")
+    parser.add_argument('--modules', nargs='+', default=MODULES, help="Tek tek ölçülecek modüller")
+    parser.add_argument('--skip-render', action='store_true', help="app.py ilk çalıştırmasını ölçme")
+    parser.add_argument('--render-timeout', type=float, default=120)
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help="app.py import'ları için -X importtime ile en pahalı N modülü göster")
+    parser.add_argument('--output', '-o', default='startup.json', help="Sonuç JSON dosyası")
+    parser.add_argument('--compare', default=None, help="Karşılaştırılacak önceki sonuç JSON'ı")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    report = {
+        'benchmark': 'startup_time',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'imports': import_times(args.modules, args.repeat),
+        'app_import_modules': modules,
+        'app_imports': time_snippet(
+            _IMPORT_SNIPPET.format(imports='\n'.join(f"import {m}" for m in modules)), args.repeat
+        ),
+        'first_render': (
+            {'skipped': True} if args.skip_render else
+            time_snippet(_RENDER_SNIPPET.format(app=APP_PATH, timeout=args.render_timeout), args.repeat)
+        )
+    }
+    if args.importtime:
+        report['top_imports'] = top_imports(modules, args.importtime)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.importtime:
+        print(f"\n{'Modül':<48}{'Kendi (ms)':>12}{'Kümülatif (ms)':>16}")
+        for row in report['top_imports']:
+            print(f"{row['module']:<48}{row['self_ms']:>12.1f}{row['cumulative_ms']:>16.1f}")
+
+    print(f"\nSonuçlar: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""
+Tarayıcı gerektirmeyen toplu analiz (gece çalıştırmaları için)
+
+app.py ile aynı çıkarma -> cümle -> eşleşme -> analiz pipeline'ını (utils.pipeline)
+kullanır ve sonuçları diske yazar.
+
+Kullanım (repo kökünden):
+    python run.py --input corpus/ --keywords keywords.txt --output out/
+    python run.py --input "haberler/**/*.pdf" --keyword Katar --keyword WM --before 2 --after 2
+    python run.py --input corpus/ --keywords keywords.txt --resume   # kesilen işe devam et
+    python run.py --input corpus/ --keyword Katar --profile          # cProfile çıktısı da yaz
+    LAIKA_MODEL_BUNDLE=paket/ python run.py --input corpus/ --keyword Katar  # internetsiz sunucu
+
+Tamamlanan her dosyanın sonucu bir iş günlüğüne (journal) yazılır; aynı ayarlar ve
+aynı dosyalarla --resume verilirse iş kaldığı dosyadan devam eder.
+
+Çıktılar (--output dizini):
+    results.jsonl  Her eşleşme için tam sonuç (satır başına bir JSON)
+    results.csv    Özet tablo (Sonuçlar sekmesindeki ile aynı sütunlar)
+    store/         Sütunlu sonuç deposu (Parquet; utils.result_store.ResultStore.load ile okunur)
+    metrics.json   Aşama başına toplam süre, p50/p95 gecikme ve işlem hızı
+    profile.prof   cProfile çıktısı (sadece --profile ile; snakeviz/pstats ile açılır)
+    summary.json   Makine tarafından okunabilir çalışma özeti
+
+Çıkış kodları:
+    0  Başarılı
+    1  Beklenmeyen hata veya hiçbir şey analiz edilemedi
+    2  Hatalı kullanım / girdi bulunamadı
+    3  Tamamlandı ama bazı dosyalar veya bağlamlar işlenemedi
+    4  Hiç eşleşme bulunamadı
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_NO_MATCHES = 4
+
+SUPPORTED_EXTENSIONS = ('txt', 'docx', 'pdf')
+
+def collect_input_files(inputs: list) -> list:
+    """Dizin, dosya veya glob girdilerinden desteklenen dosyaları topla (tekrarsız, sıralı)"""
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            candidates = glob.glob(os.path.join(pattern, '**', '*'), recursive=True)
+        else:
+            candidates = glob.glob(pattern, recursive=True)
+        paths.extend(
+            p for p in candidates
+            if os.path.isfile(p) and p.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS
+        )
+    return sorted(set(paths))
+
+def read_keywords(keyword_file: str, extra: list) -> list:
+    """Anahtar kelime dosyası (her satıra bir kelime) + komut satırı kelimeleri"""
+    keywords = []
+    if keyword_file:
+        with open(keyword_file, encoding='utf-8') as f:
+            keywords.extend(line.strip() for line in f)
+    keywords.extend(k.strip() for k in extra or [])
+    return [k for k in keywords if k]
+
+def parse_args(argv=None):
+    from utils.backends import INFERENCE_BACKENDS, DEFAULT_INFERENCE_BACKEND
+    from utils.ingestion import DEFAULT_EXTRACTION_WORKERS
+    from utils.instrumentation import PROFILING_DEFAULT
+    from utils.models import (
+        DEFAULT_INFERENCE_BATCH_SIZE,
+        DEFAULT_EMOTION_AGGREGATION,
+        EMOTION_AGGREGATIONS,
+        MODEL_KEYS
+    )
+
+    parser = argparse.ArgumentParser(description="Almanca haber metinleri için toplu duygu analizi")
+    parser.add_argument('--input', '-i', nargs='+', required=True,
+                        help="Dizin, dosya veya glob (ör. 'haberler/**/*.pdf')")
+    parser.add_argument('--keywords', '-k', default=None, help="Her satırda bir anahtar kelime olan dosya")
+    parser.add_argument('--keyword', action='append', default=[], help="Ek anahtar kelime (tekrarlanabilir)")
+    parser.add_argument('--before', type=int, default=3, help="Önceki cümle sayısı")
+    parser.add_argument('--after', type=int, default=3, help="Sonraki cümle sayısı")
+    parser.add_argument('--word-boundary', action='store_true', help="Sadece tam kelime eşleşmeleri")
+    parser.add_argument('--output', '-o', default='output', help="Çıktı dizini")
+    parser.add_argument('--summary', default=None, help="Özet JSON yolu (varsayılan: <output>/summary.json)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_EXTRACTION_WORKERS,
+                        help="Metin çıkarma process sayısı")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_INFERENCE_BATCH_SIZE)
+    parser.add_argument('--backend', choices=INFERENCE_BACKENDS, default=DEFAULT_INFERENCE_BACKEND)
+    parser.add_argument('--models', nargs='+', choices=MODEL_KEYS, default=list(MODEL_KEYS))
+    parser.add_argument('--aggregation', choices=EMOTION_AGGREGATIONS, default=DEFAULT_EMOTION_AGGREGATION)
+    parser.add_argument('--no-cache', action='store_true', help="Kalıcı önbellekleri kullanma")
+    parser.add_argument('--resume', action='store_true',
+                        help="Aynı ayarlarla yarım kalmış iş varsa kaldığı yerden devam et")
+    parser.add_argument('--profile', action='store_true', default=PROFILING_DEFAULT,
+                        help="Pipeline thread'lerini cProfile ile profille (<output>/profile.prof)")
+    parser.add_argument('--quiet', '-q', action='store_true', help="İlerleme çıktısı verme")
+    return parser.parse_args(argv)
+
+def write_outputs(output_dir: str, store):
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(os.path.join(output_dir, 'results.jsonl'), 'w', encoding='utf-8') as f:
+        for result in store.records():
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    store.summary_dataframe().to_csv(
+        os.path.join(output_dir, 'results.csv'), index=False, encoding='utf-8'
+    )
+    store.save(os.path.join(output_dir, 'store'))
+
+def file_identity(path: str) -> str:
+    """İş kimliği için dosyayı okumadan tanımla (yol + boyut + değişiklik zamanı)"""
+    stat = os.stat(path)
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def run(args) -> int:
+    from utils.ingestion import get_extraction_cache
+    from utils.journal import JobJournal, make_job_id
+    from utils.model_bundle import MODEL_BUNDLE_DIR
+    from utils.pipeline import AnalysisPipeline
+
+    files = collect_input_files(args.input)
+    keywords = read_keywords(args.keywords, args.keyword)
+
+    if not files:
+        print("Girdi dosyası bulunamadı", file=sys.stderr)
+        return EXIT_USAGE
+    if not keywords:
+        print("Anahtar kelime verilmedi (--keywords veya --keyword)", file=sys.stderr)
+        return EXIT_USAGE
+
+    started = datetime.now(timezone.utc)
+
+    job_config = {
+        'keywords': keywords,
+        'context_before': args.before,
+        'context_after': args.after,
+        'word_boundary': args.word_boundary,
+        'models': args.models,
+        'backend': args.backend,
+        'emotion_aggregation': args.aggregation
+    }
+    journal = JobJournal(make_job_id(job_config, [file_identity(p) for p in files]))
+
+    resume_from = None
+    if args.resume and journal.is_resumable():
+        resume_from = journal.resume_state()
+        if not args.quiet:
+            print(f"İşe devam ediliyor: {len(resume_from)}/{len(files)} dosya tamamlanmış", file=sys.stderr)
+    else:
+        journal.start(job_config, files)
+
+    pipeline = AnalysisPipeline(
+        [(path, path) for path in files],
+        keywords,
+        args.before,
+        args.after,
+        word_boundary=args.word_boundary,
+        batch_size=args.batch_size,
+        extraction_workers=args.workers,
+        extraction_cache=None if args.no_cache else get_extraction_cache(),
+        use_cache=not args.no_cache,
+        backend=args.backend,
+        models=args.models,
+        emotion_aggregation=args.aggregation,
+        resume_from=resume_from,
+        on_file_complete=journal.record_file,
+        profile=args.profile
+    ).start()
+
+    last_report = 0.0
+    while pipeline.is_running():
+        time.sleep(0.5)
+        if not args.quiet and time.time() - last_report >= 10:
+            last_report = time.time()
+            stats = pipeline.stats()
+            print(
+                f"[{stats['elapsed']:.0f}s] dosya {stats['files_matched']}/{stats['files_total']} "
+                f"eşleşme {stats['matches_analyzed']}/{stats['matches_found']}",
+                file=sys.stderr
+            )
+
+    # Analiz edilemeyen eşleşmesi olan dosyalar --resume ile tekrar denenir
+    if not pipeline.stats()['files_incomplete']:
+        journal.mark_complete()
+
+    store = pipeline.store()
+    stats = pipeline.stats()
+    write_outputs(args.output, store)
+
+    metrics_path = os.path.join(args.output, 'metrics.json')
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        f.write(pipeline.metrics.to_json(job_id=journal.job_id, stats=stats))
+    profile_path = os.path.join(args.output, 'profile.prof')
+    if pipeline.profiler is None or not pipeline.profiler.dump(profile_path):
+        profile_path = None
+
+    # Hatalar eşleşme yokluğundan önce bakılır: tamamen bozulan bir iş
+    # "eşleşme bulunamadı" olarak raporlanmamalı
+    has_errors = bool(pipeline.failed_files or pipeline.errors or stats['files_incomplete'])
+    if has_errors:
+        exit_code = EXIT_PARTIAL if len(store) else EXIT_FAILURE
+    elif stats['matches_found'] == 0:
+        exit_code = EXIT_NO_MATCHES
+    else:
+        exit_code = EXIT_OK
+
+    summary = {
+        'exit_code': exit_code,
+        'job_id': journal.job_id,
+        'journal': journal.path,
+        'resumed_files': len(resume_from or {}),
+        'started_at': started.isoformat(),
+        'finished_at': datetime.now(timezone.utc).isoformat(),
+        'config': {
+            'inputs': args.input,
+            'keywords': keywords,
+            'context_before': args.before,
+            'context_after': args.after,
+            'word_boundary': args.word_boundary,
+            'batch_size': args.batch_size,
+            'workers': args.workers,
+            'backend': args.backend,
+            'models': args.models,
+            'aggregation': args.aggregation,
+            'cache': not args.no_cache,
+            'profile': args.profile,
+            'model_bundle': MODEL_BUNDLE_DIR
+        },
+        'stats': stats,
+        'results': len(store),
+        'failed_files': [{'file': f, 'error': e} for f, e in pipeline.failed_files],
+        'errors': pipeline.errors,
+        'outputs': {
+            'results_jsonl': os.path.join(args.output, 'results.jsonl'),
+            'results_csv': os.path.join(args.output, 'results.csv'),
+            'store': os.path.join(args.output, 'store'),
+            'metrics': metrics_path,
+            'profile': profile_path
+        }
+    }
+
+    summary_path = args.summary or os.path.join(args.output, 'summary.json')
+    if os.path.dirname(summary_path):
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    if not args.quiet:
+        print(
+            f"{len(store)} eşleşme, {len(pipeline.failed_files)} başarısız dosya, "
+            f"{stats['files_skipped']} dosya ön filtreyle atlandı, "
+            f"{stats['elapsed']:.0f}s - özet: {summary_path}",
+            file=sys.stderr
+        )
+
+    return exit_code
+
+def main(argv=None) -> int:
+    # Streamlit önbellek dekoratörleri betik dışında çalışırken uyarı basar
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except KeyboardInterrupt:
+        return EXIT_FAILURE
+    except Exception as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return EXIT_FAILURE
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+CPU inference backend'leri
+
+- pytorch:   Orijinal fp32 PyTorch modeli
+- quantized: torch dynamic int8 quantization (Linear katmanları)
+- onnx:      ONNX grafiği + ONNX Runtime (optimum[onnxruntime] gerekir)
+
+Dönüştürülmüş modeller ilk kullanımda diske yazılır, sonraki açılışlarda
+oradan yüklenir.
+"""
+import os
+import re
+
+from utils.cache import DEFAULT_CACHE_DIR
+
+INFERENCE_BACKENDS = ('pytorch', 'quantized', 'onnx')
+DEFAULT_INFERENCE_BACKEND = os.environ.get('LAIKA_INFERENCE_BACKEND', 'pytorch')
+DEFAULT_BACKEND_DIR = os.path.join(DEFAULT_CACHE_DIR, 'backends')
+
+def _backend_path(model_id: str, revision: str, backend: str) -> str:
+    safe_id = re.sub(r'[^A-Za-z0-9_.-]', '--', model_id)
+    return os.path.join(DEFAULT_BACKEND_DIR, safe_id, revision or 'unknown', backend)
+
+def quantize_model(hf_model, model_id: str, revision: str):
+    """Linear katmanları int8'e çevrilmiş modeli döndür (diskte önbellekli)"""
+    import torch
+
+    path = os.path.join(_backend_path(model_id, revision, 'quantized'), 'model.pt')
+    if os.path.exists(path):
+        return torch.load(path, weights_only=False)
+
+    quantized = torch.quantization.quantize_dynamic(
+        hf_model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(quantized, path)
+    return quantized
+
+def export_onnx_model(model_id: str, revision: str, source: str = None):
+    """
+    Checkpoint'i ONNX'e aktar ve ONNX Runtime modeli olarak yükle (diskte önbellekli)
+
+    source: Dışa aktarılacak checkpoint (hub adı veya model paketindeki dizin; varsayılan model_id)
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "ONNX backend için 'optimum[onnxruntime]' paketi gerekli: "
+            "pip install 'optimum[onnxruntime]'"
+        ) from e
+
+    path = _backend_path(model_id, revision, 'onnx')
+    if os.path.exists(os.path.join(path, 'model.onnx')):
+        return ORTModelForSequenceClassification.from_pretrained(path)
+
+    ort_model = ORTModelForSequenceClassification.from_pretrained(source or model_id, export=True)
+    ort_model.save_pretrained(path)
+    return ort_model
+
+def convert_model(hf_model, model_id: str, backend: str):
+    """
+    Yüklenmiş fp32 HF modelini istenen backend'e çevir
+
+    Returns:
+        HF modeliyle aynı çağrı arayüzüne (model(**encoded), .config) sahip model
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Bilinmeyen backend: {backend}")
+
+    if backend == 'pytorch':
+        return hf_model
+
+    revision = getattr(hf_model.config, '_commit_hash', None)
+
+    if backend == 'quantized':
+        return quantize_model(hf_model, model_id, revision)
+
+    return export_onnx_model(model_id, revision, getattr(hf_model, 'name_or_path', None))
@@ -0,0 +1,233 @@
+"""
+Oturumlar arası dinamik micro-batching
+
+Aynı sunucudaki analistlerin oturumları paylaşılan load_model_* modellerine kendi
+forward pass'lerini gönderir ve birbirini bekler. Zamanlayıcı her model
+(+ backend + seçenekler) için tek bir kuyruk ve dispatcher thread'i tutar:
+istekler ilk bekleyen metinden itibaren en fazla max_wait_ms kadar veya max_batch
+metin birikene kadar toplanır, tek padded batch olarak çalışır ve sonuçlar
+future'lar üzerinden isteklere dağıtılır.
+
+LAIKA_BATCH_SCHEDULER=1 ile run_model_batched zamanlayıcıyı kullanır; bu durumda
+batch boyutunu çağıranın batch_size'ı değil LAIKA_BATCH_MAX_SIZE belirler.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from utils.instrumentation import timed
+
+BATCH_SCHEDULER_ENABLED = os.environ.get('LAIKA_BATCH_SCHEDULER', '0') == '1'
+BATCH_MAX_WAIT_MS = float(os.environ.get('LAIKA_BATCH_MAX_WAIT_MS', 20))
+BATCH_MAX_SIZE = int(os.environ.get('LAIKA_BATCH_MAX_SIZE', 32))
+
+class _Request:
+    """Tek çağrının metinleri; hepsi analiz edilince future tamamlanır"""
+
+    __slots__ = ('future', 'results', 'remaining')
+
+    def __init__(self, size: int):
+        self.future = Future()
+        self.results = [None] * size
+        self.remaining = size
+
+class _Item:
+    __slots__ = ('text', 'request', 'index', 'enqueued_at')
+
+    def __init__(self, text: str, request: _Request, index: int, enqueued_at: float):
+        self.text = text
+        self.request = request
+        self.index = index
+        self.enqueued_at = enqueued_at
+
+class _Lane:
+    """Tek model/backend/seçenek kombinasyonunun kuyruğu ve dispatcher thread'i"""
+
+    def __init__(self, run_batch: Callable, model_key: str, backend: str, options: dict,
+                 max_wait: float, max_batch: int):
+        self.run_batch = run_batch
+        self.model_key = model_key
+        self.backend = backend
+        self.options = options
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.counters = {
+            'requests': 0,
+            'items': 0,
+            'batches': 0,
+            'errors': 0,
+            'max_depth': 0,
+            'wait_s': 0.0
+        }
+        self._thread = threading.Thread(
+            target=self._run, name=f"batch-{model_key}-{backend}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        request = _Request(len(texts))
+        now = time.monotonic()
+        with self.cond:
+            self.pending.extend(_Item(text, request, i, now) for i, text in enumerate(texts))
+            self.counters['requests'] += 1
+            self.counters['max_depth'] = max(self.counters['max_depth'], len(self.pending))
+            self.cond.notify()
+        return request.future
+
+    def _take(self) -> List[_Item]:
+        """
+        Kuyruktan bir batch al (kilit tutulurken çağrılır)
+
+        Birikim max_batch'ten fazlaysa, en eski metni içeren uzunluk grubu seçilir:
+        benzer uzunluklar aynı batch'e düşer (daha az padding) ve hiçbir metin
+        sürekli geride kalmaz.
+        """
+        # Hatası bildirilmiş isteklerin kalan metinleri çalıştırılmaz
+        if any(item.request.future.done() for item in self.pending):
+            self.pending = deque(item for item in self.pending if not item.request.future.done())
+
+        if len(self.pending) <= self.max_batch:
+            batch = list(self.pending)
+            self.pending.clear()
+            return batch
+
+        backlog = list(self.pending)
+        order = sorted(range(len(backlog)), key=lambda i: len(backlog[i].text))
+        oldest = order.index(0)
+        start = min(max(0, oldest - self.max_batch // 2), len(order) - self.max_batch)
+        chosen = set(order[start:start + self.max_batch])
+        self.pending = deque(item for i, item in enumerate(backlog) if i not in chosen)
+        return [backlog[i] for i in sorted(chosen)]
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                # İlk bekleyen metinden itibaren en fazla max_wait kadar biriktir
+                deadline = self.pending[0].enqueued_at + self.max_wait
+                while len(self.pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = self._take()
+            if batch:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_Item]):
+        started = time.monotonic()
+        try:
+            results = self.run_batch(self.model_key, [item.text for item in batch],
+                                     self.backend, self.options)
+        except Exception as e:
+            # Birden fazla isteğin metinleri varsa hatalı metin diğerlerini
+            # düşürmesin: her istek ayrı batch olarak tekrar denenir
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item.request), []).append(item)
+            if len(groups) > 1:
+                for group in groups.values():
+                    self._dispatch(group)
+                return
+            with self.cond:
+                self.counters['errors'] += 1
+            for item in batch:
+                if not item.request.future.done():
+                    item.request.future.set_exception(e)
+            return
+
+        completed = []
+        with self.cond:
+            self.counters['batches'] += 1
+            self.counters['items'] += len(batch)
+            self.counters['wait_s'] += sum(started - item.enqueued_at for item in batch)
+            for item, result in zip(batch, results):
+                request = item.request
+                request.results[item.index] = result
+                request.remaining -= 1
+                if request.remaining == 0:
+                    completed.append(request)
+        for request in completed:
+            if not request.future.done():
+                request.future.set_result(request.results)
+
+    def stats(self) -> dict:
+        with self.cond:
+            counters = dict(self.counters)
+            depth = len(self.pending)
+        batches = counters['batches'] or 1
+        items = counters['items'] or 1
+        return {
+            'queue_depth': depth,
+            'max_depth': counters['max_depth'],
+            'requests': counters['requests'],
+            'items': counters['items'],
+            'batches': counters['batches'],
+            'errors': counters['errors'],
+            'avg_batch': counters['items'] / batches,
+            'avg_wait_ms': counters['wait_s'] / items * 1000
+        }
+
+class MicroBatchScheduler:
+    """Tüm oturumların inference isteklerini model başına batch'leyen zamanlayıcı"""
+
+    def __init__(self, run_batch: Callable[[str, List[str], str, dict], List[dict]],
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, max_batch: int = BATCH_MAX_SIZE):
+        """
+        Args:
+            run_batch: (model anahtarı, metinler, backend, seçenekler) ile tek batch'i
+                analiz eden fonksiyon (dispatcher thread'inden çağrılır)
+            max_wait_ms: İlk bekleyen metinden sonra batch'in dolması için beklenecek süre
+            max_batch: Forward pass başına en fazla metin
+        """
+        self.run_batch = run_batch
+        self.max_wait_ms = max_wait_ms
+        self.max_batch = max(1, int(max_batch))
+        self._lanes: Dict[tuple, _Lane] = {}
+        self._lock = threading.Lock()
+
+    def _lane(self, model_key: str, backend: str, options: dict) -> _Lane:
+        key = (model_key, backend, tuple(sorted(options.items())))
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = _Lane(self.run_batch, model_key, backend, options,
+                             self.max_wait_ms / 1000, self.max_batch)
+                self._lanes[key] = lane
+            return lane
+
+    def submit(self, model_key: str, texts: List[str], backend: str,
+               options: Optional[dict] = None) -> Future:
+        """Metinleri kuyruğa ekle; future girdi sırasıyla sonuç listesini döndürür"""
+        if not texts:
+            future = Future()
+            future.set_result([])
+            return future
+        return self._lane(model_key, backend, options or {}).submit(list(texts))
+
+    def analyze(self, model_key: str, texts: List[str], backend: str,
+                options: Optional[dict] = None) -> List[dict]:
+        """submit + sonucu bekle"""
+        with timed(f"{model_key}_scheduled", items=len(texts)):
+            return self.submit(model_key, texts, backend, options).result()
+
+    def queue_depth(self) -> int:
+        """Tüm kuyruklarda bekleyen metin sayısı"""
+        with self._lock:
+            lanes = list(self._lanes.values())
+        return sum(lane.stats()['queue_depth'] for lane in lanes)
+
+    def stats(self) -> Dict[str, dict]:
+        """Kuyruk başına derinlik, batch ve bekleme metrikleri"""
+        with self._lock:
+            lanes = list(self._lanes.items())
+        return {
+            '/'.join([model_key, backend] + [f"{k}={v}" for k, v in options]): lane.stats()
+            for (model_key, backend, options), lane in lanes
+        }
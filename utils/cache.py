@@ -0,0 +1,292 @@
+"""
+Kalıcı önbellekler
+
+InferenceCache: Model sonuçları (SQLite). Anahtar: (model id, model revizyonu,
+normalize edilmiş context hash'i). Toplam boyut sınırı aşıldığında en uzun süredir
+kullanılmayan kayıtlar silinir (LRU).
+
+ExtractionCache: Dosya içeriği hash'ine göre çıkarılmış metinler. Bellekte sınırlı
+bir LRU katmanı, arkasında sıkıştırılmış disk kopyası.
+
+Önbelleği komut satırından temizlemek için:
+    python -m utils.cache --clear [--model model_3]
+    python -m utils.cache --clear-extractions
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'LAIKA_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'laikaresearch')
+)
+DEFAULT_INFERENCE_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'inference_cache.sqlite')
+DEFAULT_INFERENCE_CACHE_MB = int(os.environ.get('LAIKA_INFERENCE_CACHE_MB', '512'))
+DEFAULT_EXTRACTION_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'extractions')
+DEFAULT_EXTRACTION_MEMORY_MB = int(os.environ.get('LAIKA_EXTRACTION_CACHE_MB', '256'))
+
+# Çıkarma/temizleme mantığı değiştiğinde artırılır
+EXTRACTION_VERSION = 'v2'
+
+# SQLite tek sorguda sınırlı sayıda parametre kabul eder
+_QUERY_CHUNK = 500
+
+class InferenceCache:
+    """Model sonuçlarını diskte saklayan, boyut sınırlı LRU önbellek"""
+
+    def __init__(self, path: str = DEFAULT_INFERENCE_CACHE_PATH,
+                 max_bytes: int = DEFAULT_INFERENCE_CACHE_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                model_id TEXT NOT NULL,
+                revision TEXT NOT NULL,
+                context_hash TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model_id, revision, context_hash)
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON results(last_access)')
+        self._conn.commit()
+
+    def get_many(self, model_id: str, revision: str, hashes: List[str]) -> Dict[str, dict]:
+        """Önbellekte bulunan hash'lerin sonuçlarını döndür"""
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            for i in range(0, len(unique_hashes), _QUERY_CHUNK):
+                chunk = unique_hashes[i:i + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT context_hash, payload FROM results "
+                    f"WHERE model_id = ? AND revision = ? AND context_hash IN ({placeholders})",
+                    [model_id, revision, *chunk]
+                ).fetchall()
+                for context_hash, payload in rows:
+                    found[context_hash] = json.loads(payload)
+
+            # LRU için erişim zamanını güncelle
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE results SET last_access = ? "
+                    "WHERE model_id = ? AND revision = ? AND context_hash = ?",
+                    [(now, model_id, revision, h) for h in found]
+                )
+                self._conn.commit()
+
+            self.hits += sum(1 for h in hashes if h in found)
+            self.misses += sum(1 for h in hashes if h not in found)
+
+        return found
+
+    def put_many(self, model_id: str, revision: str, items: Dict[str, dict]):
+        """Sonuçları kaydet ve gerekirse eski kayıtları sil"""
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for context_hash, result in items.items():
+            payload = json.dumps(result, ensure_ascii=False)
+            rows.append((model_id, revision, context_hash, payload, len(payload), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(model_id, revision, context_hash, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self):
+        """Boyut sınırı aşıldıysa en eski erişilen kayıtları sil (kilit altında çağrılır)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM results ORDER BY last_access"):
+            stale.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self._conn.executemany("DELETE FROM results WHERE rowid = ?", stale)
+        self._conn.commit()
+
+    def clear(self, model_id: Optional[str] = None) -> int:
+        """Önbelleği (veya tek bir modelin kayıtlarını) temizle, silinen kayıt sayısını döndür"""
+        with self._lock:
+            if model_id:
+                cursor = self._conn.execute("DELETE FROM results WHERE model_id = ?", (model_id,))
+            else:
+                cursor = self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self._conn.execute('VACUUM')
+            self.hits = 0
+            self.misses = 0
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Kayıt sayısı, boyut ve hit/miss sayaçları"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+def file_content_hash(filename: str, data: bytes) -> str:
+    """Dosya içeriği + uzantı + çıkarma sürümünden önbellek anahtarı"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{EXTRACTION_VERSION}-{extension}-{digest}"
+
+class ExtractionCache:
+    """Çıkarılmış metinler için bellek bütçeli LRU + disk önbelleği"""
+
+    def __init__(self, directory: str = DEFAULT_EXTRACTION_CACHE_DIR,
+                 max_memory_bytes: int = DEFAULT_EXTRACTION_MEMORY_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[-2:], f"{key}.txt.gz")
+
+    def _remember(self, key: str, text: str):
+        """Bellek katmanına ekle, bütçe aşılırsa en eskileri çıkar (kilit altında)"""
+        size = len(text)
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = text
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    text = f.read()
+            except (OSError, EOFError):
+                text = None
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, text)
+                return text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._remember(key, text)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+            self.memory_hits = self.disk_hits = self.misses = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                os.remove(os.path.join(root, name))
+
+    def stats(self) -> dict:
+        return {
+            'memory_entries': len(self._memory),
+            'memory_bytes': self.memory_bytes,
+            'max_memory_bytes': self.max_memory_bytes,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference önbelleği yönetimi")
+    parser.add_argument('--path', default=DEFAULT_INFERENCE_CACHE_PATH)
+    parser.add_argument('--clear', action='store_true', help="Önbelleği temizle")
+    parser.add_argument('--model', default=None, help="Sadece bu modelin kayıtlarını temizle (ör. model_3)")
+    parser.add_argument('--clear-extractions', action='store_true', help="Metin çıkarma önbelleğini temizle")
+    args = parser.parse_args()
+
+    if args.clear_extractions:
+        ExtractionCache().clear()
+        print("Metin çıkarma önbelleği temizlendi")
+
+    cache = InferenceCache(args.path)
+
+    if args.clear:
+        model_id = None
+        if args.model:
+            # Model anahtarı (model_1) veya hub adı kabul edilir
+            from utils.models import MODEL_IDS
+            model_id = MODEL_IDS.get(args.model, args.model)
+        removed = cache.clear(model_id)
+        print(f"{removed} kayıt silindi")
+
+    print(json.dumps(cache.stats(), indent=2))
+
+if __name__ == '__main__':
+    main()
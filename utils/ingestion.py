@@ -0,0 +1,161 @@
+"""
+Yüklenen dosyalardan paralel metin çıkarma
+
+PDF ayrıştırma CPU'ya bağlı olduğu için dosyalar bir process havuzunda işlenir.
+Sonuçlar tamamlandıkça (dosya indeksiyle) döner. Önbellek verilirse daha önce
+çıkarılmış dosyalar (içerik hash'ine göre) yeniden ayrıştırılmaz.
+
+Dosya içeriği bytes veya disk yolu (str) olarak verilebilir; yol verilirse dosya
+ancak işleneceği zaman okunur.
+"""
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, List, Optional, Tuple, Union
+
+import streamlit as st
+
+from utils.cache import ExtractionCache, file_content_hash
+from utils.instrumentation import METRICS, current_metrics
+from utils.text_processor import (
+    get_file_extension,
+    decode_text_bytes,
+    extract_paragraphs_from_docx,
+    extract_pages_from_pdf,
+    iter_text_blocks,
+    clean_text
+)
+
+DEFAULT_EXTRACTION_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+@st.cache_resource
+def get_extraction_cache() -> ExtractionCache:
+    """Tüm oturumların paylaştığı metin çıkarma önbelleği"""
+    return ExtractionCache()
+
+def extract_chunks_from_bytes(filename: str, data: bytes) -> List[str]:
+    """
+    Dosya içeriğinden uzantıya göre metin parçaları çıkar
+
+    PDF'ler sayfa, DOCX'ler paragraf, TXT'ler satır sonlarında bölünmüş bloklar
+    olarak döner; cümle bölme bu parçalar üzerinden akışlı yapılır.
+
+    Raises:
+        ValueError: Desteklenmeyen dosya tipi
+    """
+    file_extension = get_file_extension(filename)
+
+    if file_extension == 'docx':
+        return extract_paragraphs_from_docx(io.BytesIO(data))
+    elif file_extension == 'pdf':
+        return extract_pages_from_pdf(io.BytesIO(data))
+    elif file_extension == 'txt':
+        return list(iter_text_blocks(decode_text_bytes(data)))
+
+    raise ValueError(f"Desteklenmeyen dosya tipi: .{file_extension}")
+
+def read_file_data(data: Union[bytes, str]) -> bytes:
+    """Bytes ise olduğu gibi, yol ise diskten okuyarak dosya içeriğini döndür"""
+    if isinstance(data, str):
+        with open(data, 'rb') as f:
+            return f.read()
+    return data
+
+def extract_and_clean(filename: str, data: Union[bytes, str]) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Tek dosyayı işle (worker process içinde çalışır)
+
+    Returns:
+        (temizlenmiş, boş olmayan metin parçaları, None) veya (None, hata mesajı)
+    """
+    try:
+        data = read_file_data(data)
+        chunks = [clean_text(chunk) for chunk in extract_chunks_from_bytes(filename, data)]
+    except Exception as e:
+        return None, str(e)
+
+    chunks = [chunk for chunk in chunks if chunk]
+    if not chunks:
+        return None, "Boş dosya"
+
+    return chunks, None
+
+def _extract_in_worker(filename: str, data: Union[bytes, str]):
+    """extract_and_clean + worker process'te biriken aşama ölçümleri"""
+    outcome = extract_and_clean(filename, data)
+    return outcome, METRICS.drain()
+
+def iter_extracted(files: List[Tuple[str, Union[bytes, str]]],
+                   max_workers: int = DEFAULT_EXTRACTION_WORKERS,
+                   cache: Optional[ExtractionCache] = None,
+                   max_in_flight: Optional[int] = None) -> Iterator[Tuple[int, Optional[List[str]], Optional[str]]]:
+    """
+    Dosyaları bittikçe (tamamlanma sırasıyla) döndüren metin çıkarma akışı
+
+    Havuzda aynı anda en fazla max_in_flight dosya bekler; tüketici yavaşsa
+    yeni dosya gönderilmez (back-pressure).
+
+    Önbellek parçaları '\n' ile birleştirilmiş tek metin olarak saklar
+    (temizlenmiş parçalarda satır sonu kalmaz).
+
+    Yields:
+        (dosya indeksi, temizlenmiş metin parçaları veya None, hata veya None)
+    """
+    keys = [None] * len(files)
+    pending = []
+
+    # Önce önbellekte ara
+    for idx, (filename, data) in enumerate(files):
+        if cache is not None:
+            try:
+                keys[idx] = file_content_hash(filename, read_file_data(data))
+            except OSError as e:
+                yield idx, None, str(e)
+                continue
+            text = cache.get(keys[idx])
+            if text is not None:
+                yield idx, text.split('\n'), None
+                continue
+        pending.append(idx)
+
+    def finish(idx, outcome):
+        chunks, error = outcome
+        if cache is not None and error is None:
+            cache.put(keys[idx], '\n'.join(chunks))
+        return idx, chunks, error
+
+    if max_workers <= 1 or len(pending) <= 1:
+        for idx in pending:
+            yield finish(idx, extract_and_clean(*files[idx]))
+        return
+
+    max_in_flight = max_in_flight or max_workers * 2
+
+    # Streamlit sunucusu çok thread'li olduğu için fork yerine spawn
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        queue = iter(pending)
+        in_flight = {}
+
+        def submit_next():
+            idx = next(queue, None)
+            if idx is not None:
+                in_flight[executor.submit(_extract_in_worker, *files[idx])] = idx
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while in_flight:
+            completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                idx = in_flight.pop(future)
+                try:
+                    outcome, worker_metrics = future.result()
+                    # Worker'daki ölçümler çağıran thread'in kaydına eklenir
+                    current_metrics().merge(worker_metrics)
+                except Exception as e:
+                    # Worker process çökmesi vb.
+                    outcome = (None, str(e))
+                submit_next()
+                yield finish(idx, outcome)
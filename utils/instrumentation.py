@@ -0,0 +1,239 @@
+"""
+Hafif aşama ölçümü (zamanlayıcı + sayaç) ve isteğe bağlı profilleme
+
+text_processor ve models içindeki her aşama `with timed('aşama', items=n):` ile
+sarılır. Ölçümler o thread'de etkin olan StageMetrics'e yazılır; pipeline kendi
+thread'lerinde kendi örneğini etkinleştirir, böylece aynı anda çalışan işler
+birbirine karışmaz. Etkin örnek yoksa süreç geneli METRICS kullanılır.
+
+Çıkarma worker process'lerindeki ölçümler drain() ile toplanıp ana süreçte
+merge() ile birleştirilir.
+
+İç içe aşamalar (ör. extract_pdf içindeki pdf_page) kendi satırlarında sayılır ama
+pay (share) paydasına sadece en dıştaki aşamaların süresi girer; böylece en dış
+aşamaların payları toplamı 1'dir.
+
+LAIKA_METRICS=0 ile ölçüm tamamen kapatılabilir; LAIKA_PROFILE=1 yeni işlerin
+varsayılan olarak cProfile altında çalışmasını sağlar.
+"""
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+METRICS_ENABLED = os.environ.get('LAIKA_METRICS', '1') != '0'
+PROFILING_DEFAULT = os.environ.get('LAIKA_PROFILE', '0') == '1'
+
+# Yüzdelikler için aşama başına tutulan son ölçüm sayısı
+LATENCY_WINDOW = 4096
+
+class _Stage:
+    """Tek aşamanın birikmiş değerleri"""
+
+    __slots__ = ('calls', 'seconds', 'outer_seconds', 'items', 'latencies')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        # Başka bir aşamanın içinde olmadan geçen süre
+        self.outer_seconds = 0.0
+        self.items = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """En yakın sıra yöntemiyle yüzdelik (sıralı liste)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class StageMetrics:
+    """Aşama bazında toplam süre, çağrı/öğe sayısı ve gecikme dağılımı"""
+
+    def __init__(self):
+        self._stages: Dict[str, _Stage] = {}
+        self._lock = threading.Lock()
+        self.created_at = time.time()
+
+    def record(self, name: str, seconds: float, items: int = 1, nested: bool = False):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = _Stage()
+            stage.calls += 1
+            stage.seconds += seconds
+            if not nested:
+                stage.outer_seconds += seconds
+            stage.items += items
+            stage.latencies.append(seconds)
+
+    def drain(self) -> dict:
+        """Ham ölçümleri döndür ve sıfırla (worker process'ten ana sürece taşımak için)"""
+        with self._lock:
+            stages, self._stages = self._stages, {}
+        return {
+            name: (s.calls, s.seconds, s.outer_seconds, s.items, list(s.latencies))
+            for name, s in stages.items()
+        }
+
+    def merge(self, raw: dict):
+        """drain() çıktısını bu örneğe ekle"""
+        with self._lock:
+            for name, (calls, seconds, outer_seconds, items, latencies) in raw.items():
+                stage = self._stages.get(name)
+                if stage is None:
+                    stage = self._stages[name] = _Stage()
+                stage.calls += calls
+                stage.seconds += seconds
+                stage.outer_seconds += outer_seconds
+                stage.items += items
+                stage.latencies.extend(latencies)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self.created_at = time.time()
+
+    def snapshot(self) -> List[dict]:
+        """
+        Aşama başına özet, toplam süreye göre azalan
+
+        Paralel worker'lardaki süreler toplandığı için toplam süre duvar saatini
+        aşabilir. share, aşamanın süresinin en dış aşamaların toplam süresine
+        oranıdır; iç aşamalar (nested, ör. extract_pdf içindeki pdf_page) paydaya
+        girmez, kapsayan aşamanın payının bir parçasıdır.
+        """
+        with self._lock:
+            stages = [(name, s.calls, s.seconds, s.outer_seconds, s.items, sorted(s.latencies))
+                      for name, s in self._stages.items()]
+
+        total = sum(outer for _, _, _, outer, _, _ in stages) or 1.0
+        rows = [
+            {
+                'stage': name,
+                'calls': calls,
+                'total_s': seconds,
+                'share': seconds / total,
+                'nested': outer == 0,
+                'p50_ms': _percentile(latencies, 0.50) * 1000,
+                'p95_ms': _percentile(latencies, 0.95) * 1000,
+                'items': items,
+                'items_per_s': items / seconds if seconds > 0 else 0.0
+            }
+            for name, calls, seconds, outer, items, latencies in stages
+        ]
+        return sorted(rows, key=lambda row: row['total_s'], reverse=True)
+
+    def to_json(self, **extra) -> str:
+        return json.dumps({
+            'created_at': self.created_at,
+            'exported_at': time.time(),
+            **extra,
+            'stages': self.snapshot()
+        }, ensure_ascii=False, indent=2)
+
+# Süreç geneli varsayılan kayıt
+METRICS = StageMetrics()
+
+_active = threading.local()
+
+def current_metrics() -> StageMetrics:
+    """Bu thread'de etkin ölçüm kaydı"""
+    return getattr(_active, 'metrics', None) or METRICS
+
+@contextmanager
+def use_metrics(metrics: StageMetrics):
+    """Bu thread'deki ölçümleri verilen kayda yönlendir"""
+    previous = getattr(_active, 'metrics', None)
+    _active.metrics = metrics
+    try:
+        yield metrics
+    finally:
+        _active.metrics = previous
+
+class _Timer:
+    __slots__ = ('items',)
+
+    def __init__(self, items: int):
+        self.items = items
+
+@contextmanager
+def timed(name: str, items: int = 1):
+    """
+    Bloğun süresini aşama olarak kaydet
+
+    Öğe sayısı blok içinde belli oluyorsa dönen nesnenin items alanı güncellenebilir:
+
+        with timed('split_into_sentences') as t:
+            sentences = ...
+            t.items = len(sentences)
+
+    Blok hata verirse ölçüm kaydedilmez. Aynı thread'de başka bir timed bloğunun
+    içindeyse aşama iç aşama olarak kaydedilir.
+    """
+    timer = _Timer(items)
+    if not METRICS_ENABLED:
+        yield timer
+        return
+    depth = getattr(_active, 'depth', 0)
+    _active.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        _active.depth = depth
+    current_metrics().record(name, time.perf_counter() - start, timer.items, nested=depth > 0)
+
+class ThreadProfiler:
+    """
+    Birden çok thread'i cProfile ile profille ve tek bir .prof dosyasına yaz
+
+    cProfile sadece başlatıldığı thread'i izlediği için her thread kendi
+    profiliyle çalıştırılır; dump() hepsini birleştirir. Python 3.12+'da profil
+    süreç genelidir ve ikinci bir profil başlatılamaz; o thread'ler zaten etkin
+    olan profile düşer.
+    """
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def wrap(self, target: Callable) -> Callable:
+        def run(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                return target(*args, **kwargs)
+            try:
+                return target(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._profiles.append(profile)
+        return run
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump(self, path: str) -> bool:
+        """snakeviz / pstats ile açılabilecek dosyaya yaz; profil yoksa False"""
+        stats = self.stats()
+        if stats is None:
+            return False
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        stats.dump_stats(path)
+        return True
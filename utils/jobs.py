@@ -0,0 +1,142 @@
+"""
+Streamlit betik çalıştırmasından bağımsız arka plan analiz işleri
+
+Streamlit her widget etkileşiminde betiği baştan çalıştırır; analiz betik içinde
+çalışırsa yarıda kesilir. Bunun yerine pipeline süreç genelindeki JobManager'a
+bir job id ile teslim edilir, betik her çalıştırmada sadece durumunu okur.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+from utils.journal import JobJournal
+from utils.pipeline import AnalysisPipeline
+from utils.result_store import ResultStore, DEFAULT_RESULTS_DIR
+
+# İş durumları
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+
+class BackgroundJob:
+    """Arka planda çalışan tek bir analiz işi"""
+
+    def __init__(self, job_id: str, pipeline: AnalysisPipeline,
+                 journal: Optional[JobJournal] = None, cache_hits_start: int = 0):
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.journal = journal
+        self.cache_hits_start = cache_hits_start
+        self.submitted_at = time.time()
+        self.status = JOB_RUNNING
+        self._cancelled = False
+        self._watcher = threading.Thread(target=self._watch, name=f"job-{job_id}", daemon=True)
+
+    @property
+    def results_dir(self) -> str:
+        return os.path.join(DEFAULT_RESULTS_DIR, self.job_id)
+
+    @property
+    def metrics_path(self) -> str:
+        return os.path.join(self.results_dir, 'metrics.json')
+
+    @property
+    def profile_path(self) -> str:
+        return os.path.join(self.results_dir, 'profile.prof')
+
+    def save_metrics(self):
+        """Aşama süreleri (JSON) ve profilleme açıksa cProfile çıktısı"""
+        os.makedirs(self.results_dir, exist_ok=True)
+        with open(self.metrics_path, 'w', encoding='utf-8') as f:
+            f.write(self.pipeline.metrics.to_json(job_id=self.job_id, stats=self.pipeline.stats()))
+        if self.pipeline.profiler is not None:
+            self.pipeline.profiler.dump(self.profile_path)
+
+    def _watch(self):
+        self.pipeline.join()
+        # İptal edilen iş günlükte yarım kalır, sonradan devam ettirilebilir
+        if not self._cancelled:
+            try:
+                self.store().save(self.results_dir)
+                self.save_metrics()
+                # Tekrar denenecek dosya varsa iş devam ettirilebilir kalır
+                if self.journal is not None and not self.pipeline.stats()['files_incomplete']:
+                    self.journal.mark_complete()
+            except Exception as e:
+                self.pipeline.errors.append(f"Sonuçlar diske yazılamadı: {e}")
+        # Biten iş yönetici listesinde kalır; bellekte sadece sonuç deposu tutulur
+        self.pipeline.release()
+        self.status = JOB_CANCELLED if self._cancelled else JOB_DONE
+
+    def start(self):
+        self.pipeline.start()
+        self._watcher.start()
+        return self
+
+    def is_running(self) -> bool:
+        return self.status == JOB_RUNNING
+
+    def cancel(self):
+        self._cancelled = True
+        self.pipeline.cancel()
+
+    def store(self) -> ResultStore:
+        """Tamamlanan dosyaların sonuçları (yeni dosya bitmediyse aynı depo)"""
+        return self.pipeline.store()
+
+class JobManager:
+    """Süreç genelinde çalışan ve biten işlerin kaydı"""
+
+    def __init__(self, max_finished: int = 8):
+        self.max_finished = max_finished
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str, pipeline: AnalysisPipeline,
+               journal: Optional[JobJournal] = None, cache_hits_start: int = 0,
+               prepare: Optional[Callable[[], None]] = None) -> BackgroundJob:
+        """
+        Pipeline'ı arka planda başlat
+
+        Aynı id ile çalışan bir iş varsa yenisi başlatılmaz, mevcut iş döner.
+        prepare (ör. journal.start) sadece yeni iş başlatılacaksa, kilit altında
+        çağrılır; böylece başka bir oturum çalışan işin günlüğünü sıfırlayamaz.
+        """
+        with self._lock:
+            existing = self._jobs.get(job_id)
+            if existing is not None and existing.is_running():
+                return existing
+            if prepare is not None:
+                prepare()
+            job = BackgroundJob(job_id, pipeline, journal, cache_hits_start)
+            self._jobs[job_id] = job
+            self._prune()
+        return job.start()
+
+    def _prune(self):
+        """En eski biten işleri bellekten at (sonuçları günlükte kalır)"""
+        finished = [job for job in self._jobs.values() if not job.is_running()]
+        finished.sort(key=lambda job: job.submitted_at)
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: Optional[str]) -> Optional[BackgroundJob]:
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or not job.is_running():
+            return False
+        job.cancel()
+        return True
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Tüm oturumların paylaştığı iş yöneticisi"""
+    return JobManager()
@@ -0,0 +1,168 @@
+"""
+Devam ettirilebilir analiz işleri için disk günlüğü (journal)
+
+Her iş, yapılandırma + dosya kimliklerinden türetilen bir job id ile tanımlanır.
+Günlük satır başına bir JSON kaydı tutar:
+
+    {"type": "header", "job_id": ..., "config": {...}, "files": [...]}
+    {"type": "file", "file_idx": 3, "filename": ..., "results": [...], "error": null}
+    {"type": "file", "file_idx": 4, "filename": ..., "results": [], "error": ..., "retry": true}
+    {"type": "complete"}
+
+Yarım kalmış bir işte tamamlanan dosyalar resume_from olarak pipeline'a verilir.
+Bellekte sadece dosya başına hata ve eşleşme sayısı tutulur; sonuçlar gerektiğinde
+diskten okunur. retry kaydı olan dosyalar (ör. model hatası) tamamlanmış sayılmaz, devamda tekrar işlenir.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from utils.cache import DEFAULT_CACHE_DIR
+
+DEFAULT_JOURNAL_DIR = os.path.join(DEFAULT_CACHE_DIR, 'jobs')
+
+def make_job_id(config: dict, file_ids: List[str]) -> str:
+    """Aynı yapılandırma ve aynı dosyalar için aynı id"""
+    payload = json.dumps({'config': config, 'files': file_ids}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+class JobJournal:
+    """Tamamlanan dosyaların sonuçlarını ekleyerek yazan iş günlüğü"""
+
+    def __init__(self, job_id: str, directory: str = DEFAULT_JOURNAL_DIR):
+        self.job_id = job_id
+        self.path = os.path.join(directory, f"{job_id}.jsonl")
+        self.header = None
+        self.completed = {}
+        self.is_complete = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    record = None
+                if record is None or not line.endswith(b'\n'):
+                    # Çökme anında yarım yazılmış son satır; yeni kayıtlar
+                    # ona eklenmesin diye dosyayı son sağlam satırda kes
+                    with open(self.path, 'r+b') as out:
+                        out.truncate(valid_bytes)
+                    break
+                valid_bytes += len(line)
+                if record['type'] == 'header':
+                    self.header = record
+                elif record['type'] == 'file' and record.get('retry'):
+                    self.completed.pop(record['file_idx'], None)
+                elif record['type'] == 'file':
+                    self.completed[record['file_idx']] = {
+                        'matches': len(record['results']),
+                        'error': record.get('error')
+                    }
+                elif record['type'] == 'complete':
+                    self.is_complete = True
+
+    def exists(self) -> bool:
+        return self.header is not None
+
+    def is_resumable(self) -> bool:
+        """Başlamış ama bitmemiş iş"""
+        return self.exists() and not self.is_complete
+
+    def _append(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, config: dict, filenames: List[str]):
+        """Yeni iş başlat (varsa eski günlüğü siler)"""
+        self.reset()
+        self.header = {
+            'type': 'header',
+            'job_id': self.job_id,
+            'created_at': time.time(),
+            'config': config,
+            'files': filenames
+        }
+        self._append(self.header)
+
+    def record_file(self, file_idx: int, filename: str, results: List[dict], error: Optional[str] = None,
+                    retry: bool = False):
+        """
+        Tamamlanan dosyanın sonuçlarını ekle
+
+        retry=True ise dosya tamamlanmış sayılmaz; kısmi sonuçlar yazılmaz, devamda
+        tüm eşleşmeler tekrar analiz edilir (başarılı olanlar inference önbelleğinden gelir).
+        """
+        record = {
+            'type': 'file',
+            'file_idx': file_idx,
+            'filename': filename,
+            'results': [] if retry else results,
+            'error': error
+        }
+        if retry:
+            record['retry'] = True
+        self._append(record)
+        with self._lock:
+            if retry:
+                self.completed.pop(file_idx, None)
+            else:
+                self.completed[file_idx] = {'matches': len(results), 'error': error}
+
+    def mark_complete(self):
+        self._append({'type': 'complete', 'finished_at': time.time()})
+        self.is_complete = True
+
+    def reset(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.header = None
+            self.completed = {}
+            self.is_complete = False
+
+    def _read_files(self) -> Dict[int, dict]:
+        """Tamamlanmış dosyaların kayıtları sonuçlarıyla birlikte (diskten)"""
+        files = {}
+        with self._lock:
+            if not os.path.exists(self.path):
+                return files
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line.decode('utf-8'))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        break
+                    if record['type'] != 'file':
+                        continue
+                    if record.get('retry'):
+                        files.pop(record['file_idx'], None)
+                    else:
+                        files[record['file_idx']] = {
+                            'results': record['results'],
+                            'error': record.get('error')
+                        }
+        return files
+
+    def resume_state(self) -> Dict[int, dict]:
+        """Pipeline'a resume_from olarak verilecek tamamlanmış dosyalar"""
+        return self._read_files()
+
+    def results(self) -> List[dict]:
+        """Günlükteki tüm sonuçlar, dosya ve cümle sırasıyla"""
+        ordered = sorted(self._read_files().items())
+        return [r for _, record in ordered for r in record['results']]
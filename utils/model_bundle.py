@@ -0,0 +1,260 @@
+"""
+Çevrimdışı model paketi
+
+load_model_* modelleri hub adıyla çözer; internet erişimi olmayan sunucularda bu
+her soğuk açılışta zaman aşımına düşen ağ denemeleri demektir. Paket, modelleri
+sabitlenmiş revizyonlarıyla tek bir dizinde toplar:
+
+    <paket>/manifest.json             model anahtarı -> hub adı, revizyon, dosya boyut/hash'leri
+    <paket>/model_1/config.json
+    <paket>/model_1/model.safetensors  ağırlıklar (mmap ile yüklenir, kopyalanmaz)
+    <paket>/model_1/tokenizer.json     hızlı tokenizer (açılışta vocab'dan dönüştürülmez)
+    ...
+
+LAIKA_MODEL_BUNDLE=<paket dizini> verildiğinde modeller sadece paketten yüklenir,
+Hugging Face Hub çevrimdışı moda alınır ve önbellek anahtarları paketteki
+revizyonu kullanır (hub'dan yüklenen aynı revizyonla aynı anahtarlar).
+
+Paketi internet erişimi olan bir makinede oluşturup kopyalamak için (repo kökünden):
+    python -m utils.model_bundle build paket/ [--revision model_2=<commit>]
+    python -m utils.model_bundle verify paket/ [--full] [--load]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+MODEL_BUNDLE_DIR = os.environ.get('LAIKA_MODEL_BUNDLE') or None
+MANIFEST_NAME = 'manifest.json'
+# Paket yapısı değiştiğinde artırılır
+BUNDLE_FORMAT = 1
+
+# huggingface_hub ayarları import sırasında okunur; transformers modeller yüklenirken
+# import edildiği için burada ayarlamak yeterli
+if MODEL_BUNDLE_DIR:
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+class ModelBundleError(Exception):
+    """Paket eksik, bozuk veya istenen modeli içermiyor"""
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=8)
+def load_manifest(bundle_dir: str) -> dict:
+    """Paketin manifest'ini oku (süreç başına bir kez)"""
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ModelBundleError(f"Model paketi bulunamadı: {path}") from None
+    except json.JSONDecodeError as e:
+        raise ModelBundleError(f"Model paketi manifest'i okunamadı: {path} ({e})") from None
+
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ModelBundleError(
+            f"Desteklenmeyen paket biçimi: {manifest.get('format')} (beklenen {BUNDLE_FORMAT})"
+        )
+    return manifest
+
+def verify_bundle(bundle_dir: str, full: bool = False,
+                  model_keys: Optional[List[str]] = None) -> List[str]:
+    """
+    Paket dosyalarını manifest'e göre kontrol et
+
+    Args:
+        bundle_dir: Paket dizini
+        full: Boyutun yanında sha256 da kontrol edilir (yavaş; yükleme yolunda kullanılmaz)
+        model_keys: Sadece bu modeller (None: hepsi)
+
+    Returns:
+        Bulunan sorunlar (boşsa paket sağlam)
+    """
+    manifest = load_manifest(bundle_dir)
+    problems = []
+    for key, entry in manifest['models'].items():
+        if model_keys is not None and key not in model_keys:
+            continue
+        for name, info in entry['files'].items():
+            path = os.path.join(bundle_dir, entry['path'], name)
+            if not os.path.exists(path):
+                problems.append(f"{key}: {name} eksik")
+            elif os.path.getsize(path) != info['bytes']:
+                problems.append(f"{key}: {name} boyutu farklı")
+            elif full and _sha256(path) != info['sha256']:
+                problems.append(f"{key}: {name} hash'i farklı")
+    return problems
+
+def resolve_model(model_key: str, model_id: str,
+                  bundle_dir: Optional[str] = MODEL_BUNDLE_DIR) -> Tuple[str, Optional[str]]:
+    """
+    Modelin yükleneceği kaynak
+
+    Returns:
+        (from_pretrained'e verilecek hub adı veya paket dizini, sabit revizyon veya None)
+
+    Raises:
+        ModelBundleError: Paket verilmiş ama model yok veya dosyaları eksik (hub'a düşülmez)
+    """
+    if not bundle_dir:
+        return model_id, None
+
+    entry = load_manifest(bundle_dir)['models'].get(model_key)
+    if entry is None:
+        raise ModelBundleError(f"Model paketinde {model_key} yok: {bundle_dir}")
+    if entry['model_id'] != model_id:
+        raise ModelBundleError(
+            f"Paketteki {model_key} farklı bir model: {entry['model_id']} (beklenen {model_id})"
+        )
+    problems = verify_bundle(bundle_dir, model_keys=[model_key])
+    if problems:
+        raise ModelBundleError(f"Model paketi bozuk ({bundle_dir}): " + ', '.join(problems))
+
+    return os.path.join(bundle_dir, entry['path']), entry['revision']
+
+def pin_revision(hf_model, revision: Optional[str]):
+    """
+    Paketten yüklenen modele paketteki revizyonu yaz
+
+    Yerel dizinden yüklenen config'de commit hash'i olmaz; önbellek anahtarları ve
+    backend dosyaları (utils.backends) bu alanı kullanır.
+    """
+    if revision:
+        hf_model.config._commit_hash = revision
+    return hf_model
+
+def build_bundle(bundle_dir: str, models: Dict[str, str],
+                 revisions: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Modelleri hub'dan indirip pakete yaz (internet erişimi gerekir)
+
+    Args:
+        bundle_dir: Hedef dizin (varsa modeller üzerine yazılır)
+        models: Model anahtarı -> hub adı
+        revisions: Model anahtarı -> commit; verilmeyenler için hub'daki güncel
+            commit çözülüp sabitlenir
+
+    Returns:
+        Yazılan manifest
+    """
+    import transformers
+    from huggingface_hub import HfApi
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    revisions = revisions or {}
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'transformers': transformers.__version__,
+        'models': {}
+    }
+
+    for key, model_id in models.items():
+        revision = revisions.get(key) or HfApi().model_info(model_id).sha
+        target = os.path.join(bundle_dir, key)
+        os.makedirs(target, exist_ok=True)
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_id, revision=revision)
+        model.save_pretrained(target)
+        if not any(name.endswith('.safetensors') for name in os.listdir(target)):
+            raise ModelBundleError(f"{model_id} safetensors olarak kaydedilemedi")
+
+        # save_pretrained hızlı tokenizer'ı tokenizer.json olarak yazar
+        tokenizer = AutoTokenizer.from_pretrained(model_id, revision=revision, use_fast=True)
+        if not tokenizer.is_fast:
+            raise ModelBundleError(f"{model_id} için hızlı tokenizer yok")
+        tokenizer.save_pretrained(target)
+
+        manifest['models'][key] = {
+            'model_id': model_id,
+            'revision': revision,
+            'path': key,
+            'files': {
+                name: {
+                    'bytes': os.path.getsize(os.path.join(target, name)),
+                    'sha256': _sha256(os.path.join(target, name))
+                }
+                for name in sorted(os.listdir(target))
+            }
+        }
+        print(f"{key}: {model_id}@{revision}")
+
+    # Yarım kalan paket sağlam görünmesin: manifest en son ve atomik yazılır
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    load_manifest.cache_clear()
+    return manifest
+
+def _parse_revisions(values: List[str]) -> Dict[str, str]:
+    revisions = {}
+    for value in values:
+        key, sep, revision = value.partition('=')
+        if not sep or not revision:
+            raise SystemExit(f"Geçersiz --revision: {value} (beklenen model_1=<commit>)")
+        revisions[key] = revision
+    return revisions
+
+def main():
+    from utils.models import MODEL_IDS
+
+    parser = argparse.ArgumentParser(description="Çevrimdışı model paketi")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Modelleri indirip paket oluştur")
+    build.add_argument('bundle_dir')
+    build.add_argument('--models', nargs='+', default=list(MODEL_IDS), choices=list(MODEL_IDS))
+    build.add_argument('--revision', action='append', default=[],
+                       help="Sabitlenecek commit (ör. model_2=<commit>); tekrarlanabilir")
+
+    verify = commands.add_parser('verify', help="Paket dosyalarını kontrol et")
+    verify.add_argument('bundle_dir')
+    verify.add_argument('--full', action='store_true', help="sha256 hash'lerini de kontrol et")
+    verify.add_argument('--load', action='store_true', help="Modelleri paketten yükleyip süreyi ölç")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_bundle(args.bundle_dir, {key: MODEL_IDS[key] for key in args.models},
+                     _parse_revisions(args.revision))
+        print(f"Paket yazıldı: {args.bundle_dir}")
+        return
+
+    try:
+        problems = verify_bundle(args.bundle_dir, full=args.full)
+    except ModelBundleError as e:
+        raise SystemExit(str(e))
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise SystemExit(1)
+
+    manifest = load_manifest(args.bundle_dir)
+    for key, entry in manifest['models'].items():
+        print(f"{key}: {entry['model_id']}@{entry['revision']}")
+
+    if args.load:
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        for key, entry in manifest['models'].items():
+            path = os.path.join(args.bundle_dir, entry['path'])
+            start = time.perf_counter()
+            AutoTokenizer.from_pretrained(path, local_files_only=True)
+            AutoModelForSequenceClassification.from_pretrained(path, local_files_only=True)
+            print(f"{key}: {time.perf_counter() - start:.2f} s")
+
+    print("Paket sağlam")
+
+if __name__ == '__main__':
+    main()
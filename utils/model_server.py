@@ -0,0 +1,361 @@
+"""
+Paylaşılan model sunucusu
+
+`@st.cache_resource` modelleri her süreçte bir kez yükler; modeli kullanan her yeni
+process (toplu işler, worker'lar) üç checkpoint'i yeniden yükler. Model sunucusu
+modelleri tek bir ayrı process'te yükler; oturumlar, pipeline thread'leri ve alt
+process'ler batch'lerini ona multiprocessing bağlantısı üzerinden gönderir.
+
+Sunucu sınırlı bir istek kuyruğu tutar (doluysa istemcinin gönderimi bekler) ve o
+anda kuyrukta bekleyen istekleri toplar: aynı model/backend/seçenekleri isteyen
+farklı kullanıcıların metinleri aynı forward pass'lerde çalışır.
+
+LAIKA_MODEL_SERVER=1 ile run_model_batched modelleri yerelde yüklemek yerine
+sunucuyu kullanır. Sunucuyu başlatan sürecin alt process'leri adresi ortam
+değişkeninden alıp aynı sunucuya bağlanır.
+"""
+import itertools
+import multiprocessing
+import os
+import queue
+import secrets
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional
+
+import streamlit as st
+
+from utils.backends import DEFAULT_INFERENCE_BACKEND
+from utils.instrumentation import timed
+
+MODEL_SERVER_ENABLED = os.environ.get('LAIKA_MODEL_SERVER', '0') == '1'
+MODEL_SERVER_QUEUE_SIZE = int(os.environ.get('LAIKA_MODEL_SERVER_QUEUE', 64))
+MODEL_SERVER_MAX_BATCH = int(os.environ.get('LAIKA_MODEL_SERVER_MAX_BATCH', 64))
+MODEL_SERVER_TIMEOUT = float(os.environ.get('LAIKA_MODEL_SERVER_TIMEOUT', 600))
+
+# Alt process'lerin bağlanacağı sunucu (sunucuyu başlatan süreç yazar)
+_ENV_ADDRESS = 'LAIKA_MODEL_SERVER_ADDRESS'
+_ENV_AUTHKEY = 'LAIKA_MODEL_SERVER_AUTHKEY'
+
+# Sunucu process'inin bağlantı adresini bildirmesi için süre (modeller sonra yüklenir)
+_STARTUP_TIMEOUT = 60
+
+REQUEST_KINDS = ('analyze', 'revision', 'stats')
+
+class ModelServerError(RuntimeError):
+    """Model sunucusuna ulaşılamadı veya istek sunucuda başarısız oldu"""
+
+# Sunucu tarafı (ayrı process)
+
+class _Channel:
+    """Tek istemci bağlantısı; yanıtlar gönderilirken kilitlenir"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def send(self, message: dict):
+        with self.lock:
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                # İstemci bağlantıyı kapatmış
+                pass
+
+class _ServerStats:
+    """Sunucu sayaçları; inference döngüsü günceller, okuyucu thread'ler okur"""
+
+    def __init__(self, requests: queue.Queue):
+        self._requests = requests
+        self._counts = {'requests': 0, 'texts': 0, 'model_calls': 0, 'merged_requests': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self._counts[name] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {**counts, 'queue_depth': self._requests.qsize(), 'pid': os.getpid()}
+
+def _read_client(channel: _Channel, requests: queue.Queue, stats: _ServerStats):
+    while True:
+        try:
+            message = channel.conn.recv()
+        except (EOFError, OSError):
+            break
+        if message['kind'] == 'stats':
+            # Kuyruğa girmez: sunucu bir batch'le meşgulken de hemen yanıtlanır
+            channel.send({'id': message['id'], 'result': stats.snapshot(), 'error': None})
+            continue
+        # Kuyruk doluysa burada beklenir; istemcinin gönderimi de yavaşlar
+        requests.put((channel, message))
+    channel.conn.close()
+
+def _accept(listener: Listener, requests: queue.Queue, stats: _ServerStats):
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception:
+            # Kimlik doğrulaması başarısız bağlantı vb.
+            continue
+        threading.Thread(target=_read_client, args=(_Channel(conn), requests, stats), daemon=True).start()
+
+def _collect(requests: queue.Queue, max_batch: int) -> list:
+    """İlk isteği bekle, ardından kuyrukta hazır bekleyenleri max_batch metne kadar ekle"""
+    batch = [requests.get()]
+    size = len(batch[0][1].get('texts') or ())
+    while size < max_batch:
+        try:
+            item = requests.get_nowait()
+        except queue.Empty:
+            break
+        batch.append(item)
+        size += len(item[1].get('texts') or ())
+    return batch
+
+def _serve(address_conn, authkey: bytes, queue_size: int, max_batch: int):
+    """Sunucu process'inin ana döngüsü"""
+    # Modeller bu süreçte, ilk istekte yüklenir ve süreç boyunca bellekte kalır
+    from utils import models
+
+    requests = queue.Queue(maxsize=queue_size)
+    listener = Listener(authkey=authkey)
+    address_conn.send(listener.address)
+    address_conn.close()
+    stats = _ServerStats(requests)
+    threading.Thread(target=_accept, args=(listener, requests, stats), daemon=True).start()
+
+    while True:
+        groups = {}
+        for channel, message in _collect(requests, max_batch):
+            key = (message['kind'], message['model_key'], message['backend'],
+                   tuple(sorted(message['options'].items())))
+            groups.setdefault(key, []).append((channel, message))
+
+        for (kind, model_key, backend, _), members in groups.items():
+            options = members[0][1]['options']
+            stats.add(requests=len(members))
+            try:
+                if kind == 'revision':
+                    outputs = [models.local_model_revision(model_key, backend, options)] * len(members)
+                else:
+                    # Farklı istemcilerin metinleri tek analizde, sonra isteklerine bölünür
+                    texts = [text for _, message in members for text in message['texts']]
+                    analyzed = models.analyze_uncached(model_key, texts, max_batch, backend, options)
+                    outputs = []
+                    start = 0
+                    for _, message in members:
+                        outputs.append(analyzed[start:start + len(message['texts'])])
+                        start += len(message['texts'])
+                    stats.add(texts=len(texts), model_calls=1, merged_requests=len(members) - 1)
+            except Exception as e:
+                stats.add(errors=1)
+                for channel, message in members:
+                    channel.send({'id': message['id'], 'result': None, 'error': f"{type(e).__name__}: {e}"})
+                continue
+
+            for (channel, message), output in zip(members, outputs):
+                channel.send({'id': message['id'], 'result': output, 'error': None})
+
+# İstemci tarafı
+
+class ModelServerClient:
+    """
+    Model sunucusuna bağlı, thread-safe istemci
+
+    İstekler future olarak döner; yanıtlar okuyucu thread tarafından istek id'sine
+    göre dağıtılır. Pickle ile başka bir process'e taşınırsa orada yeniden bağlanır.
+    """
+
+    def __init__(self, address, authkey: bytes, timeout: float = MODEL_SERVER_TIMEOUT):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.closed = False
+        try:
+            self._conn = Client(address, authkey=authkey)
+        except OSError as e:
+            raise ModelServerError(f"Model sunucusuna bağlanılamadı: {e}") from e
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._ids = itertools.count()
+        self._reader = threading.Thread(target=self._read, name='model-server-client', daemon=True)
+        self._reader.start()
+
+    def __reduce__(self):
+        return (ModelServerClient, (self.address, self.authkey, self.timeout))
+
+    def _read(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._futures.pop(message['id'], None)
+            if future is None:
+                continue
+            if message['error'] is not None:
+                future.set_exception(ModelServerError(message['error']))
+            else:
+                future.set_result(message['result'])
+
+        # Bağlantı koptu: bekleyen tüm istekler hata alır
+        with self._lock:
+            self.closed = True
+            pending, self._futures = self._futures, {}
+        for future in pending.values():
+            future.set_exception(ModelServerError("Model sunucusu bağlantısı kapandı"))
+
+    def submit(self, kind: str, model_key: Optional[str] = None,
+               backend: str = DEFAULT_INFERENCE_BACKEND,
+               options: Optional[dict] = None, texts: Optional[List[str]] = None) -> Future:
+        """İsteği gönder; sonuç future üzerinden gelir"""
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Bilinmeyen istek tipi: {kind}")
+
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise ModelServerError("Model sunucusu bağlantısı kapandı")
+            request_id = next(self._ids)
+            self._futures[request_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send({
+                    'id': request_id,
+                    'kind': kind,
+                    'model_key': model_key,
+                    'backend': backend,
+                    'options': options or {},
+                    'texts': texts
+                })
+        except (OSError, EOFError) as e:
+            with self._lock:
+                self._futures.pop(request_id, None)
+            raise ModelServerError(f"Model sunucusuna istek gönderilemedi: {e}") from e
+        return future
+
+    def _wait(self, future: Future, timeout: Optional[float] = None):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout)
+        except TimeoutError as e:
+            raise ModelServerError(f"Model sunucusu {timeout:.0f} saniyede yanıt vermedi") from e
+
+    def analyze(self, model_key: str, texts: List[str], backend: str = DEFAULT_INFERENCE_BACKEND,
+                options: Optional[dict] = None) -> List[dict]:
+        """Metinleri sunucudaki modelle analiz et (girdi sırasıyla)"""
+        with timed(f"{model_key}_server", items=len(texts)):
+            return self._wait(self.submit('analyze', model_key, backend, options, texts))
+
+    def revision(self, model_key: str, backend: str = DEFAULT_INFERENCE_BACKEND,
+                 options: Optional[dict] = None) -> str:
+        """Sunucudaki modelin önbellek revizyonu (bkz. models.get_model_revision)"""
+        return self._wait(self.submit('revision', model_key, backend, options))
+
+    def stats(self, timeout: Optional[float] = None) -> dict:
+        """
+        İstek/metin sayıları, birleştirilen istekler ve kuyruk derinliği
+
+        Sunucu bu isteği inference kuyruğuna sokmadan bağlantının okuyucu
+        thread'inde yanıtlar; sunucu bir batch'le meşgulken de beklemez. Sadece
+        istek kuyruğu doluyken (geri basınç) aynı bağlantıdaki istekler gibi bekler.
+        """
+        return self._wait(self.submit('stats'), timeout)
+
+    def close(self):
+        self._conn.close()
+
+class ModelServer:
+    """Model sunucusu process'ini başlatan ve yeniden başlatan taraf"""
+
+    def __init__(self, queue_size: int = MODEL_SERVER_QUEUE_SIZE,
+                 max_batch: int = MODEL_SERVER_MAX_BATCH):
+        self.queue_size = queue_size
+        self.max_batch = max_batch
+        self.authkey = secrets.token_bytes(32)
+        self.address = None
+        self._process = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Streamlit sunucusu çok thread'li olduğu için fork yerine spawn
+        context = multiprocessing.get_context('spawn')
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_serve,
+            args=(sender, self.authkey, self.queue_size, self.max_batch),
+            name='laika-model-server',
+            daemon=True
+        )
+        self._process.start()
+        sender.close()
+        try:
+            if not receiver.poll(_STARTUP_TIMEOUT):
+                raise EOFError
+            self.address = receiver.recv()
+        except (EOFError, OSError) as e:
+            self.stop()
+            raise ModelServerError("Model sunucusu başlatılamadı") from e
+        finally:
+            receiver.close()
+
+        # Bu sürecin alt process'leri aynı sunucuya bağlanır
+        global _server_started_here
+        _server_started_here = True
+        os.environ[_ENV_ADDRESS] = self.address
+        os.environ[_ENV_AUTHKEY] = self.authkey.hex()
+        return self
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def client(self) -> ModelServerClient:
+        """Bu süreçte paylaşılan istemci (sunucu çökmüşse yeniden başlatılır)"""
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+                self._client = None
+            if self._client is None or self._client.closed:
+                self._client = ModelServerClient(self.address, self.authkey)
+            return self._client
+
+    def stop(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(5)
+
+@st.cache_resource
+def get_model_server() -> ModelServer:
+    """Bu süreçteki tüm oturumların paylaştığı model sunucusu"""
+    return ModelServer().start()
+
+# Bu süreç bir sunucu başlattı mı (alt process'lerde modül yeniden yüklenir, False kalır)
+_server_started_here = False
+_inherited_client = None
+_inherited_lock = threading.Lock()
+
+def get_model_client() -> ModelServerClient:
+    """
+    Model sunucusu istemcisi
+
+    Üst süreç bir sunucu başlattıysa (adresi ortam değişkeninde) ona bağlanılır;
+    yoksa sunucu bu süreçte başlatılır.
+    """
+    global _inherited_client
+
+    address = os.environ.get(_ENV_ADDRESS)
+    authkey = os.environ.get(_ENV_AUTHKEY)
+    if address and authkey and not _server_started_here:
+        with _inherited_lock:
+            if _inherited_client is None or _inherited_client.closed:
+                _inherited_client = ModelServerClient(address, bytes.fromhex(authkey))
+            return _inherited_client
+    return get_model_server().client()
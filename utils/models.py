@@ -1,76 +1,447 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from germansentiment import SentimentModel
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
 import streamlit as st
+from utils.backends import convert_model, DEFAULT_INFERENCE_BACKEND
+from utils.batching import MicroBatchScheduler, BATCH_SCHEDULER_ENABLED
+from utils.cache import InferenceCache
+from utils.instrumentation import timed
+from utils.model_bundle import resolve_model, pin_revision
+from utils.model_server import get_model_client, MODEL_SERVER_ENABLED
+from utils.text_processor import context_hash
+
+# Varsayılan inference batch boyutu (context sayısı)
+DEFAULT_INFERENCE_BATCH_SIZE = 32
+
+# Model 3 token penceresi: uzun context'ler örtüşen parçalara bölünür
+MODEL_3_MAX_TOKENS = 512
+DEFAULT_CHUNK_STRIDE = 128  # Ardışık parçalar arasındaki örtüşme (token)
+EMOTION_AGGREGATIONS = ('mean', 'max')
+DEFAULT_EMOTION_AGGREGATION = 'mean'
+
+# Önbellek anahtarlarında kullanılan model kimlikleri
+MODEL_IDS = {
+    'model_1': 'oliverguhr/german-sentiment-bert',
+    'model_2': 'mdraw/german-news-sentiment-bert',
+    'model_3': 'SchuylerH/bert-multilingual-go-emtions'
+}
+
+# Sidebar'da gösterilen model adları
+MODEL_LABELS = {
+    'model_1': 'Model 1: Hızlı Pilot',
+    'model_2': 'Model 2: Haber',
+    'model_3': 'Model 3: Detaylı (GoEmotions)'
+}
+MODEL_KEYS = tuple(MODEL_IDS)
+
+# Seçili modelleri kullanıcı dosya yüklerken arka planda yükle (LAIKA_WARMUP=0 ile kapalı)
+WARMUP_ENABLED = os.environ.get('LAIKA_WARMUP', '1') == '1'
+WARMUP_LOADING = 'loading'
+WARMUP_READY = 'ready'
+
+# Analiz mantığı değiştiğinde artırılır; eski önbellek kayıtları geçersiz olur
+ANALYSIS_VERSIONS = {
+    'model_1': 'v1',
+    'model_2': 'v1',
+    'model_3': 'v2-token-chunks'
+}
+
+# transformers / germansentiment (ve torch) import'u saniyeler sürer; sadece kaydedilmiş
+# sonuçlara bakan oturum beklemesin diye modeller ilk yüklendiğinde import edilir
+
+def _apply_backend(sentiment_model, model_key: str, backend: str):
+    """SentimentModel'in içindeki HF modelini seçilen backend ile değiştir"""
+    sentiment_model.checkpoint_revision = getattr(sentiment_model.model.config, '_commit_hash', None)
+    sentiment_model.model = convert_model(sentiment_model.model, MODEL_IDS[model_key], backend)
+    sentiment_model.inference_backend = backend
+    return sentiment_model
 
 @st.cache_resource
-def load_model_1():
+def load_model_1(backend: str = DEFAULT_INFERENCE_BACKEND):
     """Model 1: Hızlı Pilot - oliverguhr/german-sentiment-bert"""
-    model = SentimentModel()
-    return model
+    from germansentiment import SentimentModel
+
+    source, revision = resolve_model('model_1', MODEL_IDS['model_1'])
+    with timed('model_1_load'):
+        model = SentimentModel(source)
+        pin_revision(model.model, revision)
+        return _apply_backend(model, 'model_1', backend)
 
 @st.cache_resource
-def load_model_2():
+def load_model_2(backend: str = DEFAULT_INFERENCE_BACKEND):
     """Model 2: Haber Metinleri - mdraw/german-news-sentiment-bert"""
-    model = SentimentModel('mdraw/german-news-sentiment-bert')
-    return model
+    from germansentiment import SentimentModel
+
+    source, revision = resolve_model('model_2', MODEL_IDS['model_2'])
+    with timed('model_2_load'):
+        model = SentimentModel(source)
+        pin_revision(model.model, revision)
+        return _apply_backend(model, 'model_2', backend)
 
 @st.cache_resource
-def load_model_3():
+def load_model_3(backend: str = DEFAULT_INFERENCE_BACKEND):
     """Model 3: Detaylı - GoEmotions (27 duygu)"""
-    tokenizer = AutoTokenizer.from_pretrained("SchuylerH/bert-multilingual-go-emtions")
-    model = AutoModelForSequenceClassification.from_pretrained("SchuylerH/bert-multilingual-go-emtions")
-    return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 
-def analyze_with_model_1(text: str, model) -> dict:
-    """Model 1 ile analiz"""
-    result = model.predict_sentiment([text])
-    sentiment = result[0]
-    
+    # LAIKA_MODEL_BUNDLE verildiyse paketteki dizin, yoksa hub adı
+    source, revision = resolve_model('model_3', MODEL_IDS['model_3'])
+    with timed('model_3_load'):
+        tokenizer = AutoTokenizer.from_pretrained(source)
+        model = pin_revision(AutoModelForSequenceClassification.from_pretrained(source), revision)
+        revision = getattr(model.config, '_commit_hash', None)
+        model = convert_model(model, MODEL_IDS['model_3'], backend)
+        pipeline_model = pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+    pipeline_model.checkpoint_revision = revision
+    pipeline_model.inference_backend = backend
+    return pipeline_model
+
+@st.cache_resource
+def get_inference_cache() -> InferenceCache:
+    """Tüm oturumların paylaştığı kalıcı sonuç önbelleği"""
+    return InferenceCache()
+
+def get_model_revision(model_key: str, model, options: Optional[dict] = None) -> str:
+    """Önbellek anahtarı için model revizyonu (checkpoint commit hash'i + backend + analiz sürümü)"""
+    # SentimentModel modeli .model içinde, pipeline ise doğrudan .model olarak tutar
+    config = getattr(getattr(model, 'model', None), 'config', None)
+    commit = (getattr(model, 'checkpoint_revision', None)
+              or getattr(config, '_commit_hash', None)
+              or 'unknown')
+    backend = getattr(model, 'inference_backend', 'pytorch')
+    version = ANALYSIS_VERSIONS[model_key]
+    # Sonucu etkileyen analiz seçenekleri de anahtara girer
+    if options:
+        version += ';' + ';'.join(f"{k}={v}" for k, v in sorted(options.items()))
+    # fp32 kayıtları eski anahtar biçimini korur
+    if backend == 'pytorch':
+        return f"{commit}:{version}"
+    return f"{commit}:{backend}:{version}"
+
+def _format_model_1(sentiment: str) -> dict:
     return {
         'model': 'Hızlı Pilot (Guhr et al. 2020)',
         'sentiment': sentiment,
         'categories': {'positive': 0, 'negative': 0, 'neutral': 0}
     }
 
-def analyze_with_model_2(text: str, model) -> dict:
-    """Model 2 ile analiz"""
-    result = model.predict_sentiment([text])
-    sentiment = result[0]
-    
+def _format_model_2(sentiment: str) -> dict:
     return {
         'model': 'Haber Metinleri (mdraw)',
         'sentiment': sentiment,
         'categories': {'positive': 0, 'negative': 0, 'neutral': 0}
     }
 
-def analyze_with_model_3(text: str, pipeline_model) -> dict:
-    """Model 3 ile analiz (27 duygu)"""
-    results = pipeline_model(text[:512])[0]  # Token limiti
-    
+def _format_model_3(results: list) -> dict:
     # En yüksek skorlu 5 duyguyu al
     top_emotions = sorted(results, key=lambda x: x['score'], reverse=True)[:5]
-    
+
     return {
         'model': 'Detaylı GoEmotions (27 duygu)',
         'top_emotions': top_emotions,
         'all_emotions': results
     }
 
+def analyze_with_model_1(text: str, model) -> dict:
+    """Model 1 ile analiz"""
+    result = model.predict_sentiment([text])
+    sentiment = result[0]
+
+    return _format_model_1(sentiment)
+
+def analyze_with_model_2(text: str, model) -> dict:
+    """Model 2 ile analiz"""
+    result = model.predict_sentiment([text])
+    sentiment = result[0]
+
+    return _format_model_2(sentiment)
+
+def analyze_with_model_3(text: str, pipeline_model,
+                         aggregation: str = DEFAULT_EMOTION_AGGREGATION) -> dict:
+    """Model 3 ile analiz (27 duygu)"""
+    return analyze_batch_with_model_3([text], pipeline_model, aggregation)[0]
+
+def analyze_batch_with_model_1(texts: List[str], model) -> List[dict]:
+    """Model 1 ile tek forward pass'te toplu analiz"""
+    with timed('model_1_inference', items=len(texts)):
+        return [_format_model_1(s) for s in model.predict_sentiment(texts)]
+
+def analyze_batch_with_model_2(texts: List[str], model) -> List[dict]:
+    """Model 2 ile tek forward pass'te toplu analiz"""
+    with timed('model_2_inference', items=len(texts)):
+        return [_format_model_2(s) for s in model.predict_sentiment(texts)]
+
+def chunk_texts_by_tokens(texts: List[str], tokenizer, max_tokens: int = MODEL_3_MAX_TOKENS,
+                          stride: int = DEFAULT_CHUNK_STRIDE) -> Tuple[List[str], List[int]]:
+    """
+    Metinleri token limitine sığan, örtüşen parçalara böl
+
+    Args:
+        texts: Metinler
+        tokenizer: Hızlı (offset destekli) HF tokenizer
+        max_tokens: Özel tokenlar dahil model limiti
+        stride: Ardışık parçalar arasında örtüşen token sayısı
+
+    Returns:
+        (parça metinleri, her parçanın ait olduğu metin indeksi)
+    """
+    window = max_tokens - tokenizer.num_special_tokens_to_add()
+    step = max(1, window - stride)
+
+    encoded = tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+
+    chunks = []
+    owners = []
+    for i, (text, offsets) in enumerate(zip(texts, encoded['offset_mapping'])):
+        if len(offsets) <= window:
+            chunks.append(text)
+            owners.append(i)
+            continue
+
+        for start in range(0, len(offsets), step):
+            end = min(start + window, len(offsets))
+            chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+            owners.append(i)
+            if end == len(offsets):
+                break
+
+    return chunks, owners
+
+def aggregate_emotions(chunk_results: List[list], aggregation: str = DEFAULT_EMOTION_AGGREGATION) -> list:
+    """Bir metnin parça skorlarını tek duygu listesinde birleştir (skora göre azalan)"""
+    if aggregation not in EMOTION_AGGREGATIONS:
+        raise ValueError(f"Bilinmeyen birleştirme yöntemi: {aggregation}")
+
+    if len(chunk_results) == 1:
+        return chunk_results[0]
+
+    scores = {}
+    for emotions in chunk_results:
+        for e in emotions:
+            scores.setdefault(e['label'], []).append(e['score'])
+
+    combine = max if aggregation == 'max' else (lambda values: sum(values) / len(values))
+    merged = [{'label': label, 'score': combine(values)} for label, values in scores.items()]
+    return sorted(merged, key=lambda x: x['score'], reverse=True)
+
+def analyze_batch_with_model_3(texts: List[str], pipeline_model,
+                               aggregation: str = DEFAULT_EMOTION_AGGREGATION) -> List[dict]:
+    """
+    Model 3 ile toplu analiz (27 duygu)
+
+    Uzun metinler token penceresine bölünür; tüm metinlerin parçaları aynı batch'lerde
+    çalışır ve skorlar metin bazında birleştirilir.
+    """
+    max_tokens = min(pipeline_model.tokenizer.model_max_length, MODEL_3_MAX_TOKENS)
+    with timed('model_3_chunking', items=len(texts)):
+        chunks, owners = chunk_texts_by_tokens(texts, pipeline_model.tokenizer, max_tokens)
+
+    with timed('model_3_inference', items=len(texts)):
+        chunk_results = pipeline_model(chunks, batch_size=len(texts), truncation=True)
+
+    per_text = [[] for _ in texts]
+    for owner, result in zip(owners, chunk_results):
+        per_text[owner].append(result)
+
+    return [_format_model_3(aggregate_emotions(r, aggregation)) for r in per_text]
+
+def make_length_buckets(texts: List[str], batch_size: int) -> List[List[int]]:
+    """
+    Metinleri uzunluğa göre sıralayıp batch'lere böl
+
+    Benzer uzunluktaki metinler aynı batch'e düştüğü için padding israfı azalır.
+
+    Returns:
+        Her batch için orijinal indeks listesi
+    """
+    batch_size = max(1, int(batch_size))
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
 def analyze_text_with_all_models(text: str) -> dict:
     """Tüm modellerle analiz yap"""
-    
+
     # Modelleri yükle
     model_1 = load_model_1()
     model_2 = load_model_2()
     model_3 = load_model_3()
-    
+
     # Analizler
     result_1 = analyze_with_model_1(text, model_1)
     result_2 = analyze_with_model_2(text, model_2)
     result_3 = analyze_with_model_3(text, model_3)
-    
+
     return {
         'model_1': result_1,
         'model_2': result_2,
         'model_3': result_3
     }
+
+_MODEL_RUNNERS = {
+    'model_1': (load_model_1, analyze_batch_with_model_1),
+    'model_2': (load_model_2, analyze_batch_with_model_2),
+    'model_3': (load_model_3, analyze_batch_with_model_3)
+}
+
+def local_model_revision(model_key: str, backend: str = DEFAULT_INFERENCE_BACKEND,
+                         options: Optional[dict] = None) -> str:
+    """Modeli bu süreçte yükleyip önbellek revizyonunu döndür"""
+    loader, _ = _MODEL_RUNNERS[model_key]
+    return get_model_revision(model_key, loader(backend), options)
+
+def analyze_uncached(model_key: str, texts: List[str], batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+                     backend: str = DEFAULT_INFERENCE_BACKEND,
+                     options: Optional[dict] = None) -> List[dict]:
+    """Modeli bu süreçte yükleyip metinleri uzunluk gruplu batch'lerle analiz et (önbelleksiz)"""
+    loader, analyze_fn = _MODEL_RUNNERS[model_key]
+    model = loader(backend)
+    options = options or {}
+    results = [None] * len(texts)
+
+    for bucket in make_length_buckets(texts, batch_size):
+        batch = [texts[j] for j in bucket]
+        for j, result in zip(bucket, analyze_fn(batch, model, **options)):
+            results[j] = result
+
+    return results
+
+_warmup_lock = threading.Lock()
+# (model anahtarı, backend) -> WARMUP_LOADING, WARMUP_READY veya hata mesajı
+_warmup_state: Dict[Tuple[str, str], str] = {}
+
+def _warm_up(model_keys: List[str], backend: str):
+    for key in model_keys:
+        try:
+            if MODEL_SERVER_ENABLED:
+                # Model sunucu process'inde yüklenir
+                get_model_client().revision(key, backend)
+            else:
+                _MODEL_RUNNERS[key][0](backend)
+            state = WARMUP_READY
+        except Exception as e:
+            state = f"{type(e).__name__}: {str(e)[:200]}"
+        with _warmup_lock:
+            _warmup_state[(key, backend)] = state
+
+def warm_up_models(model_keys: Sequence[str], backend: str = DEFAULT_INFERENCE_BACKEND):
+    """
+    Modelleri bir daemon thread'de önceden yükle
+
+    Yüklemesi süren veya tamamlanmış modeller tekrar başlatılmaz; hata alanlar
+    tekrar denenir. Analiz modele warm-up bitmeden ulaşırsa st.cache_resource
+    aynı yüklemenin bitmesini bekler, model iki kez yüklenmez.
+    """
+    with _warmup_lock:
+        pending = [
+            key for key in model_keys
+            if _warmup_state.get((key, backend)) not in (WARMUP_LOADING, WARMUP_READY)
+        ]
+        for key in pending:
+            _warmup_state[(key, backend)] = WARMUP_LOADING
+    if pending:
+        threading.Thread(target=_warm_up, args=(pending, backend), name='model-warmup', daemon=True).start()
+
+def warm_up_status(model_keys: Sequence[str], backend: str = DEFAULT_INFERENCE_BACKEND) -> Dict[str, Optional[str]]:
+    """Model başına warm-up durumu (başlatılmadıysa None)"""
+    with _warmup_lock:
+        return {key: _warmup_state.get((key, backend)) for key in model_keys}
+
+def _analyze_one_batch(model_key: str, texts: List[str], backend: str, options: dict) -> List[dict]:
+    """Zamanlayıcının tek forward pass'i (modeller bu süreçte paylaşılır)"""
+    loader, analyze_fn = _MODEL_RUNNERS[model_key]
+    return analyze_fn(texts, loader(backend), **options)
+
+@st.cache_resource
+def get_batch_scheduler() -> MicroBatchScheduler:
+    """Tüm oturumların paylaştığı micro-batching zamanlayıcısı"""
+    return MicroBatchScheduler(_analyze_one_batch)
+
+def run_model_batched(model_key: str, texts: List[str], batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+                      cache: Optional[InferenceCache] = None,
+                      backend: str = DEFAULT_INFERENCE_BACKEND,
+                      options: Optional[dict] = None) -> List[dict]:
+    """
+    Tek bir modeli uzunluk gruplu batch'lerle çalıştır
+
+    Önbellek verilirse önce önbellekte aranır, sadece bulunamayan metinler modele gider.
+    options, modelin analiz fonksiyonuna anahtar kelime argümanı olarak geçer.
+    LAIKA_MODEL_SERVER=1 ise modeller bu süreçte yüklenmez, paylaşılan model
+    sunucusuna gönderilir (utils.model_server). LAIKA_BATCH_SCHEDULER=1 ise metinler
+    diğer oturumların istekleriyle birlikte batch'lenir (utils.batching).
+    """
+    options = options or {}
+    server = get_model_client() if MODEL_SERVER_ENABLED else None
+    results = [None] * len(texts)
+
+    if cache is not None:
+        model_id = MODEL_IDS[model_key]
+        if server is not None:
+            revision = server.revision(model_key, backend, options)
+        else:
+            revision = local_model_revision(model_key, backend, options)
+        with timed('inference_cache_lookup', items=len(texts)):
+            hashes = [context_hash(t) for t in texts]
+            cached = cache.get_many(model_id, revision, hashes)
+        for i, h in enumerate(hashes):
+            results[i] = cached.get(h)
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    missing_texts = [texts[i] for i in missing]
+    new_results = {}
+
+    if missing_texts:
+        if server is not None:
+            analyzed = server.analyze(model_key, missing_texts, backend, options)
+        elif BATCH_SCHEDULER_ENABLED:
+            analyzed = get_batch_scheduler().analyze(model_key, missing_texts, backend, options)
+        else:
+            analyzed = analyze_uncached(model_key, missing_texts, batch_size, backend, options)
+        for i, result in zip(missing, analyzed):
+            results[i] = result
+            if cache is not None:
+                new_results[hashes[i]] = result
+
+    if cache is not None:
+        with timed('inference_cache_store', items=len(new_results)):
+            cache.put_many(model_id, revision, new_results)
+
+    return results
+
+def analyze_texts_with_all_models(texts: List[str],
+                                  batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+                                  use_cache: bool = True,
+                                  backend: str = DEFAULT_INFERENCE_BACKEND,
+                                  models: Optional[Sequence[str]] = None,
+                                  emotion_aggregation: str = DEFAULT_EMOTION_AGGREGATION) -> List[dict]:
+    """
+    Birden fazla context'i tüm modellerle toplu analiz et
+
+    Args:
+        texts: Context metinleri
+        batch_size: Forward pass başına context sayısı
+        use_cache: Kalıcı sonuç önbelleğini kullan
+        backend: Inference backend'i (pytorch, quantized, onnx)
+        models: Çalıştırılacak modeller (None ise hepsi). Seçilmeyen modeller
+            hiç yüklenmez ve sonuçta boş dict olarak yer alır.
+        emotion_aggregation: Model 3 parça skorlarının birleştirilmesi (mean/max)
+
+    Returns:
+        Girdi sırasıyla, analyze_text_with_all_models ile aynı yapıda dict listesi
+    """
+    if not texts:
+        return []
+
+    enabled = [key for key in MODEL_KEYS if models is None or key in models]
+    cache = get_inference_cache() if use_cache else None
+
+    options = {'model_3': {'aggregation': emotion_aggregation}}
+
+    # Modeller ilk kullanımda (run_model_batched içinde) yüklenir
+    per_model = {
+        key: run_model_batched(key, texts, batch_size, cache, backend, options.get(key))
+        for key in enabled
+    }
+
+    return [
+        {key: per_model[key][i] if key in per_model else {} for key in MODEL_KEYS}
+        for i in range(len(texts))
+    ]
@@ -0,0 +1,421 @@
+"""
+Akışlı (pipelined) analiz: çıkarma -> cümle/eşleşme -> toplu inference
+
+Her aşama kendi thread'inde çalışır ve aşamalar sınırlı kuyruklarla bağlanır.
+Böylece modeller PDF ayrıştırma sürerken boşta beklemez.
+
+Bir dosyanın tüm eşleşmeleri analiz edildiğinde on_file_complete çağrılır; kesilen
+bir iş, tamamlanan dosyaların sonuçları resume_from ile verilerek kaldığı yerden sürer.
+
+Aşama süreleri (PDF sayfası, cümle bölme, model forward pass'leri...) pipeline'a ait
+metrics kaydında toplanır; profile=True ile aşama thread'leri cProfile altında çalışır.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.backends import DEFAULT_INFERENCE_BACKEND
+from utils.cache import ExtractionCache
+from utils.ingestion import iter_extracted, DEFAULT_EXTRACTION_WORKERS
+from utils.instrumentation import StageMetrics, ThreadProfiler, timed, use_metrics
+from utils.result_store import ResultStore, ResultStoreBuilder
+from utils.models import (
+    analyze_texts_with_all_models,
+    DEFAULT_INFERENCE_BATCH_SIZE,
+    DEFAULT_EMOTION_AGGREGATION
+)
+from utils.text_processor import iter_sentences, iter_keyword_contexts, context_hash, get_keyword_matcher
+
+# Kuyruk sonu işareti
+_DONE = object()
+
+# Tekilleştirme için bellekte tutulan son bağlam analizi sayısı; daha eski bir bağlam
+# tekrar gelirse kalıcı inference önbelleğinden okunur
+ANALYSIS_MEMORY = 4096
+
+class AnalysisPipeline:
+    """Çıkarma, eşleşme ve inference aşamalarını eşzamanlı çalıştıran pipeline"""
+
+    def __init__(self, files: List[Tuple[str, Union[bytes, str]]], keywords: List[str],
+                 context_before: int = 3, context_after: int = 3,
+                 word_boundary: bool = False,
+                 batch_size: int = DEFAULT_INFERENCE_BATCH_SIZE,
+                 extraction_workers: int = DEFAULT_EXTRACTION_WORKERS,
+                 extraction_cache: Optional[ExtractionCache] = None,
+                 use_cache: bool = True,
+                 backend: str = DEFAULT_INFERENCE_BACKEND,
+                 models: Optional[Sequence[str]] = None,
+                 emotion_aggregation: str = DEFAULT_EMOTION_AGGREGATION,
+                 resume_from: Optional[Dict[int, dict]] = None,
+                 on_file_complete: Optional[Callable[[int, str, List[dict], Optional[str], bool], None]] = None,
+                 profile: bool = False,
+                 queue_size: int = 32):
+        """
+        Args:
+            files: (dosya adı, içerik veya disk yolu) listesi
+            keywords: Anahtar kelimeler
+            context_before / context_after: Context penceresi
+            word_boundary: Sadece tam kelime eşleşmeleri
+            batch_size: Forward pass başına context sayısı
+            extraction_workers: Metin çıkarma process sayısı
+            extraction_cache: Çıkarılmış metin önbelleği
+            use_cache: Kalıcı inference önbelleğini kullan
+            backend: Inference backend'i (pytorch, quantized, onnx)
+            models: Çalıştırılacak modeller (None ise hepsi)
+            emotion_aggregation: Model 3 parça skorlarının birleştirilmesi (mean/max)
+            resume_from: Önceden tamamlanmış dosyalar, dosya indeksi ->
+                {'results': [...], 'error': hata veya None}. Bu dosyalar tekrar işlenmez.
+            on_file_complete: Bir dosya bittiğinde (indeks, dosya adı, sonuçlar, hata,
+                tekrar denenecek mi) ile çağrılır (pipeline thread'inden). Eşleşmelerinden
+                bazıları analiz edilemeyen dosya tamamlanmış sayılmaz (tekrar denenecek=True)
+            profile: Aşama thread'lerini cProfile ile profille (profiler.dump ile yazılır)
+            queue_size: Aşamalar arası kuyruk kapasitesi
+        """
+        self.files = files
+        self.keywords = keywords
+        self.context_before = context_before
+        self.context_after = context_after
+        self.word_boundary = word_boundary
+        self.batch_size = int(batch_size)
+        self.extraction_workers = extraction_workers
+        self.extraction_cache = extraction_cache
+        self.use_cache = use_cache
+        self.backend = backend
+        self.models = list(models) if models is not None else None
+        self.emotion_aggregation = emotion_aggregation
+        self.resume_from = resume_from or {}
+        self.on_file_complete = on_file_complete
+        self.metrics = StageMetrics()
+        self.profiler = ThreadProfiler() if profile else None
+
+        # Uzunluk gruplaması daha geniş bir havuzda daha iyi çalışır
+        self.chunk_size = self.batch_size * 8
+
+        self._doc_queue = queue.Queue(maxsize=queue_size)
+        self._match_queue = queue.Queue(maxsize=queue_size)
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+        # Tamamlanan dosyaların sonuçları (sütunlu; dict'ler dosya bitince bırakılır)
+        self._store = ResultStoreBuilder()
+        # context hash -> analiz, son ANALYSIS_MEMORY bağlam (LRU)
+        self._analyses = OrderedDict()
+        # Dosya bazında beklenen / işlenen eşleşme sayısı ve bitmemiş dosyaların sonuçları
+        self._file_expected = {}
+        self._file_done = {}
+        self._file_failed = {}
+        self._file_results = {}
+
+        self.failed_files = []
+        self.errors = []
+        self.started_at = None
+        self.finished_at = None
+        self.counters = {
+            'files_total': len(files),
+            'files_extracted': 0,
+            'files_failed': 0,
+            'files_matched': 0,
+            'files_skipped': 0,
+            'chars_skipped': 0,
+            'matches_found': 0,
+            'matches_analyzed': 0,
+            'unique_contexts': 0,
+            'duplicate_contexts': 0,
+            'files_incomplete': 0,
+            'files_resumed': len(self.resume_from)
+        }
+
+        # Önceki çalıştırmada tamamlanan dosyalar
+        for idx, record in sorted(self.resume_from.items()):
+            if record.get('error'):
+                self.failed_files.append((files[idx][0], record['error']))
+            resumed = record.get('results', [])
+            self._store.append(resumed, order=idx)
+            self.counters['matches_found'] += len(resumed)
+            self.counters['matches_analyzed'] += len(resumed)
+
+    def _add(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.counters[key] += value
+
+    def _complete_file(self, idx: int, error: Optional[str] = None):
+        """Dosyanın tüm eşleşmeleri işlendi; kaydı dışarıya bildir"""
+        filename = self.files[idx][0]
+        with self._lock:
+            results = [r for _, _, r in sorted(self._file_results.pop(idx, []), key=lambda r: r[1])]
+            self._file_expected.pop(idx, None)
+            self._file_done.pop(idx, None)
+            failed = self._file_failed.pop(idx, 0)
+            # Model hatası geçici olabilir: dosya tamamlanmış sayılmaz, devam ettirilince tekrar denenir
+            retry = failed > 0
+            if retry:
+                error = f"{failed} eşleşme analiz edilemedi"
+                self.failed_files.append((filename, error))
+                self.counters['files_incomplete'] += 1
+        if self.on_file_complete is not None:
+            try:
+                self.on_file_complete(idx, filename, results, error, retry)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"Dosya kaydı yazılamadı: {filename} - {e}")
+        self._store.append(results, order=idx)
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """İptal edilmediği sürece kuyruğa koy (kuyruk doluysa bekle)"""
+        while not self._cancel.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _extract_stage(self):
+        # Önceki çalıştırmada tamamlanan dosyalar atlanır
+        remaining = [idx for idx in range(len(self.files)) if idx not in self.resume_from]
+        try:
+            extracted = iter_extracted([self.files[idx] for idx in remaining],
+                                       self.extraction_workers, self.extraction_cache)
+            for position, chunks, error in extracted:
+                if self._cancel.is_set():
+                    break
+                idx = remaining[position]
+                filename = self.files[idx][0]
+                if error is not None:
+                    with self._lock:
+                        self.failed_files.append((filename, error))
+                    self._add(files_failed=1)
+                    self._complete_file(idx, error)
+                    continue
+                self._add(files_extracted=1)
+                if not self._put(self._doc_queue, (idx, filename, chunks)):
+                    break
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"Çıkarma aşaması: {e}")
+        finally:
+            self._put(self._doc_queue, _DONE)
+
+    def _match_stage(self):
+        # Belge parçalarında tek geçişlik arama için derlenmiş eşleştirici
+        matcher = get_keyword_matcher(self.keywords, self.word_boundary)
+        try:
+            while not self._cancel.is_set():
+                try:
+                    item = self._doc_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                # Metin sayfa/paragraf parçaları halinde gelir; belge tek metinde birleştirilmez
+                idx, filename, chunks = item
+                
+                # Ön filtre: anahtar kelime hiç geçmeyen belge cümlelere ayrılmaz
+                with timed('keyword_prefilter'):
+                    has_keyword = matcher.search_chunks(chunks)
+                if not has_keyword:
+                    self._add(files_matched=1, files_skipped=1, chars_skipped=sum(map(len, chunks)))
+                    self._complete_file(idx)
+                    continue
+                
+                try:
+                    # Cümleler parça parça bölünür, cümle listesi oluşturulmaz; bellekte
+                    # bir parça ve context penceresi kadar cümle tutulur
+                    with timed('keyword_contexts') as timer:
+                        matches = list(iter_keyword_contexts(
+                            iter_sentences(chunks),
+                            self.keywords,
+                            self.context_before,
+                            self.context_after,
+                            self.word_boundary
+                        ))
+                        timer.items = len(matches)
+                except Exception as e:
+                    with self._lock:
+                        self.errors.append(f"{filename} - {str(e)[:100]}")
+                    self._add(files_matched=1)
+                    self._complete_file(idx, str(e))
+                    continue
+
+                self._add(files_matched=1, matches_found=len(matches))
+                if not matches:
+                    self._complete_file(idx)
+                    continue
+                # Eşleşmeler kuyruğa girmeden önce beklenen sayı kaydedilir
+                with self._lock:
+                    self._file_expected[idx] = len(matches)
+                    self._file_done[idx] = 0
+                    self._file_results[idx] = []
+                for match in matches:
+                    if not self._put(self._match_queue, (idx, {'filename': filename, **match})):
+                        return
+        finally:
+            self._put(self._match_queue, _DONE)
+
+    def _inference_stage(self):
+        pending = []
+        finished = False
+
+        while not finished and not self._cancel.is_set():
+            # Kuyruk boşalana veya chunk dolana kadar eşleşme topla
+            try:
+                item = self._match_queue.get(timeout=0.05 if pending else 0.5)
+                if item is _DONE:
+                    finished = True
+                else:
+                    pending.append(item)
+                    if len(pending) < self.chunk_size:
+                        continue
+            except queue.Empty:
+                if not pending:
+                    continue
+
+            if pending:
+                self._analyze_pending(pending)
+                pending = []
+
+    def _analyze_pending(self, pending: list):
+        hashes = [context_hash(match['context']) for _, match in pending]
+        # Bu grupta bilinen analizler (LRU'dan düşseler de grup boyunca geçerli)
+        with self._lock:
+            known = {h: self._analyses[h] for h in set(hashes) if h in self._analyses}
+
+        new_texts = {}
+        for h, (_, match) in zip(hashes, pending):
+            if h not in known and h not in new_texts:
+                new_texts[h] = match['context']
+
+        self._add(
+            unique_contexts=len(new_texts),
+            duplicate_contexts=len(pending) - len(new_texts)
+        )
+
+        if new_texts:
+            try:
+                analyses = analyze_texts_with_all_models(
+                    list(new_texts.values()),
+                    batch_size=self.batch_size,
+                    use_cache=self.use_cache,
+                    backend=self.backend,
+                    models=self.models,
+                    emotion_aggregation=self.emotion_aggregation
+                )
+                known.update(zip(new_texts.keys(), analyses))
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"{len(new_texts)} bağlam analiz edilemedi - {str(e)[:100]}")
+        self._remember_analyses(known)
+
+        analyzed = 0
+        completed = []
+        with self._lock:
+            for h, (idx, match) in zip(hashes, pending):
+                analysis = known.get(h)
+                if analysis is not None:
+                    self._file_results[idx].append((idx, match['sentence_index'], {**match, **analysis}))
+                    analyzed += 1
+                else:
+                    self._file_failed[idx] = self._file_failed.get(idx, 0) + 1
+                # Analiz edilemeyen eşleşmeler de işlenmiş sayılır; dosya tekrar denenmek üzere kaydedilir
+                self._file_done[idx] += 1
+                if self._file_done[idx] == self._file_expected[idx]:
+                    completed.append(idx)
+
+            self.counters['matches_analyzed'] += analyzed
+
+        for idx in completed:
+            self._complete_file(idx)
+
+    def _remember_analyses(self, analyses: dict):
+        """Analizleri LRU'ya ekle (kullanılanlar en yeniye taşınır)"""
+        with self._lock:
+            for h, analysis in analyses.items():
+                self._analyses[h] = analysis
+                self._analyses.move_to_end(h)
+            while len(self._analyses) > ANALYSIS_MEMORY:
+                self._analyses.popitem(last=False)
+
+    def _run_stage(self, stage: Callable):
+        """Aşama thread'i: ölçümler bu pipeline'ın kaydına yazılır"""
+        with use_metrics(self.metrics):
+            stage()
+
+    def start(self):
+        """Aşama thread'lerini başlat"""
+        self.started_at = time.time()
+        stages = [self._extract_stage, self._match_stage, self._inference_stage]
+        run = self._run_stage if self.profiler is None else self.profiler.wrap(self._run_stage)
+        self._threads = [
+            threading.Thread(target=run, args=(stage,), name=f"pipeline-{stage.__name__}", daemon=True)
+            for stage in stages
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def is_running(self) -> bool:
+        running = any(thread.is_alive() for thread in self._threads)
+        if not running and self.finished_at is None and self.started_at is not None:
+            self.finished_at = time.time()
+        return running
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout: Optional[float] = None):
+        for thread in self._threads:
+            thread.join(timeout)
+        self.is_running()
+
+    def store(self) -> ResultStore:
+        """
+        Tamamlanan dosyaların sonuçları (dosya ve cümle sırasıyla)
+
+        Yeni dosya bitmediyse aynı depo döner. Pipeline bittikten sonra ara
+        sütunlar bırakılır, bellekte sadece depo kalır.
+        """
+        return self._store.build(final=not self.is_running() and self.started_at is not None)
+
+    def release(self):
+        """Bitmiş pipeline'ın büyük tamponlarını bırak (dosya içerikleri, bağlam analizleri)"""
+        if self.is_running():
+            return
+        self.store()
+        with self._lock:
+            self.files = [(filename, None) for filename, _ in self.files]
+            self._analyses.clear()
+
+    def stats(self) -> dict:
+        """Aşama sayaçları, kuyruk doluluğu ve geçen süre"""
+        with self._lock:
+            snapshot = dict(self.counters)
+        snapshot['doc_queue'] = self._doc_queue.qsize()
+        snapshot['match_queue'] = self._match_queue.qsize()
+        end = self.finished_at or time.time()
+        snapshot['elapsed'] = end - self.started_at if self.started_at else 0.0
+        # Tekilleştirme ile kaçınılan model çağrıları (etkin model sayısı kadar)
+        model_count = len(self.models) if self.models is not None else 3
+        snapshot['saved_model_calls'] = snapshot['duplicate_contexts'] * model_count
+        return snapshot
+
+    def progress(self) -> float:
+        """Tahmini ilerleme oranı (0-1)"""
+        stats = self.stats()
+        total = stats['files_total']
+        if total == 0:
+            return 1.0
+
+        files_done = stats['files_matched'] + stats['files_failed'] + stats['files_resumed']
+        file_fraction = files_done / total
+
+        # Henüz eşleşme yoksa sadece dosya ilerlemesi
+        if stats['matches_found'] == 0:
+            return file_fraction
+
+        # Toplam eşleşme sayısını işlenen dosyalardan tahmin et
+        estimated_matches = stats['matches_found'] / max(file_fraction, 1e-9)
+        return min(1.0, stats['matches_analyzed'] / estimated_matches)
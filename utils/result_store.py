@@ -0,0 +1,393 @@
+"""
+Analiz sonuçları için sütunlu (columnar) depo
+
+Pipeline her eşleşme için iç içe bir dict üretir (bağlam metni, context_sentences,
+model_1/2/3 sonuçları ve 27 duygu skoru). On binlerce eşleşmede bu hem bellekte hem
+de DataFrame'e dönüştürmede pahalıdır. ResultStore aynı bilgiyi iki tabloda tutar:
+
+    matches   Eşleşme başına bir satır. Dosya, anahtar kelime, hedef cümle ve
+              etiketler kategori kodlu, indeksler int32; bağlam context_id ile
+              referanslanır.
+    contexts  Benzersiz bağlam penceresi başına bir satır. Metin bir kez saklanır,
+              Model 3 duygu skorları (bağlam x duygu) float32 matris olarak tutulur.
+
+Çalışan işte sonuçlar ResultStoreBuilder ile dosya bittikçe sütunlara eklenir; dict
+kopyaları tutulmaz. Depo Parquet olarak diske yazılır; tekrar yüklemek JSON
+ayrıştırması gerektirmez.
+"""
+import json
+import os
+import threading
+import uuid
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import DEFAULT_CACHE_DIR
+
+DEFAULT_RESULTS_DIR = os.path.join(DEFAULT_CACHE_DIR, 'results')
+STORE_FORMAT_VERSION = 1
+
+# Bağlam cümleleri tek metinde bu ayraçla tutulur (temizlenmiş metinde satır sonu yoktur)
+_SENTENCE_SEP = '\n'
+TOP_EMOTION_COUNT = 5
+
+# Sonuç tablosu sütunu -> sıralamada kullanılan eşleşme sütunu
+SORT_COLUMNS = {
+    'Dosya': 'filename',
+    'Anahtar Kelime': 'keyword',
+    'Cümle No': 'sentence_index',
+    'Model 1 (Pilot)': 'model_1',
+    'Model 2 (Haber)': 'model_2',
+    'Model 3 (Top Duygu)': 'top_emotion',
+    'Model 3 (Skor)': 'top_score'
+}
+
+_MATCH_COLUMNS = (
+    'filename', 'keyword', 'sentence_index', 'start_idx', 'end_idx',
+    'target_sentence', 'context_id', 'model_1', 'model_2'
+)
+_CATEGORY_COLUMNS = ('filename', 'keyword', 'target_sentence', 'model_1', 'model_2', 'top_emotion')
+_INDEX_COLUMNS = ('sentence_index', 'start_idx', 'end_idx', 'context_id')
+
+def _truncate(values: Sequence[str], length: int = 100) -> np.ndarray:
+    """Sonuç tablosundaki gibi ilk `length` karakter + '...'"""
+    return np.array(
+        [v[:length] + '...' if len(v) > length else v for v in values],
+        dtype=object
+    )
+
+class ResultStore:
+    """Eşleşme tablosu + benzersiz bağlam tablosu + duygu skor matrisi"""
+
+    def __init__(self, matches: pd.DataFrame, contexts: List[str], emotions: np.ndarray,
+                 emotion_labels: List[str], model_names: Optional[dict] = None):
+        """
+        Args:
+            matches: Eşleşme tablosu (sütunlar için from_results'a bakın)
+            contexts: Benzersiz bağlamlar, cümleleri _SENTENCE_SEP ile birleştirilmiş
+            emotions: (len(contexts), len(emotion_labels)) float32 matris;
+                Model 3 çalışmamışsa satır NaN
+            emotion_labels: Matris sütunlarının duygu etiketleri
+            model_names: Model anahtarı -> sonuçtaki 'model' açıklaması
+        """
+        self.matches = matches
+        self.contexts = contexts
+        self.emotions = emotions
+        self.emotion_labels = list(emotion_labels)
+        self.model_names = model_names or {}
+        # Depo değişmez; hesaplanan istatistikler bu anahtarla önbelleklenir
+        self.key = uuid.uuid4().hex
+        self._contexts_lower = None
+
+    @classmethod
+    def from_results(cls, results: Sequence[dict]) -> 'ResultStore':
+        """Pipeline'ın ürettiği dict listesinden depo oluştur"""
+        builder = ResultStoreBuilder()
+        builder.append(results)
+        return builder.build()
+
+    def _add_top_emotion(self):
+        """Bağlam başına en yüksek skorlu duyguyu eşleşme tablosuna ekle"""
+        labels = np.array(self.emotion_labels + [None], dtype=object)
+        if self.emotions.size:
+            has_scores = ~np.isnan(self.emotions).all(axis=1)
+            filled = np.where(np.isnan(self.emotions), -np.inf, self.emotions)
+            best = np.where(has_scores, filled.argmax(axis=1), len(self.emotion_labels))
+            scores = np.where(has_scores, filled.max(axis=1), np.nan).astype(np.float32)
+        else:
+            best = np.full(len(self.contexts), len(self.emotion_labels))
+            scores = np.full(len(self.contexts), np.nan, dtype=np.float32)
+
+        context_ids = self.matches['context_id'].to_numpy()
+        self.matches['top_emotion'] = pd.Categorical(labels[best][context_ids])
+        self.matches['top_score'] = scores[context_ids]
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def context_text(self, context_id: int) -> str:
+        return self.contexts[context_id].replace(_SENTENCE_SEP, ' ')
+
+    def emotions_for(self, context_id: int) -> List[dict]:
+        """Bağlamın duyguları, skora göre azalan (Model 3'ün all_emotions biçimi)"""
+        scores = self.emotions[context_id]
+        order = [i for i in np.argsort(-scores, kind='stable') if not np.isnan(scores[i])]
+        return [{'label': self.emotion_labels[i], 'score': float(scores[i])} for i in order]
+
+    def record(self, row: int, include_emotions: bool = True) -> dict:
+        """Tek eşleşmeyi pipeline'ın dict biçiminde geri oluştur"""
+        match = self.matches.iloc[row]
+        context_id = int(match['context_id'])
+        sentences = self.contexts[context_id].split(_SENTENCE_SEP)
+
+        result = {
+            'filename': match['filename'],
+            'keyword': match['keyword'],
+            'sentence_index': int(match['sentence_index']),
+            'target_sentence': match['target_sentence'],
+            'context': ' '.join(sentences),
+            'context_sentences': sentences,
+            'start_idx': int(match['start_idx']),
+            'end_idx': int(match['end_idx'])
+        }
+        for model_key in ('model_1', 'model_2'):
+            sentiment = match[model_key]
+            result[model_key] = {} if pd.isna(sentiment) else {
+                'model': self.model_names.get(model_key, ''),
+                'sentiment': sentiment
+            }
+
+        result['model_3'] = {}
+        if include_emotions and not pd.isna(match['top_emotion']):
+            emotions = self.emotions_for(context_id)
+            result['model_3'] = {
+                'model': self.model_names.get('model_3', ''),
+                'top_emotions': emotions[:TOP_EMOTION_COUNT],
+                'all_emotions': emotions
+            }
+        return result
+
+    def records(self, rows: Optional[Sequence[int]] = None,
+                include_emotions: bool = True) -> Iterator[dict]:
+        """Seçilen (varsayılan: tüm) eşleşmeleri dict olarak üret"""
+        for row in range(len(self)) if rows is None else rows:
+            yield self.record(row, include_emotions)
+
+    def match_ids(self, rows: Sequence[int]) -> List[tuple]:
+        """
+        Satır numarasından bağımsız eşleşme kimlikleri
+
+        Çalışan işte yeni sonuçlar dosya sırasına eklendiği için satır numaraları
+        kayar; (dosya, anahtar kelime, cümle no, başlangıç) ise aynı kalır.
+        """
+        columns = self.matches[['filename', 'keyword', 'sentence_index', 'start_idx']]
+        return list(columns.iloc[np.asarray(rows, dtype=np.int64)].itertuples(index=False, name=None))
+
+    def filter_rows(self, filenames: Optional[Sequence[str]] = None,
+                    keywords: Optional[Sequence[str]] = None,
+                    query: str = '') -> np.ndarray:
+        """
+        Filtreye uyan eşleşmelerin satır numaraları
+
+        Arama büyük/küçük harf duyarsızdır; bağlam metni (hedef cümle dahil), dosya
+        adı ve anahtar kelimede aranır. Metin kontrolü satır başına değil benzersiz
+        bağlam ve kategori başına bir kez yapılır.
+        """
+        matches = self.matches
+        mask = np.ones(len(self), dtype=bool)
+        if filenames is not None:
+            mask &= matches['filename'].isin(filenames).to_numpy()
+        if keywords is not None:
+            mask &= matches['keyword'].isin(keywords).to_numpy()
+
+        query = query.strip().lower()
+        if query:
+            if self._contexts_lower is None:
+                self._contexts_lower = [context.lower() for context in self.contexts]
+            context_hit = np.fromiter(
+                (query in context for context in self._contexts_lower),
+                dtype=bool, count=len(self.contexts)
+            )
+            hit = context_hit[matches['context_id'].to_numpy()]
+            for column in ('filename', 'keyword'):
+                categories = matches[column].cat.categories.astype(str).str.lower()
+                category_hit = np.append(categories.str.contains(query, regex=False), False)
+                hit |= category_hit[matches[column].cat.codes.to_numpy()]
+            mask &= hit
+
+        return np.flatnonzero(mask)
+
+    def sort_rows(self, rows: np.ndarray, column: Optional[str] = None,
+                  ascending: bool = True) -> np.ndarray:
+        """Satır numaralarını SORT_COLUMNS'taki bir sütuna göre sırala (boşlar sonda)"""
+        if column is None or len(rows) == 0:
+            return rows
+        values = self.matches[SORT_COLUMNS[column]].iloc[rows].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+        return rows[order.to_numpy()]
+
+    def summary_dataframe(self, rows: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """create_results_dataframe ile aynı sütunlar, döngü olmadan"""
+        matches = self.matches if rows is None else self.matches.iloc[rows]
+
+        # Metinler sadece seçilen satırlarda geçen bağlam ve cümleler için kısaltılır
+        targets = matches['target_sentence']
+        target_codes, target_inverse = np.unique(targets.cat.codes.to_numpy(), return_inverse=True)
+        categories = targets.cat.categories.astype(str)
+        target_text = _truncate([categories[code] if code >= 0 else '' for code in target_codes])
+
+        context_ids, context_inverse = np.unique(matches['context_id'].to_numpy(), return_inverse=True)
+        context_preview = _truncate([self.context_text(i) for i in context_ids])
+        top_score = matches['top_score'].to_numpy()
+
+        return pd.DataFrame({
+            'Dosya': matches['filename'].astype(str).to_numpy(),
+            'Anahtar Kelime': matches['keyword'].astype(str).to_numpy(),
+            'Cümle No': matches['sentence_index'].to_numpy(),
+            'Hedef Cümle': target_text[target_inverse],
+            'Context (İlk 100 kar)': context_preview[context_inverse],
+            'Model 1 (Pilot)': matches['model_1'].astype(object).fillna('').to_numpy(),
+            'Model 2 (Haber)': matches['model_2'].astype(object).fillna('').to_numpy(),
+            'Model 3 (Top Duygu)': matches['top_emotion'].astype(object).fillna('').to_numpy(),
+            'Model 3 (Skor)': [f"{s:.2%}" if not np.isnan(s) else '' for s in top_score]
+        })
+
+    def save(self, directory: str):
+        """matches.parquet + contexts.parquet + meta.json olarak yaz"""
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, 'meta.json')
+        # meta.json en son yazılır; yoksa depo yarım kalmış sayılır
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        self.matches.to_parquet(os.path.join(directory, 'matches.parquet'), index=False)
+
+        contexts = pd.DataFrame({'context': self.contexts})
+        for i, label in enumerate(self.emotion_labels):
+            contexts[f"emotion:{label}"] = self.emotions[:, i]
+        contexts.to_parquet(os.path.join(directory, 'contexts.parquet'), index=False)
+
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': STORE_FORMAT_VERSION,
+                'emotion_labels': self.emotion_labels,
+                'model_names': self.model_names
+            }, f, ensure_ascii=False)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, 'meta.json'))
+
+    @classmethod
+    def load(cls, directory: str) -> 'ResultStore':
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format_version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen sonuç deposu sürümü: {meta.get('format_version')}")
+
+        matches = pd.read_parquet(os.path.join(directory, 'matches.parquet'))
+        contexts = pd.read_parquet(os.path.join(directory, 'contexts.parquet'))
+        labels = meta['emotion_labels']
+        emotions = contexts[[f"emotion:{label}" for label in labels]].to_numpy(np.float32)
+        emotions = emotions.reshape(len(contexts), len(labels))
+        # Tamamen boş sütunlar (ör. kapalı model) Parquet'ten object olarak döner
+        for name in _CATEGORY_COLUMNS:
+            matches[name] = matches[name].astype('category')
+
+        return cls(matches, contexts['context'].tolist(), emotions, labels, meta['model_names'])
+
+class ResultStoreBuilder:
+    """
+    Sonuçları geldikçe sütunlara ekleyen depo kurucu
+
+    Pipeline bir dosyanın sonuçlarını dosya bitince ekler ve dict'leri bırakır;
+    bellekte sadece sütun değerleri, benzersiz bağlamlar ve bağlam başına duygu
+    skorları kalır. build() o ana kadarki depoyu döndürür; yeni sonuç eklenmediyse
+    aynı depo nesnesi döner.
+    """
+
+    def __init__(self):
+        self._columns = {name: [] for name in _MATCH_COLUMNS}
+        # Eşleşme başına sıralama anahtarı (pipeline'da dosya indeksi)
+        self._order = []
+        self._context_ids = {}
+        self._contexts = []
+        # Bağlam başına (etiket indeksleri, skorlar)
+        self._context_emotions = []
+        self._label_index = {}
+        self._model_names = {}
+        self._store = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
+
+    def append(self, results: Sequence[dict], order: int = 0):
+        """
+        Sonuçları ekle
+
+        Args:
+            results: Pipeline sonuç dict'leri
+            order: Depodaki sıra anahtarı; build() eşleşmeleri bu anahtara göre
+                (eşitlerde ekleme sırasıyla) sıralar
+        """
+        if not results:
+            return
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Depo kapatıldı; yeni sonuç eklenemez")
+            columns = self._columns
+            for result in results:
+                sentences = result.get('context_sentences') or [result.get('context', '')]
+                key = _SENTENCE_SEP.join(sentences)
+                context_id = self._context_ids.get(key)
+                if context_id is None:
+                    context_id = self._context_ids[key] = len(self._contexts)
+                    self._contexts.append(key)
+                    emotions = result.get('model_3', {}).get('all_emotions') or []
+                    self._context_emotions.append((
+                        np.array([self._label_index.setdefault(e['label'], len(self._label_index))
+                                  for e in emotions], dtype=np.int32),
+                        np.array([e['score'] for e in emotions], dtype=np.float32)
+                    ))
+
+                for model_key in ('model_1', 'model_2', 'model_3'):
+                    model_result = result.get(model_key) or {}
+                    if 'model' in model_result:
+                        self._model_names.setdefault(model_key, model_result['model'])
+
+                columns['filename'].append(result.get('filename', 'N/A'))
+                columns['keyword'].append(result.get('keyword', ''))
+                columns['sentence_index'].append(result.get('sentence_index', -1))
+                columns['start_idx'].append(result.get('start_idx', -1))
+                columns['end_idx'].append(result.get('end_idx', -1))
+                columns['target_sentence'].append(result.get('target_sentence', ''))
+                columns['context_id'].append(context_id)
+                columns['model_1'].append(result.get('model_1', {}).get('sentiment'))
+                columns['model_2'].append(result.get('model_2', {}).get('sentiment'))
+                self._order.append(order)
+            self._store = None
+
+    def build(self, final: bool = False) -> ResultStore:
+        """
+        O ana kadarki sonuçların deposu
+
+        final=True ise ara sütun listeleri bırakılır ve sonraki eklemeler reddedilir
+        (iş bittiğinde bellekte sadece depo kalır).
+        """
+        with self._lock:
+            if self._store is None:
+                self._store = self._build()
+            if final and not self._closed:
+                self._closed = True
+                self._columns = {name: [] for name in _MATCH_COLUMNS}
+                self._order = []
+                self._context_ids = {}
+                self._contexts = []
+                self._context_emotions = []
+            return self._store
+
+    def _build(self) -> ResultStore:
+        emotion_matrix = np.full((len(self._contexts), len(self._label_index)), np.nan, dtype=np.float32)
+        for row, (labels, scores) in enumerate(self._context_emotions):
+            emotion_matrix[row, labels] = scores
+
+        matches = pd.DataFrame(self._columns)
+        for name in _INDEX_COLUMNS:
+            matches[name] = matches[name].astype(np.int32)
+        for name in _CATEGORY_COLUMNS[:-1]:
+            matches[name] = matches[name].astype('category')
+
+        # Dosyalar bitiş sırasıyla eklenir; depo dosya sırasıyla tutulur
+        order = np.asarray(self._order)
+        if len(order) > 1 and (np.diff(order) < 0).any():
+            matches = matches.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+        store = ResultStore(matches, list(self._contexts), emotion_matrix,
+                            list(self._label_index), dict(self._model_names))
+        store._add_top_emotion()
+        return store
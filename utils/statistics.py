@@ -0,0 +1,160 @@
+"""
+İstatistikler sekmesi için toplu (vectorized) hesaplamalar
+
+Tüm özetler ResultStore'un eşleşme tablosu üzerinde kategori kodları ve
+np.bincount ile hesaplanır; satır başına Python döngüsü yoktur. Sonuçlar depo
+anahtarıyla önbelleklenir, sekme değiştirmek yeniden hesaplama yapmaz.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.result_store import ResultStore
+
+# Alt dize kontrolünde öncelik sırası ('positive' önce)
+SENTIMENT_CLASSES = ('positive', 'negative', 'neutral')
+
+def sentiment_classes(labels: pd.Series) -> np.ndarray:
+    """
+    Etiketleri positive/negative/neutral sınıflarına indir
+
+    Eski `'positive' in sentiment.lower()` kontrolüyle aynı sonuç; kontrol her
+    satır yerine kategori başına bir kez yapılır.
+
+    Returns:
+        Satır başına sınıf indeksi (SENTIMENT_CLASSES içinde) veya -1
+    """
+    categories = labels.cat.categories.astype(str).str.lower()
+    category_class = np.full(len(categories) + 1, -1, dtype=np.int8)
+    for class_idx in reversed(range(len(SENTIMENT_CLASSES))):
+        category_class[:-1][categories.str.contains(SENTIMENT_CLASSES[class_idx], regex=False)] = class_idx
+    # Kod -1 (boş etiket) son elemana, yani -1 sınıfına düşer
+    return category_class[labels.cat.codes.to_numpy()]
+
+def group_sentiment_summary(store: ResultStore, column: str, sentiment_column: str = 'model_1') -> pd.DataFrame:
+    """Dosya veya anahtar kelime başına eşleşme ve Model 1 sentiment sayıları"""
+    groups = store.matches[column]
+    codes = groups.cat.codes.to_numpy()
+    group_count = len(groups.cat.categories)
+    valid = codes >= 0
+    classes = sentiment_classes(store.matches[sentiment_column])
+
+    summary = pd.DataFrame(
+        {'Eşleşme Sayısı': np.bincount(codes[valid], minlength=group_count)},
+        index=groups.cat.categories.astype(str)
+    )
+    for class_idx, name in enumerate(SENTIMENT_CLASSES):
+        mask = valid & (classes == class_idx)
+        summary[f"{name.capitalize()} (M1)"] = np.bincount(codes[mask], minlength=group_count)
+
+    # Depoda kullanılmayan kategoriler
+    summary = summary[summary['Eşleşme Sayısı'] > 0]
+    return summary.sort_values('Eşleşme Sayısı', ascending=False)
+
+def emotion_frequencies(store: ResultStore) -> pd.Series:
+    """Eşleşme başına en yüksek skorlu Model 3 duygusunun frekansı (azalan)"""
+    counts = store.matches['top_emotion'].value_counts()
+    return counts[counts > 0].sort_values(ascending=False)
+
+def _ratios(total: np.ndarray, unique: np.ndarray):
+    """Overlap yüzdesi ve cümle başına ortalama kullanım (sıfıra bölmeden)"""
+    total = np.asarray(total, dtype=np.float64)
+    unique = np.asarray(unique, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overlap = np.where(total > 0, (total - unique) / total * 100, 0.0)
+        avg_usage = np.where(unique > 0, total / unique, 0.0)
+    return overlap, avg_usage
+
+def overlap_statistics(store: ResultStore) -> dict:
+    """
+    Bağlam pencerelerinin cümle düzeyinde üst üste binmesi
+
+    Her eşleşme, dosyasında [start_idx, end_idx) cümle aralığını kullanır. Aralıklar
+    cümlelere açılmaz: dosyalar tek bir eksende ardışık bölümlere yerleştirilir ve
+    fark dizisinin kümülatif toplamı her cümlenin kaç pencerede geçtiğini verir
+    (eşleşme + cümle sayısında doğrusal).
+
+    Returns:
+        total / unique / overlap_ratio / avg_usage: Tüm dosyalar için
+        files: Dosya başına aynı değerler (Toplam Kullanım'a göre azalan)
+        histogram: Kapsama sayısı k -> k pencerede geçen cümle sayısı
+    """
+    matches = store.matches
+    start = matches['start_idx'].to_numpy(np.int64)
+    end = matches['end_idx'].to_numpy(np.int64)
+    files = matches['filename']
+    codes = files.cat.codes.to_numpy()
+
+    # Aralık bilgisi olmayan (eski) kayıtlar sayılmaz
+    valid = (codes >= 0) & (start >= 0) & (end > start)
+    start, end, codes = start[valid], end[valid], codes[valid]
+    file_count = len(files.cat.categories)
+
+    # Her dosyanın eksendeki bölümü: [offset, offset + en büyük end_idx)
+    lengths = np.zeros(file_count, dtype=np.int64)
+    np.maximum.at(lengths, codes, end)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    axis_length = int(offsets[-1])
+
+    diff = (np.bincount(offsets[codes] + start, minlength=axis_length + 1)
+            - np.bincount(offsets[codes] + end, minlength=axis_length + 1))
+    coverage = np.cumsum(diff[:axis_length])
+    position_files = np.repeat(np.arange(file_count), lengths)
+
+    file_total = np.bincount(codes, weights=end - start, minlength=file_count).astype(np.int64)
+    file_unique = np.bincount(position_files, weights=coverage > 0, minlength=file_count).astype(np.int64)
+    file_overlap, file_avg = _ratios(file_total, file_unique)
+
+    per_file = pd.DataFrame({
+        'Dosya': files.cat.categories.astype(str),
+        'Toplam Kullanım': file_total,
+        'Benzersiz Cümle': file_unique,
+        'Overlap %': file_overlap,
+        'Ort. Kullanım': file_avg
+    })
+    per_file = per_file[per_file['Toplam Kullanım'] > 0]
+    per_file = per_file.sort_values('Toplam Kullanım', ascending=False).reset_index(drop=True)
+
+    histogram = np.bincount(coverage[coverage > 0]) if axis_length else np.zeros(1, dtype=np.int64)
+    histogram = pd.Series(histogram[1:], index=pd.RangeIndex(1, len(histogram)), name='Cümle Sayısı')
+
+    total = int(file_total.sum())
+    unique = int(file_unique.sum())
+    overlap, avg_usage = _ratios(total, unique)
+
+    return {
+        'total': total,
+        'unique': unique,
+        'overlap_ratio': float(overlap),
+        'avg_usage': float(avg_usage),
+        'files': per_file,
+        'histogram': histogram
+    }
+
+def summary_metrics(store: ResultStore) -> dict:
+    total = len(store)
+    unique_files = store.matches['filename'].nunique()
+    return {
+        'total_matches': total,
+        'unique_files': unique_files,
+        'unique_keywords': store.matches['keyword'].nunique(),
+        'avg_per_file': total / unique_files if unique_files > 0 else 0
+    }
+
+def compute_statistics(store: ResultStore) -> dict:
+    """İstatistikler sekmesinin tüm özetleri"""
+    return {
+        'metrics': summary_metrics(store),
+        'files': group_sentiment_summary(store, 'filename'),
+        'keywords': group_sentiment_summary(store, 'keyword'),
+        'emotions': emotion_frequencies(store),
+        'overlap': overlap_statistics(store)
+    }
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _cached_statistics(store_key: str, _store: ResultStore) -> dict:
+    return compute_statistics(_store)
+
+def get_statistics(store: ResultStore) -> dict:
+    """compute_statistics, aynı depo için bir kez hesaplanır"""
+    return _cached_statistics(store.key, store)
@@ -1,29 +1,327 @@
 import re
-from typing import List, Tuple
-import docx
-import PyPDF2
+import os
+import signal
+import hashlib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from utils.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# PDF çıkarma sınırları (0 = sınırsız)
+PDF_MAX_PAGES = int(os.environ.get('LAIKA_PDF_MAX_PAGES', 2000))
+PDF_MAX_BYTES = int(os.environ.get('LAIKA_PDF_MAX_BYTES', 50 * 1024 * 1024))
+PDF_PAGE_TIMEOUT = float(os.environ.get('LAIKA_PDF_PAGE_TIMEOUT', 30))
+
+# TXT dosyaları cümle bölme için bu boyutta parçalara ayrılır
+TEXT_BLOCK_CHARS = 64 * 1024
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def get_file_extension(filename):
+    """Dosya uzantısını güvenli şekilde al"""
+    if '.' in filename:
+        return filename.rsplit('.', 1)[-1].lower()
+    return ''
+
+def decode_text_bytes(data: bytes) -> str:
+    """TXT içeriğini sırasıyla utf-8, latin-1 ve cp1252 ile çözmeyi dene"""
+    with timed('extract_txt'):
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            # UTF-8 başarısız olursa latin-1 dene
+            try:
+                return data.decode('latin-1')
+            except:
+                return data.decode('cp1252')
+
+def extract_paragraphs_from_docx(file) -> List[str]:
+    """DOCX dosyasının paragraf metinleri"""
+    import docx  # python-docx import'u ilk DOCX dosyasına ertelenir
+
+    with timed('extract_docx'):
+        doc = docx.Document(file)
+        return [paragraph.text for paragraph in doc.paragraphs]
 
 def extract_text_from_docx(file):
     """DOCX dosyasından metin çıkar"""
-    doc = docx.Document(file)
-    return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+    return '\n'.join(extract_paragraphs_from_docx(file))
+
+def iter_text_blocks(text: str, block_chars: int = TEXT_BLOCK_CHARS) -> Iterator[str]:
+    """Düz metni satır sonlarında bölünmüş, yaklaşık block_chars uzunluğunda parçalara ayır"""
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start + block_chars)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        start = end
+
+class PageTimeout(TimeoutError):
+    """Tek bir PDF sayfasının metni süre sınırında çıkarılamadı"""
+
+@contextmanager
+def _time_limit(seconds: float):
+    """
+    SIGALRM ile süre sınırı
+
+    Sadece Unix'te ve ana thread'de çalışır (çıkarma worker process'leri);
+    Streamlit'in betik thread'inde sınır uygulanmaz.
+    """
+    if (not seconds or not hasattr(signal, 'setitimer')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def iter_pdf_pages(file, max_pages: int = PDF_MAX_PAGES, max_bytes: int = PDF_MAX_BYTES,
+                   page_timeout: float = PDF_PAGE_TIMEOUT,
+                   report: Optional[dict] = None) -> Iterator[str]:
+    """
+    PDF sayfa metinlerini sırayla üret
+
+    Süre sınırını aşan sayfa atlanır; max_pages sayfadan veya toplam max_bytes
+    (UTF-8) metinden sonrası okunmaz.
+
+    Sayfa süre sınırı SIGALRM ile uygulandığı için sadece bir process'in ana
+    thread'inde geçerlidir (çıkarma worker'ları). Çıkarma havuzsuz, pipeline
+    thread'inde yapılırsa (tek worker veya tek dosya) sayfa sınırı uygulanmaz;
+    sayfa ve bayt sınırları her durumda geçerlidir.
+
+    Args:
+        report: Verilirse pages_read, pages_timed_out ve truncated ile doldurulur
+    """
+    import PyPDF2  # PyPDF2 import'u ilk PDF dosyasına ertelenir
+
+    report = report if report is not None else {}
+    report.update(pages_read=0, pages_timed_out=0, truncated=False)
+    total_bytes = 0
+
+    for page_number, page in enumerate(PyPDF2.PdfReader(file).pages):
+        if max_pages and page_number >= max_pages:
+            report['truncated'] = True
+            break
+        try:
+            with _time_limit(page_timeout), timed('pdf_page'):
+                text = page.extract_text() or ''
+        except PageTimeout:
+            report['pages_timed_out'] += 1
+            continue
+
+        total_bytes += len(text.encode('utf-8'))
+        if max_bytes and total_bytes > max_bytes:
+            report['truncated'] = True
+            break
+        report['pages_read'] += 1
+        yield text
+
+def extract_pages_from_pdf(file) -> List[str]:
+    """PDF dosyasının sayfa metinleri (sınırlar iter_pdf_pages'deki gibi)"""
+    report = {}
+    with timed('extract_pdf'):
+        pages = list(iter_pdf_pages(file, report=report))
+    if report['pages_timed_out'] or report['truncated']:
+        logger.warning(
+            "PDF kısmen okundu: %d sayfa, %d sayfa zaman aşımı, sınırda kesildi: %s",
+            report['pages_read'], report['pages_timed_out'], report['truncated']
+        )
+    return pages
 
 def extract_text_from_pdf(file):
     """PDF dosyasından metin çıkar"""
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+    # Sayfalar listede toplanıp bir kez birleştirilir (tekrarlanan += yerine)
+    return '\n'.join(extract_pages_from_pdf(file))
 
 def split_into_sentences(text: str) -> List[str]:
     """Metni cümlelere ayır"""
-    # Almanca cümle sonu işaretleri
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    return [s.strip() for s in sentences if s.strip()]
+    with timed('split_into_sentences') as timer:
+        # Almanca cümle sonu işaretleri
+        sentences = _SENTENCE_END.split(text)
+        sentences = [s.strip() for s in sentences if s.strip()]
+        timer.items = len(sentences)
+    return sentences
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Parça parça gelen metni (ör. PDF sayfaları) cümlelere ayır
+
+    split_into_sentences(clean_text(' '.join(chunks))) ile aynı cümleleri üretir.
+    Parçanın sonunda bitmeyen cümle bir sonraki parçaya taşınır; bellekte tüm
+    belge yerine bir parça ve yarım kalan cümle tutulur.
+    """
+    carry = ''
+    for chunk in chunks:
+        chunk = clean_text(chunk)
+        if not chunk:
+            continue
+        parts = _SENTENCE_END.split(f"{carry} {chunk}" if carry else chunk)
+        # Son parça henüz bitmemiş olabilir
+        carry = parts.pop()
+        for sentence in parts:
+            sentence = sentence.strip()
+            if sentence:
+                yield sentence
+    carry = carry.strip()
+    if carry:
+        yield carry
+
+def _trie_regex(words) -> str:
+    """
+    Kelimelerden ortak önekleri paylaşan regex üret
+
+    Her pozisyonda tek bir dal denenir, uzun eşleşme kısa olana tercih edilir.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if is_end else group
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Tüm anahtar kelimeleri tek geçişte bulan derlenmiş eşleştirici
+    
+    Cümle bir kez küçük harfe çevrilir ve tek bir regex ile taranır. Birden fazla
+    anahtar kelime geçiyorsa listede önce gelen seçilir (eski davranışla aynı).
+    """
+    
+    def __init__(self, keywords: List[str], word_boundary: bool = False):
+        """
+        Args:
+            keywords: Anahtar kelimeler (öncelik sırasıyla)
+            word_boundary: True ise sadece tam kelime eşleşmeleri ("WM" kelime içinde eşleşmez)
+        """
+        self.keywords = list(keywords)
+        self.word_boundary = word_boundary
+        
+        # Küçük harfli anahtar kelime -> listedeki ilk indeksi
+        self._first_index = {}
+        for i, keyword in enumerate(self.keywords):
+            key = keyword.lower()
+            if key and key not in self._first_index:
+                self._first_index[key] = i
+        
+        # Eşleşen metin -> içinde geçen anahtar kelimelerin en küçük indeksi
+        self._best_index = {}
+        self._boundary_patterns = {}
+        
+        if not self._first_index:
+            self._pattern = None
+            return
+        
+        body = _trie_regex(self._first_index)
+        # Çoğu cümlede eşleşme olmadığı için önce sınırsız (daha hızlı) bir ön tarama yapılır
+        self._any = re.compile(body)
+        if word_boundary:
+            body = rf'(?<!\w){body}(?!\w)'
+        # Lookahead sayesinde her pozisyondaki (örtüşen) eşleşmeler de bulunur
+        self._pattern = re.compile(rf'(?=({body}))')
+    
+    def _occurs(self, keyword: str, text: str) -> bool:
+        if keyword not in text:
+            return False
+        if self.word_boundary:
+            pattern = self._boundary_patterns.get(keyword)
+            if pattern is None:
+                pattern = re.compile(rf'(?<!\w){re.escape(keyword)}(?!\w)')
+                self._boundary_patterns[keyword] = pattern
+            return pattern.search(text) is not None
+        return True
+    
+    def _best_for(self, matched: str) -> int:
+        """Eşleşen metnin içerdiği anahtar kelimeler arasında en öncelikli indeks"""
+        best = self._best_index.get(matched)
+        if best is None:
+            # Her pozisyonda sadece en uzun anahtar kelime yakalanır;
+            # içindeki daha kısa anahtar kelimeleri burada bir kez hesapla
+            best = min(
+                index for key, index in self._first_index.items()
+                if len(key) <= len(matched) and self._occurs(key, matched)
+            )
+            self._best_index[matched] = best
+        return best
+    
+    def first_match(self, text: str) -> Optional[str]:
+        """Metinde geçen en öncelikli anahtar kelime (yoksa None)"""
+        if self._pattern is None:
+            return None
+        lowered = text.lower()
+        first = self._any.search(lowered)
+        if first is None:
+            return None
+        best = None
+        # Sınır modunda ilk ham eşleşme geçersiz olabilir, tarama oradan devam eder
+        for m in self._pattern.finditer(lowered, first.start()):
+            index = self._best_for(m.group(1))
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return None if best is None else self.keywords[best]
+    
+    def search(self, text: str) -> bool:
+        """Metinde herhangi bir anahtar kelime var mı"""
+        if self._pattern is None:
+            return False
+        lowered = text.lower()
+        first = self._any.search(lowered)
+        if first is None:
+            return False
+        return not self.word_boundary or self._pattern.search(lowered, first.start()) is not None
+
+    def search_chunks(self, chunks: Sequence[str]) -> bool:
+        """
+        Parçalar ' ' ile birleştirilmiş metinde herhangi bir anahtar kelime var mı
+
+        Birleşik metin oluşturulmaz; iki parçanın sınırına denk gelen anahtar
+        kelimeler için sadece komşu parçaların uçları birlikte aranır.
+        """
+        if any(self.search(chunk) for chunk in chunks):
+            return True
+        edge = max(map(len, self._first_index), default=0)
+        return any(
+            self.search(f"{previous[-edge:]} {chunk[:edge]}")
+            for previous, chunk in zip(chunks, chunks[1:])
+        )
+
+@lru_cache(maxsize=32)
+def _cached_matcher(keywords: Tuple[str, ...], word_boundary: bool) -> KeywordMatcher:
+    return KeywordMatcher(list(keywords), word_boundary)
+
+def get_keyword_matcher(keywords: List[str], word_boundary: bool = False) -> KeywordMatcher:
+    """Aynı anahtar kelime listesi için derlenmiş eşleştiriciyi tekrar kullan"""
+    return _cached_matcher(tuple(keywords), word_boundary)
 
 def find_keyword_contexts(sentences: List[str], keywords: List[str], 
-                         context_before: int = 3, context_after: int = 3) -> List[dict]:
+                         context_before: int = 3, context_after: int = 3,
+                         word_boundary: bool = False) -> List[dict]:
     """
     Anahtar kelimelerin geçtiği cümleleri ve context'lerini bul
     
@@ -32,37 +330,75 @@ def find_keyword_contexts(sentences: List[str], keywords: List[str],
         keywords: Arama yapılacak anahtar kelimeler
         context_before: Önceki kaç cümle
         context_after: Sonraki kaç cümle
+        word_boundary: Sadece tam kelime eşleşmeleri
     
     Returns:
         Her match için dict listesi
     """
-    matches = []
+    with timed('find_keyword_contexts') as timer:
+        matches = list(iter_keyword_contexts(sentences, keywords, context_before, context_after, word_boundary))
+        timer.items = len(matches)
+    return matches
+
+def iter_keyword_contexts(sentences: Iterable[str], keywords: List[str],
+                          context_before: int = 3, context_after: int = 3,
+                          word_boundary: bool = False) -> Iterator[dict]:
+    """
+    find_keyword_contexts'in akışlı hali
+
+    Cümleler tek tek tüketilir; bellekte sadece context penceresi kadar cümle
+    (context_before + context_after + 1) ve sonraki cümlelerini bekleyen eşleşmeler
+    tutulur. Eşleşmeler cümle sırasıyla üretilir.
+    """
+    matcher = get_keyword_matcher(keywords, word_boundary)
+    window = deque(maxlen=context_before + context_after + 1)
+    # Sonraki context cümlelerini bekleyen (cümle indeksi, anahtar kelime)
+    pending = deque()
     
-    for i, sentence in enumerate(sentences):
-        # Anahtar kelime kontrolü (case-insensitive)
-        for keyword in keywords:
-            if keyword.lower() in sentence.lower():
-                # Context penceresi
-                start_idx = max(0, i - context_before)
-                end_idx = min(len(sentences), i + context_after + 1)
-                
-                context_sentences = sentences[start_idx:end_idx]
-                
-                matches.append({
-                    'keyword': keyword,
-                    'sentence_index': i,
-                    'target_sentence': sentence,
-                    'context': ' '.join(context_sentences),
-                    'context_sentences': context_sentences,
-                    'start_idx': start_idx,
-                    'end_idx': end_idx
-                })
-                break  # Her cümle için sadece bir match
+    def build(i: int, keyword: str, last_index: int) -> dict:
+        # Context penceresi
+        start_idx = max(0, i - context_before)
+        end_idx = min(last_index + 1, i + context_after + 1)
+        
+        # window[0] cümlesinin belge içindeki indeksi
+        offset = last_index + 1 - len(window)
+        context_sentences = [window[j - offset] for j in range(start_idx, end_idx)]
+        
+        return {
+            'keyword': keyword,
+            'sentence_index': i,
+            'target_sentence': window[i - offset],
+            'context': ' '.join(context_sentences),
+            'context_sentences': context_sentences,
+            'start_idx': start_idx,
+            'end_idx': end_idx
+        }
     
-    return matches
+    index = -1
+    for index, sentence in enumerate(sentences):
+        window.append(sentence)
+        
+        # Anahtar kelime kontrolü (case-insensitive, tek geçiş)
+        # Her cümle için sadece bir match
+        keyword = matcher.first_match(sentence)
+        if keyword is not None:
+            pending.append((index, keyword))
+        
+        while pending and pending[0][0] + context_after <= index:
+            yield build(*pending.popleft(), index)
+    
+    # Belge sonu: kalan eşleşmelerin sonraki context'i kısa kalır
+    while pending:
+        yield build(*pending.popleft(), index)
 
 def clean_text(text: str) -> str:
     """Metni temizle"""
-    # Fazla boşlukları temizle
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    with timed('clean_text'):
+        # Fazla boşlukları temizle
+        text = re.sub(r'\s+', ' ', text)
+        return text.strip()
+
+def context_hash(text: str) -> str:
+    """Boşluk farklarından bağımsız içerik hash'i"""
+    normalized = ' '.join(text.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
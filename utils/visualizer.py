@@ -1,6 +1,6 @@
 import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
+from utils.result_store import ResultStore
 
 def create_sentiment_comparison_chart(results: dict):
     """3 model için sentiment karşılaştırma grafiği"""
@@ -57,6 +57,9 @@ def create_emotion_radar_chart(emotions: list):
 def create_results_dataframe(all_results: list) -> pd.DataFrame:
     """Tüm sonuçları DataFrame'e dönüştür"""
     
+    if isinstance(all_results, ResultStore):
+        return all_results.summary_dataframe()
+    
     data = []
     for result in all_results:
         # Model 3 top emotion güvenli şekilde al
@@ -87,13 +90,24 @@ def create_sentiment_distribution_chart(all_results: list):
     if not all_results:
         return None
     
-    # Model 1 dağılımı
-    model_1_sentiments = [r.get('model_1', {}).get('sentiment', '') for r in all_results]
-    sentiment_counts_1 = pd.Series(model_1_sentiments).value_counts()
+    # Devre dışı modellerin boş sonuçları sayılmaz
+    if isinstance(all_results, ResultStore):
+        # Sütunlu depoda etiketler zaten kategori kodlu
+        sentiment_counts_1 = all_results.matches['model_1'].value_counts()
+        sentiment_counts_1 = sentiment_counts_1[sentiment_counts_1 > 0]
+        sentiment_counts_2 = all_results.matches['model_2'].value_counts()
+        sentiment_counts_2 = sentiment_counts_2[sentiment_counts_2 > 0]
+    else:
+        # Model 1 dağılımı
+        model_1_sentiments = [r.get('model_1', {}).get('sentiment', '') for r in all_results]
+        sentiment_counts_1 = pd.Series([s for s in model_1_sentiments if s], dtype=object).value_counts()
+        
+        # Model 2 dağılımı
+        model_2_sentiments = [r.get('model_2', {}).get('sentiment', '') for r in all_results]
+        sentiment_counts_2 = pd.Series([s for s in model_2_sentiments if s], dtype=object).value_counts()
     
-    # Model 2 dağılımı
-    model_2_sentiments = [r.get('model_2', {}).get('sentiment', '') for r in all_results]
-    sentiment_counts_2 = pd.Series(model_2_sentiments).value_counts()
+    if sentiment_counts_1.empty and sentiment_counts_2.empty:
+        return None
     
     fig = go.Figure()
     
@@ -128,7 +142,10 @@ def create_file_summary_chart(all_results: list):
         return None
     
     # Dosya başına eşleşme sayısı
-    file_counts = pd.Series([r.get('filename', 'N/A') for r in all_results]).value_counts()
+    if isinstance(all_results, ResultStore):
+        file_counts = all_results.matches['filename'].astype(str).value_counts()
+    else:
+        file_counts = pd.Series([r.get('filename', 'N/A') for r in all_results]).value_counts()
     
     fig = go.Figure()
     
@@ -155,7 +172,10 @@ def create_keyword_summary_chart(all_results: list):
         return None
     
     # Anahtar kelime başına eşleşme sayısı
-    keyword_counts = pd.Series([r.get('keyword', '') for r in all_results]).value_counts()
+    if isinstance(all_results, ResultStore):
+        keyword_counts = all_results.matches['keyword'].astype(str).value_counts()
+    else:
+        keyword_counts = pd.Series([r.get('keyword', '') for r in all_results]).value_counts()
     
     fig = go.Figure()
     
@@ -173,3 +193,54 @@ def create_keyword_summary_chart(all_results: list):
     )
     
     return fig
+
+def create_coverage_histogram_chart(histogram: pd.Series):
+    """Cümle kapsama histogramı: kaç cümle k farklı bağlam penceresinde geçti"""
+    
+    if histogram is None or histogram.empty:
+        return None
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=histogram.index,
+        y=histogram.values,
+        marker_color='teal'
+    ))
+    
+    fig.update_layout(
+        title='Cümle Kapsama Dağılımı (Kaç Pencerede Kullanıldı)',
+        xaxis_title='Pencere Sayısı',
+        yaxis_title='Cümle Sayısı',
+        height=400
+    )
+    
+    return fig
+
+def create_stage_timing_chart(stages: list):
+    """Aşama başına toplam süre (süre nereye gidiyor)"""
+    
+    if not stages:
+        return None
+    
+    # En uzun aşama en üstte
+    ordered = sorted(stages, key=lambda row: row['total_s'])
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=[row['total_s'] for row in ordered],
+        y=[row['stage'] for row in ordered],
+        orientation='h',
+        marker_color='indianred',
+        text=[f"{row['share']:.0%}" for row in ordered],
+        textposition='auto'
+    ))
+    
+    fig.update_layout(
+        title='Aşama Başına Toplam Süre',
+        xaxis_title='Saniye',
+        height=max(300, 30 * len(ordered))
+    )
+    
+    return fig